@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import sys
 import json
-from src.strand_agent_poc.core import get_conversation_history, search_memory
+from src.strand_agent_poc.core import iter_conversation_history, iter_search_memory
 
 def main():
     if len(sys.argv) < 2:
@@ -12,13 +12,15 @@ def main():
     
     if len(sys.argv) > 2:
         query = " ".join(sys.argv[2:])
-        results = search_memory(session_id, query)
+        results = iter_search_memory(session_id, query)
         print(f"Search results for '{query}':")
     else:
-        results = get_conversation_history(session_id)
-        print(f"History for session '{session_id}':")
+        results = iter_conversation_history(session_id)
+        print(f"History for session '{session_id}' (newest first):")
     
-    print(json.dumps(results, indent=2, ensure_ascii=False))
+    # Records are printed as their pages arrive
+    for record in results:
+        print(json.dumps(record, indent=2, ensure_ascii=False), flush=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,9 +1,49 @@
-from .core import PlanExecuteReflectAgent, run_agent, Planner, executor_agent, model
+import importlib
+from typing import TYPE_CHECKING
+
+# Resolved lazily from .core on first access, see core/__init__.py
+_LAZY_ATTRIBUTES = {
+    "PlanExecuteReflectAgent",
+    "run_agent",
+    "run_agent_async",
+    "run_agents",
+    "run_agents_async",
+    "Planner",
+    "executor_agent",
+    "model",
+}
+
+if TYPE_CHECKING:
+    from .core import (
+        PlanExecuteReflectAgent,
+        run_agent,
+        run_agent_async,
+        run_agents,
+        run_agents_async,
+        Planner,
+        executor_agent,
+        model,
+    )
 
 __all__ = [
     "PlanExecuteReflectAgent",
     "run_agent",
+    "run_agent_async",
+    "run_agents",
+    "run_agents_async",
     "Planner",
     "executor_agent",
     "model",
 ]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(".core", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _LAZY_ATTRIBUTES)
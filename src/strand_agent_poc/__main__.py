@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 import sys
-from .core import run_agent
 
 
 def main():
-    if len(sys.argv) < 2:
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
         print("Usage: python -m strand_agent_poc <objective>")
-        sys.exit(1)
+        sys.exit(0 if len(sys.argv) >= 2 else 1)
+
+    # Imported here so --help and argument errors do not load the agent stack
+    from .core import run_agent
 
     objective = " ".join(sys.argv[1:])
     result = run_agent(objective)
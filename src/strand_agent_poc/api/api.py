@@ -1,12 +1,50 @@
-from typing import Optional
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from ..core.plan_execute_reflect_agent import run_agent
+from ..core.plan_execute_reflect_agent import (
+    PlanExecuteReflectAgent,
+    run_agent_async,
+    run_agents_async,
+)
+from ..core.jobs import JobWorkerPool, QueueFullError, default_job_store
+from ..core.mcp_pool import shutdown_mcp_pool
+from ..core.metrics import get_agent_metrics
+from ..core.opensearch_client import close_opensearch_client
 import json
 
 
-app = FastAPI(title="Strand Agent API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global job_workers
+    store = default_job_store()
+    job_workers = JobWorkerPool(
+        store,
+        run_job,
+        workers=int(os.getenv("JOB_WORKERS", "4")),
+        poll_interval=float(os.getenv("JOB_POLL_INTERVAL", "1.0")),
+    )
+    job_workers.start()
+    yield
+    # Running jobs are re-queued when the API starts again
+    await job_workers.stop()
+    store.close()
+    # Stop the warm MCP server processes and pooled connections on shutdown
+    shutdown_mcp_pool()
+    close_opensearch_client()
+
+
+app = FastAPI(title="Strand Agent API", version="0.1.0", lifespan=lifespan)
+
+# Objectives run concurrently on the event loop, bounded to protect model and MCP capacity.
+# Inline requests and job workers share the same slots.
+objective_slots = asyncio.Semaphore(int(os.getenv("API_MAX_CONCURRENT_OBJECTIVES", "8")))
+# Submissions beyond this many queued jobs are rejected with 429
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+job_workers: Optional[JobWorkerPool] = None
 
 
 class AgentRequest(BaseModel):
@@ -26,22 +64,45 @@ class AgentRequest(BaseModel):
     executor_max_iterations: int = 20
     message_history_limit: int = 10
     executor_message_history_limit: int = 10
+    parallel_steps: bool = False
+    max_parallel_steps: int = 4
+    speculative_steps: bool = False
+    early_dispatch: bool = False
     stream: bool = False
 
 
+class BatchRequest(BaseModel):
+    # Required
+    objectives: List[str]
+
+    # Optional parameters, applied to every objective
+    max_concurrency: int = 4
+    max_steps: int = 20
+    executor_max_iterations: int = 20
+    parallel_steps: bool = False
+    max_parallel_steps: int = 4
+    speculative_steps: bool = False
+    early_dispatch: bool = False
+
+
 class AgentResponse(BaseModel):
     result: str
     success: bool
 
 
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
+
+
 @app.post("/execute")
 async def execute_agent(request: AgentRequest):
     """Execute the Plan-Execute-Reflect agent with the given objective"""
     try:
         if request.stream:
-            def generate():
+            async def generate():
                 # Stream the agent execution
-                for chunk in run_agent_stream(
+                async for chunk in run_agent_stream(
                     objective=request.objective,
                     memory_id=request.memory_id,
                     max_steps=request.max_steps,
@@ -50,29 +111,62 @@ async def execute_agent(request: AgentRequest):
                     executor_system_prompt=request.executor_system_prompt,
                     planner_prompt=request.planner_prompt,
                     reflect_prompt=request.reflect_prompt,
+                    parallel_steps=request.parallel_steps,
+                    max_parallel_steps=request.max_parallel_steps,
+                    speculative_steps=request.speculative_steps,
+                    early_dispatch=request.early_dispatch,
                 ):
-                    yield f"data: {json.dumps(chunk)}\n\n"
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
                 yield "data: [DONE]\n\n"
-            
-            return StreamingResponse(generate(), media_type="text/plain")
+
+            return StreamingResponse(generate(), media_type="text/event-stream")
         else:
-            result = run_agent(
-                objective=request.objective,
-                memory_id=request.memory_id,
-                max_steps=request.max_steps,
-                executor_max_iterations=request.executor_max_iterations,
-                system_prompt=request.system_prompt,
-                executor_system_prompt=request.executor_system_prompt,
-                planner_prompt=request.planner_prompt,
-                reflect_prompt=request.reflect_prompt,
-            )
+            async with objective_slots:
+                result = await run_agent_async(
+                    objective=request.objective,
+                    memory_id=request.memory_id,
+                    max_steps=request.max_steps,
+                    executor_max_iterations=request.executor_max_iterations,
+                    system_prompt=request.system_prompt,
+                    executor_system_prompt=request.executor_system_prompt,
+                    planner_prompt=request.planner_prompt,
+                    reflect_prompt=request.reflect_prompt,
+                    parallel_steps=request.parallel_steps,
+                    max_parallel_steps=request.max_parallel_steps,
+                    speculative_steps=request.speculative_steps,
+                    early_dispatch=request.early_dispatch,
+                )
             return AgentResponse(result=result, success=True)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def run_agent_stream(
-    objective: str, 
+@app.post("/execute/batch")
+async def execute_batch(request: BatchRequest):
+    """Run many objectives concurrently, streaming each outcome as Server-Sent Events as it completes"""
+    if not request.objectives:
+        raise HTTPException(status_code=400, detail="objectives must not be empty")
+
+    async def generate():
+        async for outcome in run_agents_async(
+            request.objectives,
+            max_concurrency=request.max_concurrency,
+            slots=objective_slots,
+            max_steps=request.max_steps,
+            executor_max_iterations=request.executor_max_iterations,
+            parallel_steps=request.parallel_steps,
+            max_parallel_steps=request.max_parallel_steps,
+            speculative_steps=request.speculative_steps,
+            early_dispatch=request.early_dispatch,
+        ):
+            yield f"data: {json.dumps(outcome, ensure_ascii=False)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(generate(), media_type="text/event-stream")
+
+
+async def run_agent_stream(
+    objective: str,
     memory_id: Optional[str] = None,
     max_steps: int = 20,
     executor_max_iterations: int = 20,
@@ -80,21 +174,93 @@ def run_agent_stream(
     executor_system_prompt: Optional[str] = None,
     planner_prompt: Optional[str] = None,
     reflect_prompt: Optional[str] = None,
+    parallel_steps: bool = False,
+    max_parallel_steps: int = 4,
+    speculative_steps: bool = False,
+    early_dispatch: bool = False,
 ):
-    """Generator function for streaming agent execution"""
-    # This is a placeholder - you'll need to modify run_agent to support streaming
-    # For now, just yield the final result
-    result = run_agent(
-        objective=objective,
-        memory_id=memory_id,
-        max_steps=max_steps,
-        executor_max_iterations=executor_max_iterations,
-        system_prompt=system_prompt,
-        executor_system_prompt=executor_system_prompt,
-        planner_prompt=planner_prompt,
-        reflect_prompt=reflect_prompt,
+    """Async generator of agent events (plan, steps, tools, tokens, result) as they happen"""
+    if not memory_id:
+        memory_id = os.urandom(16).hex()
+    async with objective_slots:
+        agent = await asyncio.to_thread(
+            PlanExecuteReflectAgent,
+            session_id=memory_id,
+            max_steps=max_steps,
+            executor_max_iterations=executor_max_iterations,
+            parallel_steps=parallel_steps,
+            max_parallel_steps=max_parallel_steps,
+            speculative_steps=speculative_steps,
+            early_dispatch=early_dispatch,
+        )
+        async for event in agent.stream_async(objective):
+            yield event
+
+
+def run_job(request: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Run a queued job request; the events are recorded by the job worker pool"""
+    request = AgentRequest(**request)
+    return run_agent_stream(
+        objective=request.objective,
+        memory_id=request.memory_id,
+        max_steps=request.max_steps,
+        executor_max_iterations=request.executor_max_iterations,
+        system_prompt=request.system_prompt,
+        executor_system_prompt=request.executor_system_prompt,
+        planner_prompt=request.planner_prompt,
+        reflect_prompt=request.reflect_prompt,
+        parallel_steps=request.parallel_steps,
+        max_parallel_steps=request.max_parallel_steps,
+        speculative_steps=request.speculative_steps,
+        early_dispatch=request.early_dispatch,
     )
-    yield {"type": "result", "content": result}
+
+
+def _jobs() -> JobWorkerPool:
+    if job_workers is None:
+        raise HTTPException(status_code=503, detail="Job workers are not running")
+    return job_workers
+
+
+@app.post("/jobs", response_model=JobResponse, status_code=202)
+async def submit_job(request: AgentRequest):
+    """Queue an objective; poll /jobs/{job_id} for its status and result"""
+    workers = _jobs()
+    try:
+        job_id = workers.store.submit(
+            request.model_dump(exclude={"stream"}), max_queued=JOB_MAX_QUEUED
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    workers.notify()
+    return JobResponse(job_id=job_id, status="queued")
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, timestamps and (once finished) result of a job"""
+    job = _jobs().store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/jobs/{job_id}/steps")
+async def get_job_steps(job_id: str, after: int = 0):
+    """Steps completed so far; pass the last seen ``seq`` as ``after`` to page"""
+    store = _jobs().store
+    if store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"job_id": job_id, "steps": store.steps(job_id, after=after)}
+
+
+@app.post("/jobs/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    status = _jobs().cancel(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(job_id=job_id, status=status)
 
 
 @app.get("/health")
@@ -103,6 +269,15 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Per-phase latency, token and tool metrics in Prometheus text format"""
+    return PlainTextResponse(
+        get_agent_metrics().prometheus_text(),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 def main():
     """Entry point for the API server"""
     import uvicorn
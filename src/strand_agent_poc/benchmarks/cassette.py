@@ -0,0 +1,317 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+from strands.models.model import Model
+
+CASSETTE_DIR = Path(__file__).parent / "cassettes"
+
+
+def load_cassette(name_or_path: Union[str, Path]) -> Dict[str, Any]:
+    """Load a cassette by file path or by name from the bundled cassettes directory."""
+    path = Path(name_or_path)
+    if not path.exists():
+        path = CASSETTE_DIR / f"{name_or_path}.json"
+    with open(path, encoding="utf-8") as f:
+        cassette = json.load(f)
+    cassette.setdefault("interactions", [])
+    cassette.setdefault("tools", [])
+    cassette["path"] = str(path)
+    return cassette
+
+
+def save_cassette(cassette: Dict[str, Any], path: Union[str, Path]) -> None:
+    data = {k: v for k, v in cassette.items() if k != "path"}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def agent_role(system_prompt: Optional[str]) -> str:
+    """Tell the planner and executor apart by their system prompts."""
+    return "executor" if system_prompt and "executor agent" in system_prompt else "planner"
+
+
+def _first_user_text(messages: List[Dict[str, Any]]) -> str:
+    for message in messages:
+        if message.get("role") == "user":
+            return "".join(b.get("text", "") for b in message.get("content", []))
+    return ""
+
+
+def _assistant_turns(messages: List[Dict[str, Any]]) -> int:
+    # Count turns since the latest prompt, so a planner conversation that
+    # spans several reflections restarts at turn 0 for every prompt
+    turns = 0
+    for message in messages:
+        if message.get("role") == "assistant":
+            turns += 1
+        elif any("text" in b for b in message.get("content", [])):
+            turns = 0
+    return turns
+
+
+class ModelCallStats:
+    """Per-role counters collected by ReplayModel and RecordingModel."""
+
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+        self.prompt_bytes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, role: str, seconds: float, prompt_bytes: int) -> None:
+        with self._lock:
+            self.calls[role] = self.calls.get(role, 0) + 1
+            self.seconds[role] = self.seconds.get(role, 0.0) + seconds
+            self.prompt_bytes[role] = self.prompt_bytes.get(role, 0) + prompt_bytes
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": dict(self.calls),
+                "seconds": dict(self.seconds),
+                "prompt_bytes": dict(self.prompt_bytes),
+            }
+
+
+def prompt_size(messages: Any, tool_specs: Any, system_prompt: Optional[str]) -> int:
+    payload = json.dumps(
+        {"system": system_prompt, "messages": messages, "tools": tool_specs},
+        default=str,
+        ensure_ascii=False,
+    )
+    return len(payload.encode("utf-8"))
+
+
+def message_to_events(
+    message: Dict[str, Any], stop_reason: str, usage: Optional[Dict[str, int]] = None
+) -> List[Dict[str, Any]]:
+    """Convert a recorded assistant message into the model stream events strands consumes."""
+    events: List[Dict[str, Any]] = [{"messageStart": {"role": "assistant"}}]
+    for block in message.get("content", []):
+        if "text" in block:
+            events.append({"contentBlockStart": {"start": {}}})
+            events.append({"contentBlockDelta": {"delta": {"text": block["text"]}}})
+            events.append({"contentBlockStop": {}})
+        elif "toolUse" in block:
+            tool_use = block["toolUse"]
+            events.append(
+                {
+                    "contentBlockStart": {
+                        "start": {
+                            "toolUse": {
+                                "toolUseId": tool_use["toolUseId"],
+                                "name": tool_use["name"],
+                            }
+                        }
+                    }
+                }
+            )
+            events.append(
+                {
+                    "contentBlockDelta": {
+                        "delta": {"toolUse": {"input": json.dumps(tool_use.get("input", {}))}}
+                    }
+                }
+            )
+            events.append({"contentBlockStop": {}})
+    events.append({"messageStop": {"stopReason": stop_reason}})
+    usage = usage or {"inputTokens": 0, "outputTokens": 0, "totalTokens": 0}
+    events.append({"metadata": {"usage": usage, "metrics": {"latencyMs": 0}}})
+    return events
+
+
+class ReplayModel(Model):
+    """Serves recorded model responses from a cassette instead of calling Bedrock.
+
+    Planner interactions are replayed in order. Executor interactions are
+    matched on the step text (``match``) and the turn within the step, so
+    steps may run concurrently. ``latency_scale`` replays the recorded
+    ``latency_ms`` of each interaction (0 disables the delay).
+    """
+
+    def __init__(self, cassette: Dict[str, Any], latency_scale: float = 0.0):
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self.stats = ModelCallStats()
+        self._used = set()
+        self._tool_use_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.config: Dict[str, Any] = {"model_id": "replay"}
+
+    def update_config(self, **model_config: Any) -> None:
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise RuntimeError(
+            "ReplayModel does not support structured output: cassettes record streamed "
+            "responses only, so the agent must not call structured_output during a replay"
+        )
+
+    def _next_interaction(self, role: str, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        first_text = _first_user_text(messages)
+        turn = _assistant_turns(messages)
+        with self._lock:
+            candidates = [
+                (i, it)
+                for i, it in enumerate(self.cassette["interactions"])
+                if i not in self._used and it.get("role", "planner") == role
+            ]
+            for matches in (
+                lambda it: it.get("match", "") in first_text and it.get("turn", turn) == turn,
+                lambda it: it.get("turn", turn) == turn,
+            ):
+                for i, interaction in candidates:
+                    if matches(interaction):
+                        self._used.add(i)
+                        return interaction
+        raise LookupError(f"No recorded {role} interaction left for turn {turn}")
+
+    async def stream(
+        self,
+        messages,
+        tool_specs=None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        start = time.perf_counter()
+        role = agent_role(system_prompt)
+        interaction = self._next_interaction(role, messages)
+
+        message = json.loads(json.dumps(interaction["message"]))
+        for block in message.get("content", []):
+            if "toolUse" in block:
+                # Recorded ids may repeat across steps; keep them unique per replay
+                block["toolUse"]["toolUseId"] = f"tooluse_replay_{next(self._tool_use_ids)}"
+
+        if self.latency_scale:
+            await asyncio.sleep(interaction.get("latency_ms", 0) / 1000 * self.latency_scale)
+        for event in message_to_events(
+            message, interaction.get("stop_reason", "end_turn"), interaction.get("usage")
+        ):
+            yield event
+        self.stats.record(
+            role, time.perf_counter() - start, prompt_size(messages, tool_specs, system_prompt)
+        )
+
+
+class RecordingModel(Model):
+    """Wraps a real model and records every response into a cassette."""
+
+    def __init__(self, model: Model, cassette: Optional[Dict[str, Any]] = None):
+        self.model = model
+        self.cassette = cassette if cassette is not None else {"interactions": [], "tools": []}
+        self.stats = ModelCallStats()
+        self._recorded_tool_uses = set()
+        self._lock = threading.Lock()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def _record_tools(self, messages: List[Dict[str, Any]], tool_specs: Any) -> None:
+        """Record MCP tool schemas and the tool results that are in the conversation."""
+        with self._lock:
+            tools = {t["name"]: t for t in self.cassette["tools"]}
+            for spec in tool_specs or []:
+                tools.setdefault(
+                    spec["name"],
+                    {
+                        "name": spec["name"],
+                        "description": spec.get("description", ""),
+                        "input_schema": spec.get("inputSchema", {}).get("json", {}),
+                        "responses": [],
+                    },
+                )
+
+            tool_uses: Dict[str, Dict[str, Any]] = {}
+            for message in messages:
+                for block in message.get("content", []):
+                    if "toolUse" in block:
+                        tool_uses[block["toolUse"]["toolUseId"]] = block["toolUse"]
+                    elif "toolResult" in block:
+                        result = block["toolResult"]
+                        tool_use = tool_uses.get(result.get("toolUseId"))
+                        if tool_use is None or result["toolUseId"] in self._recorded_tool_uses:
+                            continue
+                        self._recorded_tool_uses.add(result["toolUseId"])
+                        if tool_use["name"] not in tools:
+                            continue
+                        tools[tool_use["name"]]["responses"].append(
+                            {
+                                "match": json.dumps(tool_use.get("input", {}), sort_keys=True),
+                                "output": "".join(
+                                    c.get("text", "") or json.dumps(c.get("json", ""))
+                                    for c in result.get("content", [])
+                                ),
+                            }
+                        )
+            self.cassette["tools"] = list(tools.values())
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    async def stream(
+        self,
+        messages,
+        tool_specs=None,
+        system_prompt: Optional[str] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        start = time.perf_counter()
+        role = agent_role(system_prompt)
+        if role == "executor":
+            self._record_tools(messages, tool_specs)
+        content: List[Dict[str, Any]] = []
+        tool_use: Optional[Dict[str, Any]] = None
+        tool_input = ""
+        stop_reason = "end_turn"
+        usage = None
+
+        async for event in self.model.stream(messages, tool_specs, system_prompt, **kwargs):
+            if "contentBlockStart" in event:
+                start_block = event["contentBlockStart"].get("start", {})
+                if "toolUse" in start_block:
+                    tool_use, tool_input = dict(start_block["toolUse"]), ""
+            elif "contentBlockDelta" in event:
+                delta = event["contentBlockDelta"]["delta"]
+                if "text" in delta:
+                    if not content or "text" not in content[-1]:
+                        content.append({"text": ""})
+                    content[-1]["text"] += delta["text"]
+                elif "toolUse" in delta:
+                    tool_input += delta["toolUse"].get("input", "")
+            elif "contentBlockStop" in event and tool_use is not None:
+                tool_use["input"] = json.loads(tool_input or "{}")
+                content.append({"toolUse": tool_use})
+                tool_use = None
+            elif "messageStop" in event:
+                stop_reason = event["messageStop"].get("stopReason", stop_reason)
+            elif "metadata" in event:
+                usage = event["metadata"].get("usage")
+            yield event
+
+        elapsed = time.perf_counter() - start
+        interaction: Dict[str, Any] = {
+            "role": role,
+            "turn": _assistant_turns(messages),
+            "message": {"role": "assistant", "content": content},
+            "stop_reason": stop_reason,
+            "latency_ms": round(elapsed * 1000),
+        }
+        if role == "executor":
+            interaction["match"] = _first_user_text(messages)[:200]
+        if usage:
+            interaction["usage"] = usage
+        with self._lock:
+            self.cassette["interactions"].append(interaction)
+        self.stats.record(role, elapsed, prompt_size(messages, tool_specs, system_prompt))
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""Offline end-to-end benchmark of the plan-execute-reflect loop.
+
+Replays recorded investigations (model responses and MCP tool outputs)
+without Bedrock or OpenSearch and reports wall time, time per phase,
+prompt bytes and allocations.
+
+Usage:
+    python -m strand_agent_poc.benchmarks.run [cassette ...] [--repeat N]
+        [--latency-scale X] [--tool-latency-scale X] [--parallel-steps]
+        [--speculative-steps] [--early-dispatch] [--allocations] [--json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import shlex
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .cassette import ReplayModel, load_cassette
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_CASSETTES = ["payment_failure", "ad_service_cpu"]
+
+
+@contextmanager
+def replay_environment(cassette: Dict[str, Any], tool_latency_scale: float = 0.0) -> Iterator[None]:
+    """Point the MCP pool at the stub server and keep sessions/telemetry local."""
+    from ..core import mcp_pool, model, model_router, tool_cache
+
+    # The stub server runs with a minimal environment, so bootstrap sys.path
+    bootstrap = (
+        f"import sys; sys.path.insert(0, {str(SRC_DIR)!r}); "
+        "from strand_agent_poc.benchmarks.stub_mcp_server import main; main()"
+    )
+    with tempfile.TemporaryDirectory() as session_dir:
+        overrides = {
+            "OPENSEARCH_MCP_COMMAND": sys.executable,
+            "OPENSEARCH_MCP_ARGS": shlex.join(["-c", bootstrap, cassette["path"]]),
+            "STUB_MCP_LATENCY_SCALE": str(tool_latency_scale),
+            "SESSION_STORAGE_DIR": session_dir,
+            "OTEL_SDK_DISABLED": "true",
+            # The stub server answers the searches, there is no cluster to coalesce them for
+            "SEARCH_COALESCE_WINDOW_MS": "0",
+        }
+        saved = {k: os.environ.get(k) for k in overrides}
+        os.environ.update(overrides)
+        mcp_pool.shutdown_mcp_pool()
+        tool_cache.get_tool_cache().clear()
+        try:
+            yield
+        finally:
+            mcp_pool.shutdown_mcp_pool()
+            for model_id in model_router.get_model_router().model_ids():
+                model.set_model(model_id, None)
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+
+async def _run_once(
+    objective: str, parallel_steps: bool, speculative_steps: bool, early_dispatch: bool
+) -> Dict[str, Any]:
+    from ..core.plan_execute_reflect_agent import PlanExecuteReflectAgent
+
+    start = time.perf_counter()
+    agent = PlanExecuteReflectAgent(
+        session_id=os.urandom(8).hex(),
+        parallel_steps=parallel_steps,
+        speculative_steps=speculative_steps,
+        early_dispatch=early_dispatch,
+    )
+    setup_s = time.perf_counter() - start
+
+    planner_s = executor_s = 0.0
+    # Wall time with at least one step running; executor_s adds up concurrent steps
+    executor_wall_s = 0.0
+    executor_wall_start = 0.0
+    phase_start = time.perf_counter()
+    step_started: Dict[str, float] = {}
+    steps = 0
+    result = ""
+    async for event in agent.stream_async(objective):
+        now = time.perf_counter()
+        if event["type"] in ("plan", "reflection"):
+            planner_s += now - phase_start
+        elif event["type"] == "step_started":
+            if not step_started:
+                executor_wall_start = now
+            step_started[event["step"]] = now
+        elif event["type"] == "step_completed":
+            executor_s += now - step_started.pop(event["step"], now)
+            if not step_started:
+                executor_wall_s += now - executor_wall_start
+            steps += 1
+            phase_start = now
+        elif event["type"] == "result":
+            result = event["content"]
+        elif event["type"] == "error":
+            raise RuntimeError(event["content"])
+
+    return {
+        "wall_s": time.perf_counter() - start,
+        "setup_s": setup_s,
+        "planner_s": planner_s,
+        "executor_s": executor_s,
+        "executor_wall_s": executor_wall_s,
+        "steps": steps,
+        "result_chars": len(result),
+        "speculative_hits": agent.speculation_stats["hit"],
+        "speculative_misses": agent.speculation_stats["wasted"]
+        + agent.speculation_stats["cancelled"],
+        "early_dispatch_hits": agent.early_dispatch_stats["hit"],
+        "early_dispatch_misses": agent.early_dispatch_stats["wasted"]
+        + agent.early_dispatch_stats["cancelled"],
+    }
+
+
+def run_benchmark(
+    cassette_name: str,
+    repeat: int = 3,
+    latency_scale: float = 0.0,
+    tool_latency_scale: float = 0.0,
+    parallel_steps: Optional[bool] = None,
+    speculative_steps: bool = False,
+    early_dispatch: bool = False,
+    allocations: bool = False,
+) -> Dict[str, Any]:
+    """Replay one cassette ``repeat`` times and return the median of each measurement.
+
+    ``parallel_steps`` defaults to the mode the cassette was recorded in.
+    """
+    from ..core import model
+    from ..core.model_router import get_model_router
+
+    cassette = load_cassette(cassette_name)
+    if parallel_steps is None:
+        parallel_steps = cassette.get("parallel_steps", False)
+    runs: List[Dict[str, Any]] = []
+    with replay_environment(cassette, tool_latency_scale):
+        # Warm-up run: starts the stub MCP server and fills the tool catalog
+        for i in range(repeat + 1):
+            replay = ReplayModel(cassette, latency_scale=latency_scale)
+            for model_id in get_model_router().model_ids():
+                model.set_model(model_id, replay)
+
+            if allocations:
+                tracemalloc.start()
+            run = asyncio.run(
+                _run_once(
+                    cassette["objective"], parallel_steps, speculative_steps, early_dispatch
+                )
+            )
+            if allocations:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                run["peak_alloc_kb"] = peak / 1024
+
+            stats = replay.stats.as_dict()
+            run["planner_model_s"] = stats["seconds"].get("planner", 0.0)
+            run["executor_model_s"] = stats["seconds"].get("executor", 0.0)
+            run["tools_and_agent_s"] = run["executor_s"] - run["executor_model_s"]
+            if not (speculative_steps or early_dispatch):
+                # Prestarted steps run during planner calls, which would count
+                # the overlap twice
+                run["overhead_s"] = (
+                    run["wall_s"] - run["planner_model_s"] - run["executor_wall_s"]
+                )
+            run["model_calls"] = sum(stats["calls"].values())
+            run["planner_prompt_bytes"] = stats["prompt_bytes"].get("planner", 0)
+            run["executor_prompt_bytes"] = stats["prompt_bytes"].get("executor", 0)
+            if i > 0:
+                runs.append(run)
+
+    summary = {"cassette": cassette_name, "runs": len(runs)}
+    for key in runs[0]:
+        summary[key] = statistics.median(r[key] for r in runs)
+    return summary
+
+
+def _print_table(summaries: List[Dict[str, Any]]) -> None:
+    columns = [k for k in summaries[0] if k not in ("cassette", "runs")]
+    print(f"{'metric':<24}" + "".join(f"{s['cassette']:>20}" for s in summaries))
+    for column in columns:
+        cells = []
+        for s in summaries:
+            value = s.get(column, "")
+            cells.append(f"{value:>20.4f}" if isinstance(value, float) else f"{value:>20}")
+        print(f"{column:<24}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cassettes", nargs="*", default=DEFAULT_CASSETTES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-scale", type=float, default=0.0,
+                        help="replay recorded model latency (1.0 = as recorded)")
+    parser.add_argument("--tool-latency-scale", type=float, default=0.0,
+                        help="replay recorded tool latency (1.0 = as recorded)")
+    parser.add_argument("--parallel-steps", action="store_true", default=None,
+                        help="run independent steps concurrently (default: as recorded)")
+    parser.add_argument("--speculative-steps", action="store_true",
+                        help="run the next step while the reflection is in flight")
+    parser.add_argument("--early-dispatch", action="store_true",
+                        help="start steps while the plan is still being streamed")
+    parser.add_argument("--allocations", action="store_true",
+                        help="trace peak allocations (slows the run down)")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    summaries = [
+        run_benchmark(
+            name,
+            repeat=args.repeat,
+            latency_scale=args.latency_scale,
+            tool_latency_scale=args.tool_latency_scale,
+            parallel_steps=args.parallel_steps,
+            speculative_steps=args.speculative_steps,
+            early_dispatch=args.early_dispatch,
+            allocations=args.allocations,
+        )
+        for name in args.cassettes
+    ]
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        _print_table(summaries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Benchmark of the session storage backends.
+
+Replays the writes ``RepositorySessionManager`` makes for an agent
+conversation (one message plus one agent state sync per message, one
+flush per turn) against the file and SQLite repositories and reports
+wall time, operations per second and what is left on disk.
+
+Usage:
+    python -m strand_agent_poc.benchmarks.session_store [--sessions N]
+        [--turns N] [--messages-per-turn N] [--message-bytes N] [--json]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from strands.session.file_session_manager import FileSessionManager
+from strands.session.session_repository import SessionRepository
+from strands.types.session import Session, SessionAgent, SessionMessage, SessionType
+
+from ..core.session_manager import SQLiteSessionRepository
+
+AGENT_ID = "planner_agent"
+
+
+def _file_backend(directory: str) -> Tuple[SessionRepository, Callable[[], None]]:
+    # FileSessionManager is its own repository and writes through
+    repository = FileSessionManager(session_id="bench", storage_dir=directory)
+    return repository, lambda: None
+
+
+def _sqlite_backend(directory: str) -> Tuple[SessionRepository, Callable[[], None]]:
+    repository = SQLiteSessionRepository(os.path.join(directory, "sessions.db"))
+    return repository, repository.flush
+
+
+BACKENDS = {"file": _file_backend, "sqlite": _sqlite_backend}
+
+
+def _disk_usage(directory: str) -> Tuple[int, int, int]:
+    files = size = allocated = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            st = os.stat(os.path.join(root, name))
+            files += 1
+            size += st.st_size
+            allocated += st.st_blocks * 512
+    return files, size, allocated
+
+
+def run_backend(
+    backend: str,
+    sessions: int = 50,
+    turns: int = 10,
+    messages_per_turn: int = 4,
+    message_bytes: int = 2000,
+) -> Dict[str, Any]:
+    text = "x" * message_bytes
+    with tempfile.TemporaryDirectory(prefix=f"sessions-{backend}-") as directory:
+        repository, end_turn = BACKENDS[backend](directory)
+        ops = 0
+        start = time.perf_counter()
+        for s in range(sessions):
+            session_id = f"session-{s}"
+            repository.create_session(Session(session_id=session_id, session_type=SessionType.AGENT))
+            agent = SessionAgent(agent_id=AGENT_ID, state={}, conversation_manager_state={})
+            repository.create_agent(session_id, agent)
+            ops += 2
+            message_id = 0
+            for turn in range(turns):
+                for m in range(messages_per_turn):
+                    role = "user" if m % 2 == 0 else "assistant"
+                    message = SessionMessage(
+                        message={"role": role, "content": [{"text": text}]},
+                        message_id=message_id,
+                    )
+                    repository.create_message(session_id, AGENT_ID, message)
+                    agent.state = {"turn": turn, "messages": message_id + 1}
+                    repository.update_agent(session_id, agent)
+                    message_id += 1
+                    ops += 2
+                end_turn()
+        wall = time.perf_counter() - start
+
+        # Restoring a session lists its messages
+        start = time.perf_counter()
+        restored = len(repository.list_messages(f"session-{sessions - 1}", AGENT_ID))
+        list_s = time.perf_counter() - start
+
+        if hasattr(repository, "close"):
+            repository.close()
+        files, size, allocated = _disk_usage(directory)
+
+    return {
+        "backend": backend,
+        "wall_s": wall,
+        "ops_per_s": ops / wall if wall else 0.0,
+        "list_messages_s": list_s,
+        "restored_messages": restored,
+        "files": files,
+        "size_kb": size / 1024,
+        "allocated_kb": allocated / 1024,
+    }
+
+
+def _print_table(results: List[Dict[str, Any]]) -> None:
+    columns = [k for k in results[0] if k != "backend"]
+    print(f"{'metric':<20}" + "".join(f"{r['backend']:>16}" for r in results))
+    for column in columns:
+        cells = []
+        for r in results:
+            value = r[column]
+            cells.append(f"{value:>16.4f}" if isinstance(value, float) else f"{value:>16}")
+        print(f"{column:<20}" + "".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("backends", nargs="*", default=list(BACKENDS))
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--messages-per-turn", type=int, default=4)
+    parser.add_argument("--message-bytes", type=int, default=2000)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = [
+        run_backend(
+            backend,
+            sessions=args.sessions,
+            turns=args.turns,
+            messages_per_turn=args.messages_per_turn,
+            message_bytes=args.message_bytes,
+        )
+        for backend in args.backends
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+
+if __name__ == "__main__":
+    main()
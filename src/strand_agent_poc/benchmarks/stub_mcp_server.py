@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Stub OpenSearch MCP server that replays tool outputs from a cassette.
+
+Usage: python -m strand_agent_poc.benchmarks.stub_mcp_server <cassette>
+
+The benchmark points the MCP session pool at this server through
+OPENSEARCH_MCP_COMMAND / OPENSEARCH_MCP_ARGS. STUB_MCP_LATENCY_SCALE
+replays the recorded ``latency_ms`` of each tool (default 0).
+"""
+import asyncio
+import json
+import os
+import sys
+
+import mcp.types as types
+from mcp.server.lowlevel import Server
+from mcp.server.stdio import stdio_server
+
+from .cassette import load_cassette
+
+
+def build_server(cassette: dict, latency_scale: float = 0.0) -> Server:
+    server = Server("opensearch-mcp-stub")
+    tools = {tool["name"]: tool for tool in cassette["tools"]}
+
+    @server.list_tools()
+    async def list_tools() -> list:
+        return [
+            types.Tool(
+                name=tool["name"],
+                description=tool.get("description", ""),
+                inputSchema=tool.get("input_schema") or {"type": "object", "properties": {}},
+            )
+            for tool in tools.values()
+        ]
+
+    @server.call_tool()
+    async def call_tool(name: str, arguments: dict) -> list:
+        tool = tools.get(name)
+        if tool is None:
+            raise ValueError(f"Unknown tool: {name}")
+        if latency_scale:
+            await asyncio.sleep(tool.get("latency_ms", 0) / 1000 * latency_scale)
+
+        arguments_json = json.dumps(arguments or {}, sort_keys=True)
+        responses = tool.get("responses", [])
+        # The first response whose match is part of the call arguments wins
+        response = next(
+            (r for r in responses if r.get("match", "") in arguments_json),
+            {"output": tool.get("default_output", f"No recorded output for {name}")},
+        )
+        return [types.TextContent(type="text", text=response["output"])]
+
+    return server
+
+
+async def serve(cassette_path: str) -> None:
+    cassette = load_cassette(cassette_path)
+    server = build_server(
+        cassette, latency_scale=float(os.getenv("STUB_MCP_LATENCY_SCALE", "0"))
+    )
+    async with stdio_server() as (read_stream, write_stream):
+        await server.run(read_stream, write_stream, server.create_initialization_options())
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python -m strand_agent_poc.benchmarks.stub_mcp_server <cassette>")
+        sys.exit(1)
+    asyncio.run(serve(sys.argv[1]))
+
+
+if __name__ == "__main__":
+    main()
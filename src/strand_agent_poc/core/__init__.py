@@ -1,23 +1,140 @@
-from .plan_execute_reflect_agent import PlanExecuteReflectAgent, run_agent
-from .planner import Planner
-from .executor import executor_agent, get_executor_prompt
-from .memory_utils import (
-    query_agent_core_memory,
-    get_conversation_history,
-    save_to_memory,
-    search_memory,
-)
-from . import model
+import importlib
+from typing import TYPE_CHECKING
+
+# Public names are imported on first access (PEP 562), so importing the
+# package does not load strands, boto3, MCP or OpenSearch clients.
+_LAZY_ATTRIBUTES = {
+    "PlanExecuteReflectAgent": ".plan_execute_reflect_agent",
+    "run_agent": ".plan_execute_reflect_agent",
+    "run_agent_async": ".plan_execute_reflect_agent",
+    "run_agents": ".plan_execute_reflect_agent",
+    "run_agents_async": ".plan_execute_reflect_agent",
+    "Planner": ".planner",
+    "executor_agent": ".executor",
+    "executor_agent_async": ".executor",
+    "get_executor_prompt": ".executor",
+    "AgentEventType": ".events",
+    "MCPSessionPool": ".mcp_pool",
+    "get_mcp_pool": ".mcp_pool",
+    "shutdown_mcp_pool": ".mcp_pool",
+    "ToolCatalog": ".tool_catalog",
+    "get_tool_catalog": ".tool_catalog",
+    "ToolSelector": ".tool_selector",
+    "select_tools": ".tool_selector",
+    "ToolResultCache": ".tool_cache",
+    "get_tool_cache": ".tool_cache",
+    "SearchCoalescer": ".search_coalescer",
+    "get_search_coalescer": ".search_coalescer",
+    "AgentMetrics": ".metrics",
+    "get_agent_metrics": ".metrics",
+    "InvestigationIndex": ".investigation_index",
+    "get_investigation_index": ".investigation_index",
+    "JobStore": ".jobs",
+    "JobWorkerPool": ".jobs",
+    "SQLiteSessionRepository": ".session_manager",
+    "create_session_manager": ".session_manager",
+    "MemoryWriter": ".memory_utils",
+    "get_memory_provider": ".memory_utils",
+    "query_agent_core_memory": ".memory_utils",
+    "get_conversation_history": ".memory_utils",
+    "iter_conversation_history": ".memory_utils",
+    "get_history_cache": ".memory_utils",
+    "save_to_memory": ".memory_utils",
+    "search_memory": ".memory_utils",
+    "iter_search_memory": ".memory_utils",
+    "ModelRouter": ".model_router",
+    "get_model_router": ".model_router",
+    "model": ".model",
+}
+
+if TYPE_CHECKING:
+    from .plan_execute_reflect_agent import (
+        PlanExecuteReflectAgent,
+        run_agent,
+        run_agent_async,
+        run_agents,
+        run_agents_async,
+    )
+    from .planner import Planner
+    from .executor import executor_agent, executor_agent_async, get_executor_prompt
+    from .events import AgentEventType
+    from .mcp_pool import MCPSessionPool, get_mcp_pool, shutdown_mcp_pool
+    from .tool_catalog import ToolCatalog, get_tool_catalog
+    from .tool_selector import ToolSelector, select_tools
+    from .tool_cache import ToolResultCache, get_tool_cache
+    from .search_coalescer import SearchCoalescer, get_search_coalescer
+    from .metrics import AgentMetrics, get_agent_metrics
+    from .investigation_index import InvestigationIndex, get_investigation_index
+    from .jobs import JobStore, JobWorkerPool
+    from .session_manager import SQLiteSessionRepository, create_session_manager
+    from .memory_utils import (
+        MemoryWriter,
+        get_memory_provider,
+        query_agent_core_memory,
+        get_conversation_history,
+        iter_conversation_history,
+        get_history_cache,
+        save_to_memory,
+        search_memory,
+        iter_search_memory,
+    )
+    from .model_router import ModelRouter, get_model_router
+    from . import model
 
 __all__ = [
     "PlanExecuteReflectAgent",
     "run_agent",
+    "run_agent_async",
+    "run_agents",
+    "run_agents_async",
     "Planner",
     "executor_agent",
+    "executor_agent_async",
+    "AgentEventType",
     "get_executor_prompt",
+    "MCPSessionPool",
+    "get_mcp_pool",
+    "shutdown_mcp_pool",
+    "ToolCatalog",
+    "get_tool_catalog",
+    "ToolSelector",
+    "select_tools",
+    "ToolResultCache",
+    "get_tool_cache",
+    "SearchCoalescer",
+    "get_search_coalescer",
+    "AgentMetrics",
+    "get_agent_metrics",
+    "InvestigationIndex",
+    "get_investigation_index",
+    "JobStore",
+    "JobWorkerPool",
+    "SQLiteSessionRepository",
+    "create_session_manager",
+    "MemoryWriter",
+    "get_memory_provider",
     "query_agent_core_memory",
     "get_conversation_history",
+    "iter_conversation_history",
+    "get_history_cache",
     "save_to_memory",
     "search_memory",
+    "iter_search_memory",
+    "ModelRouter",
+    "get_model_router",
     "model",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(module_name, __name__)
+    value = module if module_name == f".{name}" else getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
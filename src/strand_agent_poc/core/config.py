@@ -0,0 +1,11 @@
+from dotenv import load_dotenv
+
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load the .env file once per process."""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
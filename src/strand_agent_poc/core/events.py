@@ -0,0 +1,65 @@
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class AgentEventType(str, Enum):
+    PLAN = "plan"
+    STEP_STARTED = "step_started"
+    TOOL_INVOKED = "tool_invoked"
+    TOKEN = "token"
+    STEP_COMPLETED = "step_completed"
+    REFLECTION = "reflection"
+    RESULT = "result"
+    ERROR = "error"
+
+
+# Receives each event as it happens; awaiting it applies backpressure to the agent
+EventSink = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+def make_event(event_type: AgentEventType, **data: Any) -> Dict[str, Any]:
+    return {"type": event_type.value, **data}
+
+
+async def stream_agent(
+    agent: Any,
+    prompt: str,
+    sink: Optional[EventSink],
+    on_text: Optional[Callable[[str], Awaitable[None]]] = None,
+    on_message: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    **context: Any,
+) -> Any:
+    """Invoke a strands Agent, forwarding token deltas and tool calls to ``sink``.
+
+    ``on_text`` additionally receives every text delta as it arrives and
+    ``on_message`` every message once it is complete. Returns the
+    AgentResult. Without a sink or callbacks this is a plain ``invoke_async``.
+    """
+    if sink is None and on_text is None and on_message is None:
+        return await agent.invoke_async(prompt)
+
+    result = None
+    async for event in agent.stream_async(prompt):
+        if "data" in event:
+            if on_text is not None:
+                await on_text(event["data"])
+            if sink is not None:
+                await sink(make_event(AgentEventType.TOKEN, delta=event["data"], **context))
+        elif "message" in event:
+            if on_message is not None:
+                await on_message(event["message"])
+            if sink is None:
+                continue
+            for block in event["message"].get("content", []):
+                if "toolUse" in block:
+                    await sink(
+                        make_event(
+                            AgentEventType.TOOL_INVOKED,
+                            tool=block["toolUse"].get("name"),
+                            input=block["toolUse"].get("input"),
+                            **context,
+                        )
+                    )
+        elif "result" in event:
+            result = event["result"]
+    return result
@@ -1,13 +1,23 @@
+import asyncio
 import json
+import time
 from typing import Mapping, Optional
-from mcp import stdio_client, StdioServerParameters
 from strands import Agent, tool
 from strands_tools import current_time
-from strands.tools.mcp import MCPClient
 import os
-from dotenv import load_dotenv
 from strands.agent.conversation_manager import SummarizingConversationManager
 from . import model
+from .config import load_env
+from .events import EventSink, stream_agent
+from .mcp_pool import get_mcp_pool
+from .metrics import agent_usage, get_agent_metrics
+from .model_router import get_model_router
+from .tool_catalog import get_tool_catalog
+from .tool_output import ToolOutputCompactor
+from .tool_cache import cache_tools
+from .search_coalescer import coalesce_tools
+from .tool_selector import select_tools
+from .index_tools import InsightType, aggregate_index, index_insight, index_insights_batch
 from strands.hooks import HookProvider, HookRegistry
 from strands.experimental.hooks import (
     BeforeToolInvocationEvent,
@@ -16,7 +26,7 @@ from strands.experimental.hooks import (
 from strands.types.traces import AttributeValue
 
 # Load environment variables
-load_dotenv()
+load_env()
 
 
 class LoggingHook(HookProvider):
@@ -37,26 +47,27 @@ class LoggingHook(HookProvider):
     # print(f"Request completed for agent: {event.result}")
 
 
-# Connect to an MCP server using stdio transport
-# Note: uvx command syntax differs by platform
-stdio_mcp_client = MCPClient(
-    lambda: stdio_client(
-        StdioServerParameters(
-            command="uvx",
-            args=["opensearch-mcp-server-py"],
-            env={
-                k: v
-                for k, v in {
-                    "OPENSEARCH_URL": os.getenv("OPENSEARCH_URL"),
-                    "OPENSEARCH_USERNAME": os.getenv("OPENSEARCH_USERNAME"),
-                    "OPENSEARCH_PASSWORD": os.getenv("OPENSEARCH_PASSWORD"),
-                    "OPENSEARCH_SSL_VERIFY": os.getenv("OPENSEARCH_SSL_VERIFY"),
-                }.items()
-                if v is not None
-            },
+class ToolTimingHook(HookProvider):
+    """Records the latency of every tool call in the agent metrics."""
+
+    def __init__(self):
+        self._started = {}
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(BeforeToolInvocationEvent, self.start)
+        registry.add_callback(AfterToolInvocationEvent, self.end)
+
+    def start(self, event: BeforeToolInvocationEvent) -> None:
+        self._started[event.tool_use["toolUseId"]] = time.perf_counter()
+
+    def end(self, event: AfterToolInvocationEvent) -> None:
+        started = self._started.pop(event.tool_use["toolUseId"], None)
+        if started is None:
+            return
+        status = "error" if event.exception or (event.result or {}).get("status") == "error" else "success"
+        get_agent_metrics().record_tool(
+            event.tool_use["name"], time.perf_counter() - started, status
         )
-    )
-)
 
 
 def get_executor_prompt() -> str:
@@ -66,6 +77,7 @@ def get_executor_prompt() -> str:
 Instructions:
 - Fully execute the given Step using the most relevant tools or reasoning.
 - Include all relevant raw tool outputs (e.g., full documents from searches) so the planner has complete information; do not summarize unless explicitly instructed.
+- To count, trend or rank documents (errors over time, top services, latency percentiles), use aggregate_index_tool instead of fetching pages of raw documents and counting them yourself.
 - Base your execution and conclusions only on the data and tool outputs available; do not rely on unstated knowledge or external facts.
 - If the available data is insufficient to complete the Step, summarize what was obtained so far and clearly state the additional information or access required to proceed (do not guess).
 - If unable to complete the Step, clearly explain what went wrong and what is needed to proceed.
@@ -74,96 +86,82 @@ Instructions:
 - Break complex searches into simpler queries when appropriate."""
 
 
-from enum import Enum
-
-class InsightType(Enum):
-    STATISTICAL_DATA = "STATISTICAL_DATA"
-    FIELD_DESCRIPTION = "FIELD_DESCRIPTION"
-    LOG_RELATED_INDEX_CHECK = "LOG_RELATED_INDEX_CHECK"
-
-@tool(
-    name="index_insight_tool",
-    description="Use this tool to get details of one index according to different task type, including STATISTICAL_DATA: the data distribution and index mapping of the index, FIELD_DESCRIPTION: The description of each column, LOG_RELATED_INDEX_CHECK: Whether the index is related to log/trace and whether it contains trace/log fields"
-)
-def index_insight(index: str, insight_type: InsightType = InsightType.LOG_RELATED_INDEX_CHECK) -> str:
-    """Get index insight for given index
-
-    API endpoint: `/_plugins/_ml/insights/${index}/{insight_type}`,
-
-    Args:
-        index: The name of the index to get insight for
-    """
-    from opensearchpy import OpenSearch
-    import json
-
-    # Create OpenSearch client
-    client = OpenSearch(
-        hosts=[os.getenv("OPENSEARCH_URL")],
-        http_auth=(os.getenv("OPENSEARCH_USERNAME"), os.getenv("OPENSEARCH_PASSWORD")),
-        use_ssl=False,
-        verify_certs=False,
-        ssl_show_warn=False
+def get_tool_prompt() -> str:
+    return get_tool_catalog().prompt()
+
+
+def _create_executor_agent(
+    tools: list, trace_id: Optional[str] = None, task: Optional[str] = None
+) -> Agent:
+    tools = [*tools, index_insight, index_insights_batch, aggregate_index]
+    if task:
+        # Only the specs of the tools relevant to the step go into the request
+        tools = select_tools(task, tools)
+    router = get_model_router()
+    return Agent(
+        # Simple lookups go to a faster model than multi-hop analysis
+        model=router.model_for_step(task) if task else router.model_for_tier("standard"),
+        agent_id="executor_agent",
+        name="Executor Agent",
+        description="Executor agent for executing planner steps",
+        system_prompt=get_executor_prompt(),
+        hooks=[LoggingHook(), ToolTimingHook(), ToolOutputCompactor()],
+        conversation_manager=SummarizingConversationManager(
+            summary_ratio=0.3,
+            preserve_recent_messages=10,
+        ),
+        trace_attributes={"trace_id": trace_id} if trace_id else None,
+        # tools to query opensearch data and indexes
+        # metadata tools are served from the shared TTL cache, parallel
+        # searches are merged into one _msearch
+        tools=coalesce_tools(cache_tools(tools)),
     )
 
-    try:
-        # Call the ML insights API
-        response = client.transport.perform_request(
-            method="GET",
-            url=f"/_plugins/_ml/insights/{index}/{insight_type.value}",
-        )
-        return json.dumps(response, indent=2)
-    except Exception as e:
-        return f"Error getting index insight for {index}: {str(e)}"
-
 
-def get_tool_prompt() -> str:
-    with stdio_mcp_client:
-        tools = stdio_mcp_client.list_tools_sync()
-        tool_descriptions = "\n".join(
-            [
-                f"Tool {i+1} - {tool.tool_name}: {tool.tool_spec}"
-                for i, tool in enumerate(tools)
-            ]
-        )
+def executor_agent(task: str, trace_id: Optional[str] = None) -> str:
+    try:
+        # Create an agent with MCP tools from a warm pooled session
+        pool = get_mcp_pool()
+        with pool.lease() as mcp_client:
+            # Get the tools from the shared catalog, listed once per session
+            tools = get_tool_catalog(pool).tools(mcp_client)
+            executor_agent = _create_executor_agent(tools, trace_id, task)
 
-        # Add index_insight tool description
-        index_insight_desc = f"Tool {len(tools)+1} - index_insight_tool: Get ML insights for a given OpenSearch index. Parameters: index (str), insight_type (STATISTICAL_DATA|FIELD_DESCRIPTION|LOG_RELATED_INDEX_CHECK, default: LOG_RELATED_INDEX_CHECK)"
+            # Add observability by wrapping the agent call
+            start = time.perf_counter()
+            agent_result = executor_agent(task)
+            get_agent_metrics().record_phase(
+                "executor", time.perf_counter() - start, agent_usage(executor_agent)
+            )
+            return str(agent_result)
+    except Exception as e:
+        error_msg = f"Error in executor agent: {str(e)}"
+        return error_msg
 
-        return f"""Available Tools:
-In this environment, you have access to the tools listed below. Use these tools to execute the given instruction, and do not reference or use any tools not listed here.
-{tool_descriptions}
-{index_insight_desc}
-No other tools are available. Do not invent tools. Only use tools to execute the instruction.
-        """
 
+async def executor_agent_async(
+    task: str,
+    trace_id: Optional[str] = None,
+    event_sink: Optional[EventSink] = None,
+) -> str:
+    """Async variant of ``executor_agent`` that does not block the event loop.
 
-def executor_agent(task: str, trace_id: Optional[str] = None) -> str:
+    When ``event_sink`` is given, token deltas and tool invocations are
+    forwarded to it while the step runs.
+    """
     try:
-        # Create an agent with MCP tools
-        with stdio_mcp_client:
-            # Get the tools from the MCP server
-            tools = stdio_mcp_client.list_tools_sync()
-
-            # TODO filter tools to only those relevant for the task
-            # ['ListIndexTool', 'IndexMappingTool', 'SearchIndexTool', 'GetShardsTool', 'ClusterHealthTool', 'CountTool', 'MsearchTool', 'ExplainTool']
-
-            executor_agent = Agent(
-                model=model.bedrock37Model,
-                agent_id="executor_agent",
-                name="Executor Agent",
-                description="Executor agent for executing planner steps",
-                system_prompt=get_executor_prompt(),
-                hooks=[LoggingHook()],
-                conversation_manager=SummarizingConversationManager(
-                    summary_ratio=0.3,
-                    preserve_recent_messages=10,
-                ),
-                trace_attributes={"trace_id": trace_id} if trace_id else None,
-                tools=[*tools, index_insight],  # tools to query opensearch data and indexes
+        pool = get_mcp_pool()
+        async with pool.lease_async() as mcp_client:
+            tools = await asyncio.to_thread(get_tool_catalog(pool).tools, mcp_client)
+            executor_agent = _create_executor_agent(tools, trace_id, task)
+
+            start = time.perf_counter()
+            agent_result = await stream_agent(
+                executor_agent, task, event_sink, source="executor", step=task
+            )
+            get_agent_metrics().record_phase(
+                "executor", time.perf_counter() - start, agent_usage(executor_agent)
             )
-
-            # Add observability by wrapping the agent call
-            agent_result = executor_agent(task)
             return str(agent_result)
     except Exception as e:
         error_msg = f"Error in executor agent: {str(e)}"
@@ -0,0 +1,235 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from strands import tool
+
+from .opensearch_client import get_opensearch_client
+from .tool_output import format_cell
+
+
+class InsightType(Enum):
+    STATISTICAL_DATA = "STATISTICAL_DATA"
+    FIELD_DESCRIPTION = "FIELD_DESCRIPTION"
+    LOG_RELATED_INDEX_CHECK = "LOG_RELATED_INDEX_CHECK"
+
+
+def _fetch_insight(index: str, insight_type: InsightType) -> Any:
+    # Call the ML insights API
+    return get_opensearch_client().transport.perform_request(
+        method="GET",
+        url=f"/_plugins/_ml/insights/{index}/{insight_type.value}",
+    )
+
+
+@tool(
+    name="index_insight_tool",
+    description="Use this tool to get details of one index according to different task type, including STATISTICAL_DATA: the data distribution and index mapping of the index, FIELD_DESCRIPTION: The description of each column, LOG_RELATED_INDEX_CHECK: Whether the index is related to log/trace and whether it contains trace/log fields"
+)
+def index_insight(index: str, insight_type: InsightType = InsightType.LOG_RELATED_INDEX_CHECK) -> str:
+    """Get index insight for given index
+
+    API endpoint: `/_plugins/_ml/insights/${index}/{insight_type}`,
+
+    Args:
+        index: The name of the index to get insight for
+    """
+    try:
+        response = _fetch_insight(index, insight_type)
+        return json.dumps(response, separators=(",", ":"), ensure_ascii=False)
+    except Exception as e:
+        return f"Error getting index insight for {index}: {str(e)}"
+
+
+@tool(
+    name="index_insights_batch_tool",
+    description="Use this tool to get details of several indices at once. It fetches every combination of the given indices and insight types concurrently in one call. Insight types are STATISTICAL_DATA: the data distribution and index mapping of the index, FIELD_DESCRIPTION: The description of each column, LOG_RELATED_INDEX_CHECK: Whether the index is related to log/trace and whether it contains trace/log fields"
+)
+def index_insights_batch(
+    indices: List[str], insight_types: Optional[List[InsightType]] = None
+) -> str:
+    """Get index insights for several indices and insight types concurrently
+
+    Args:
+        indices: The names of the indices to get insights for
+        insight_types: The insight types to fetch for every index, default: [LOG_RELATED_INDEX_CHECK]
+    """
+    insight_types = insight_types or [InsightType.LOG_RELATED_INDEX_CHECK]
+    requests = [(index, t) for index in indices for t in insight_types]
+    if not requests:
+        return "{}"
+
+    def fetch(request) -> Any:
+        try:
+            return _fetch_insight(*request)
+        except Exception as e:
+            return {"error": f"Error getting index insight for {request[0]}: {str(e)}"}
+
+    # Bounded by the client's connection pool so requests never wait on a connection
+    max_workers = min(len(requests), int(os.getenv("OPENSEARCH_POOL_MAXSIZE", "16")))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        responses = list(executor.map(fetch, requests))
+
+    insights: Dict[str, Dict[str, Any]] = {}
+    for (index, insight_type), response in zip(requests, responses):
+        insights.setdefault(index, {})[insight_type.value] = response
+    return json.dumps(insights, separators=(",", ":"), ensure_ascii=False)
+
+
+# Units date_histogram accepts as a fixed interval ("90s", "5m", "1h", "2d");
+# weeks and longer only exist as calendar intervals of one unit ("1w", "1M")
+_FIXED_INTERVAL = re.compile(r"^\d+(ms|s|m|h|d)$")
+_CALENDAR_INTERVAL = re.compile(r"^1?[wMqy]$|^(minute|hour|day|week|month|quarter|year)$")
+
+
+def build_aggregation_query(
+    time_field: str = "@timestamp",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    filter: Optional[Dict[str, Any]] = None,
+    interval: Optional[str] = None,
+    group_by: Optional[str] = None,
+    top: int = 10,
+    metric_field: Optional[str] = None,
+    percentiles: Optional[List[float]] = None,
+) -> Dict[str, Any]:
+    """Compile an aggregation request into an OpenSearch search body.
+
+    Buckets nest as time buckets > top terms > metrics, and no documents
+    are returned (``size`` 0).
+    """
+    clauses: List[Dict[str, Any]] = []
+    if start or end:
+        bounds = {"format": "strict_date_optional_time||epoch_millis"}
+        if start:
+            bounds["gte"] = start
+        if end:
+            bounds["lte"] = end
+        clauses.append({"range": {time_field: bounds}})
+    if filter:
+        clauses.append(filter)
+
+    aggs: Dict[str, Any] = {}
+    if metric_field:
+        aggs["stats"] = {"stats": {"field": metric_field}}
+        aggs["percentiles"] = {
+            "percentiles": {"field": metric_field, "percents": percentiles or [50, 95, 99]}
+        }
+    if group_by:
+        terms = {"terms": {"field": group_by, "size": top}}
+        if aggs:
+            terms["aggs"] = aggs
+        aggs = {"group": terms}
+    if interval:
+        if _FIXED_INTERVAL.match(interval):
+            histogram = {"field": time_field, "fixed_interval": interval}
+        elif _CALENDAR_INTERVAL.match(interval):
+            histogram = {"field": time_field, "calendar_interval": interval}
+        else:
+            raise ValueError(f"unsupported interval {interval!r}, use e.g. 5m, 1h, 1d or 1w")
+        bucket = {"date_histogram": histogram}
+        if aggs:
+            bucket["aggs"] = aggs
+        aggs = {"over_time": bucket}
+
+    body: Dict[str, Any] = {
+        "size": 0,
+        "track_total_hits": True,
+        "query": {"bool": {"filter": clauses}} if clauses else {"match_all": {}},
+    }
+    if aggs:
+        body["aggs"] = aggs
+    return body
+
+
+def _number(value: Any) -> Any:
+    return round(value, 3) if isinstance(value, float) else value
+
+
+def _aggregation_rows(aggs: Dict[str, Any], row: Dict[str, Any], rows: List[Dict[str, Any]], notes: List[str]) -> None:
+    if "over_time" in aggs:
+        for bucket in aggs["over_time"]["buckets"]:
+            _aggregation_rows(bucket, {**row, "time": bucket.get("key_as_string", bucket["key"])}, rows, notes)
+        return
+    if "group" in aggs:
+        group = aggs["group"]
+        if group.get("sum_other_doc_count"):
+            where = f" at {row['time']}" if "time" in row else ""
+            notes.append(f"{group['sum_other_doc_count']} docs in other groups{where}")
+        for bucket in group["buckets"]:
+            _aggregation_rows(bucket, {**row, "group": bucket.get("key_as_string", bucket["key"])}, rows, notes)
+        return
+    row = {**row, "count": aggs.get("doc_count")}
+    stats = aggs.get("stats")
+    if stats:
+        row.update({k: _number(stats.get(k)) for k in ("avg", "min", "max")})
+    for percent, value in ((aggs.get("percentiles") or {}).get("values") or {}).items():
+        row[f"p{float(percent):g}"] = _number(value)
+    rows.append(row)
+
+
+def render_aggregation_table(
+    response: Dict[str, Any], group_by: Optional[str] = None, max_rows: int = 200
+) -> str:
+    """Render an aggregation response as one table row per (time bucket, group)."""
+    total = response.get("hits", {}).get("total", {})
+    total = total.get("value") if isinstance(total, dict) else total
+    aggs = response.get("aggregations") or {}
+    rows: List[Dict[str, Any]] = []
+    notes: List[str] = []
+    _aggregation_rows({**aggs, "doc_count": total}, {}, rows, notes)
+
+    lines = [f"matched: {total} docs"]
+    columns: List[str] = []
+    for row in rows:
+        columns.extend(k for k in row if k not in columns)
+    header = [group_by if c == "group" and group_by else c for c in columns]
+    lines.append(" | ".join(header))
+    lines.extend(" | ".join(format_cell(row.get(c)) for c in columns) for row in rows[:max_rows])
+    if len(rows) > max_rows:
+        lines.append(f"[... {len(rows) - max_rows} more rows, use a longer interval or a smaller top]")
+    lines.extend(notes[:5])
+    return "\n".join(lines)
+
+
+@tool(
+    name="aggregate_index_tool",
+    description="Use this tool instead of fetching raw documents to count, trend or summarize an index. It runs one aggregation on the cluster and returns a small table: document counts per time bucket (interval, e.g. 1h), per top values of a field (group_by, e.g. resource.service.name), and avg/min/max/percentiles of a numeric field (metric_field, e.g. durationInNanos), combinable, filtered by a time range and an optional query DSL filter"
+)
+def aggregate_index(
+    index: str,
+    time_field: str = "@timestamp",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    filter: Optional[Dict[str, Any]] = None,
+    interval: Optional[str] = None,
+    group_by: Optional[str] = None,
+    top: int = 10,
+    metric_field: Optional[str] = None,
+    percentiles: Optional[List[float]] = None,
+) -> str:
+    """Aggregate an index into counts, top terms and percentiles
+
+    Args:
+        index: The name or pattern of the index to aggregate
+        time_field: The timestamp field for the time range and buckets, default: @timestamp
+        start: Start of the time range, e.g. now-7d or 2025-08-01T00:00:00Z
+        end: End of the time range, e.g. now
+        filter: A query DSL clause documents must match, e.g. {"term": {"severityText": "ERROR"}}
+        interval: Time bucket size, e.g. 5m, 1h, 1d or 1w
+        group_by: A keyword field to split counts by its top values
+        top: How many top values of group_by to return, default: 10
+        metric_field: A numeric field to get avg/min/max and percentiles of
+        percentiles: The percentiles of metric_field, default: [50, 95, 99]
+    """
+    try:
+        body = build_aggregation_query(
+            time_field, start, end, filter, interval, group_by, top, metric_field, percentiles
+        )
+        response = get_opensearch_client().search(index=index, body=body)
+        return render_aggregation_table(response, group_by)
+    except Exception as e:
+        return f"Error aggregating index {index}: {str(e)}"
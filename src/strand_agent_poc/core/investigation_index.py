@@ -0,0 +1,243 @@
+import hashlib
+import json
+import logging
+import math
+import operator
+import os
+import re
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional, searches fall back to pure Python
+    np = None
+
+logger = logging.getLogger(__name__)
+
+OBJECTIVE = "objective"
+STEP = "step"
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:[._-][a-z0-9]+)*")
+_STOPWORDS = frozenset(
+    "a an the to of in on for from by with over at and or is are be its it this that "
+    "all any each per".split()
+)
+
+
+def key_terms(text: str) -> frozenset:
+    """Words of a text that change its meaning: everything but stopwords."""
+    return frozenset(t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS)
+
+
+class Embedder(Protocol):
+    """Maps a text to a vector of ``dim`` floats; vectors are compared by cosine."""
+
+    name: str
+    dim: int
+
+    def embed(self, text: str) -> Sequence[float]: ...
+
+
+class HashingEmbedder:
+    """Deterministic offline embedder: hashed word unigrams and bigrams, without stopwords.
+
+    Needs no model or network, and the same text always gets the same
+    vector, so the index can be rebuilt and tested offline. Similar texts
+    score high when they share most words, such as the same index, service
+    and tool names.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self.name = f"hashing-{dim}"
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+        return h % self.dim, 1.0 if (h >> 63) & 1 else -1.0
+
+    def embed(self, text: str) -> array:
+        tokens = [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+        vector = array("f", bytes(4 * self.dim))
+        features = [(t, 1.0) for t in tokens]
+        features += [(f"{a} {b}", 0.5) for a, b in zip(tokens, tokens[1:])]
+        for feature, weight in features:
+            i, sign = self._bucket(feature)
+            vector[i] += sign * weight
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm:
+            for i in range(self.dim):
+                vector[i] /= norm
+        return vector
+
+
+class InvestigationIndex:
+    """Similarity index over completed objectives and step results.
+
+    Vectors are kept in one flat ``array('f')`` (``dim`` floats per record)
+    and searched by brute force, with numpy when it is installed. With a
+    ``directory`` the index is persisted append-only: raw float32 vectors
+    in ``vectors.f32`` and one JSON record per line in ``records.jsonl``.
+    """
+
+    def __init__(self, directory: Optional[str] = None, embedder: Optional[Embedder] = None):
+        self.directory = directory
+        self.embedder = embedder or HashingEmbedder()
+        self.dim = self.embedder.dim
+        self._vectors = array("f")
+        self._records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        if directory:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _paths(self) -> Tuple[str, str, str]:
+        return (
+            os.path.join(self.directory, "meta.json"),
+            os.path.join(self.directory, "vectors.f32"),
+            os.path.join(self.directory, "records.jsonl"),
+        )
+
+    def _load(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        meta_path, vectors_path, records_path = self._paths()
+        meta = {"embedder": self.embedder.name, "dim": self.dim}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                if json.load(f) != meta:
+                    # Vectors of another embedder are not comparable
+                    logger.warning(
+                        "Investigation index %s was built by another embedder, starting over",
+                        self.directory,
+                    )
+                    for path in (vectors_path, records_path):
+                        if os.path.exists(path):
+                            os.remove(path)
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+        if not os.path.exists(records_path):
+            return
+        with open(records_path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        with open(vectors_path, "rb") as f:
+            self._vectors.frombytes(f.read())
+        # A crash between the two appends leaves one side longer
+        count = min(len(records), len(self._vectors) // self.dim)
+        self._records = records[:count]
+        del self._vectors[count * self.dim :]
+
+    def add(self, kind: str, text: str, scope: Optional[str] = None, **fields: Any) -> None:
+        record = {"kind": kind, "text": text, "scope": scope, "created_at": time.time(), **fields}
+        vector = array("f", self.embedder.embed(text))
+        if len(vector) != self.dim:
+            raise ValueError(f"Embedder returned {len(vector)} floats, expected {self.dim}")
+        with self._lock:
+            self._records.append(record)
+            self._vectors.extend(vector)
+            if self.directory:
+                _, vectors_path, records_path = self._paths()
+                with open(vectors_path, "ab") as f:
+                    vector.tofile(f)
+                with open(records_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def add_investigation(
+        self,
+        objective: str,
+        steps: List[str],
+        step_results: List[Dict[str, Any]],
+        result: str,
+        scope: Optional[str] = None,
+    ) -> None:
+        """Index a finished objective with the steps it ran and their results.
+
+        ``step_results`` are ``{"input", "result"}`` records; each is also
+        indexed on its own. ``scope`` (such as the session id) is stored with
+        the records so searches can be limited to it.
+        """
+        self.add(OBJECTIVE, objective, scope, steps=steps, result=result)
+        for step in step_results:
+            self.add(STEP, step["input"], scope, result=step["result"], objective=objective)
+
+    def search(
+        self,
+        text: str,
+        kind: Optional[str] = None,
+        k: int = 3,
+        min_score: float = 0.0,
+        max_age: Optional[float] = None,
+        scope: Optional[str] = None,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return up to ``k`` (cosine similarity, record) pairs, best first.
+
+        With a ``scope`` only the records indexed under it are searched.
+        """
+        query = array("f", self.embedder.embed(text))
+        with self._lock:
+            records = list(self._records)
+            vectors = self._vectors[: len(records) * self.dim]
+        if not records:
+            return []
+
+        if np is not None:
+            matrix = np.frombuffer(vectors, dtype=np.float32).reshape(len(records), self.dim)
+            scores = (matrix @ np.frombuffer(query, dtype=np.float32)).tolist()
+        else:
+            view = memoryview(vectors)
+            dim = self.dim
+            scores = [
+                sum(map(operator.mul, query, view[i * dim : (i + 1) * dim]))
+                for i in range(len(records))
+            ]
+
+        cutoff = time.time() - max_age if max_age is not None else None
+        matches = [
+            (score, record)
+            for score, record in zip(scores, records)
+            if score >= min_score
+            and (kind is None or record["kind"] == kind)
+            and (scope is None or record.get("scope") == scope)
+            and (cutoff is None or record["created_at"] >= cutoff)
+        ]
+        matches.sort(key=lambda m: m[0], reverse=True)
+        return matches[:k]
+
+    def find_step_result(
+        self,
+        step: str,
+        min_score: float = 0.9,
+        max_age: Optional[float] = None,
+        scope: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Return a recent step record that asks the same as ``step``.
+
+        Similar texts about another index or service score high as well, so
+        a candidate must also have the same key terms; only wording such as
+        articles and prepositions may differ.
+        """
+        terms = key_terms(step)
+        matches = self.search(step, kind=STEP, k=5, min_score=min_score, max_age=max_age, scope=scope)
+        for _, record in matches:
+            if key_terms(record["text"]) == terms:
+                return record
+        return None
+
+
+_investigation_index: Optional[InvestigationIndex] = None
+_investigation_index_lock = threading.Lock()
+
+
+def get_investigation_index() -> Optional[InvestigationIndex]:
+    """Return the process-wide index, or None when INVESTIGATION_INDEX_DIR is not set."""
+    global _investigation_index
+    directory = os.getenv("INVESTIGATION_INDEX_DIR")
+    if not directory:
+        return None
+    with _investigation_index_lock:
+        if _investigation_index is None:
+            _investigation_index = InvestigationIndex(directory)
+        return _investigation_index
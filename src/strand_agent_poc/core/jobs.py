@@ -0,0 +1,289 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import aclosing, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS job_steps (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    step TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (job_id, seq)
+);
+"""
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+
+class JobStore:
+    """Durable SQLite store of objective jobs and their completed steps."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # BEGIN IMMEDIATE takes the database write lock up front, so a claim
+        # never interleaves with another writer
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def submit(self, request: Dict[str, Any], max_queued: Optional[int] = None) -> str:
+        job_id = os.urandom(16).hex()
+        with self._transaction():
+            if max_queued is not None:
+                (queued,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)
+                ).fetchone()
+                if queued >= max_queued:
+                    raise QueueFullError(f"Job queue is full ({queued} queued)")
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, request, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(request, ensure_ascii=False), time.time()),
+            )
+        return job_id
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job as running and return it."""
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ?",
+                (RUNNING, time.time(), row["id"]),
+            )
+        return self.get(row["id"])
+
+    def add_step(self, job_id: str, step: str, result: str) -> None:
+        with self._transaction():
+            self._conn.execute(
+                "INSERT INTO job_steps (job_id, seq, step, result, created_at) "
+                "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, ? FROM job_steps WHERE job_id = ?",
+                (job_id, step, result, time.time(), job_id),
+            )
+
+    def finish(
+        self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None
+    ) -> None:
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+
+    def request_cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued job, or flag a running one; returns the resulting status."""
+        with self._transaction():
+            row = self._conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            if row["status"] == QUEUED:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ?",
+                    (CANCELLED, time.time(), job_id),
+                )
+                return CANCELLED
+            if row["status"] == RUNNING:
+                self._conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+            return row["status"]
+
+    def requeue_interrupted(self) -> int:
+        """Put jobs that were running when the process stopped back in the queue.
+
+        Assumes one worker pool per database file.
+        """
+        with self._transaction():
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE status = ? AND cancel_requested = 1",
+                (CANCELLED, time.time(), RUNNING),
+            )
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING)
+            )
+            # Steps of the interrupted attempt are re-executed
+            self._conn.execute(
+                "DELETE FROM job_steps WHERE job_id IN (SELECT id FROM jobs WHERE status = ?)",
+                (QUEUED,),
+            )
+            return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            (steps,) = self._conn.execute(
+                "SELECT COUNT(*) FROM job_steps WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        job = dict(row)
+        job["request"] = json.loads(job["request"])
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        job["steps_completed"] = steps
+        return job
+
+    def steps(self, job_id: str, after: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, step, result, created_at FROM job_steps "
+                "WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Runs one job request and yields agent events (see core.events)
+JobRunner = Callable[[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]
+
+
+class JobWorkerPool:
+    """Runs queued jobs on ``workers`` asyncio workers of the current event loop.
+
+    Each worker runs one objective at a time, so ``workers`` bounds the
+    objectives run by the pool; a burst of submissions waits in the store.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        runner: JobRunner,
+        workers: int = 4,
+        poll_interval: float = 1.0,
+    ):
+        self.store = store
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        recovered = self.store.requeue_interrupted()
+        if recovered:
+            logger.info("Re-queued %d interrupted jobs", recovered)
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Stop the workers; jobs still running are re-queued by the next ``start``."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a submission."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        status = self.store.request_cancel(job_id)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        return status
+
+    async def _worker(self) -> None:
+        while True:
+            job = self.store.claim_next()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._run(job))
+            self._running[job["id"]] = task
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.done():
+                    # The pool is stopping: leave the job to be re-queued on restart
+                    task.cancel()
+                    raise
+            finally:
+                self._running.pop(job["id"], None)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        try:
+            async with aclosing(self.runner(job["request"])) as events:
+                async for event in events:
+                    if event["type"] == "step_completed":
+                        self.store.add_step(job_id, event["step"], str(event.get("result", "")))
+                    elif event["type"] == "result":
+                        self.store.finish(job_id, SUCCEEDED, result=event["content"])
+                        return
+                    elif event["type"] == "error":
+                        self.store.finish(job_id, FAILED, error=event["content"])
+                        return
+            self.store.finish(job_id, FAILED, error="Agent stopped without a result")
+        except asyncio.CancelledError:
+            current = self.store.get(job_id)
+            if current is not None and current["cancel_requested"]:
+                self.store.finish(job_id, CANCELLED)
+            raise
+        except Exception as e:
+            logger.exception("Job %s failed", job_id)
+            self.store.finish(job_id, FAILED, error=str(e))
+
+
+def default_job_store() -> JobStore:
+    return JobStore(os.getenv("JOB_DB_PATH", "./jobs.db"))
@@ -0,0 +1,325 @@
+import asyncio
+import atexit
+import logging
+import os
+import shlex
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from .config import load_env
+from .metrics import get_agent_metrics
+
+if TYPE_CHECKING:
+    from strands.tools.mcp import MCPClient
+
+load_env()
+
+logger = logging.getLogger(__name__)
+
+# Errors of the MCP session or its transport, matched by name so the mcp and
+# anyio modules are not imported for them
+_MCP_ERROR_TYPES = frozenset(
+    {"MCPClientInitializationError", "McpError", "ClosedResourceError", "BrokenResourceError", "EndOfStream"}
+)
+
+
+def is_mcp_error(error: Optional[BaseException]) -> bool:
+    """Whether an error (or one it was raised from) comes from the MCP session."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if type(error).__name__ in _MCP_ERROR_TYPES or isinstance(error, (BrokenPipeError, ConnectionError)):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+OPENSEARCH_ENV_KEYS = (
+    "OPENSEARCH_URL",
+    "OPENSEARCH_USERNAME",
+    "OPENSEARCH_PASSWORD",
+    "OPENSEARCH_SSL_VERIFY",
+)
+
+
+@dataclass(frozen=True)
+class MCPServerConfig:
+    """Launch configuration of a stdio MCP server; hashable so it can key caches."""
+
+    command: str
+    args: Tuple[str, ...] = ()
+    env: Tuple[Tuple[str, str], ...] = ()
+
+    @classmethod
+    def opensearch_from_env(cls) -> "MCPServerConfig":
+        env = {k: os.getenv(k) for k in OPENSEARCH_ENV_KEYS}
+        return cls(
+            command=os.getenv("OPENSEARCH_MCP_COMMAND", "uvx"),
+            args=tuple(
+                shlex.split(os.getenv("OPENSEARCH_MCP_ARGS", "opensearch-mcp-server-py"))
+            ),
+            env=tuple(sorted((k, v) for k, v in env.items() if v is not None)),
+        )
+
+    def create_client(self) -> "MCPClient":
+        from mcp import stdio_client, StdioServerParameters
+        from strands.tools.mcp import MCPClient
+
+        # Note: uvx command syntax differs by platform
+        return MCPClient(
+            lambda: stdio_client(
+                StdioServerParameters(
+                    command=self.command,
+                    args=list(self.args),
+                    env=dict(self.env),
+                )
+            )
+        )
+
+
+class _PooledSession:
+    """One long-lived MCP server process and its client."""
+
+    def __init__(self, config: MCPServerConfig):
+        self.config = config
+        self.client: Optional["MCPClient"] = None
+        self.leases = 0
+        self.restarts = 0
+        # Replaced by a new session; stopped once its last lease is released
+        self.retired = False
+        self.last_health_check = 0.0
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        client = self.config.create_client()
+        client.start()
+        self.client = client
+        self.last_health_check = time.monotonic()
+
+    def stop(self) -> None:
+        client, self.client = self.client, None
+        if client is None:
+            return
+        try:
+            client.stop(None, None, None)
+        except Exception as e:
+            logger.warning("Error stopping MCP session: %s", e)
+
+    def is_alive(self) -> bool:
+        # MCPClient runs the server session on a background thread that exits
+        # when the server process dies or the transport breaks.
+        thread = getattr(self.client, "_background_thread", None)
+        return thread is not None and thread.is_alive()
+
+    def ping(self) -> bool:
+        try:
+            self.client.list_tools_sync()
+            return True
+        except Exception as e:
+            logger.warning("MCP session health check failed: %s", e)
+            return False
+
+
+class MCPSessionPool:
+    """Process-wide pool of warm MCP server sessions.
+
+    Sessions are started on first lease and kept running until ``shutdown``.
+    A session is shared by concurrent leases; ``max_leases`` bounds the total
+    number of callers using the pool at the same time.
+    """
+
+    def __init__(
+        self,
+        config: MCPServerConfig,
+        size: int = 1,
+        max_leases: int = 8,
+        health_check_interval: float = 30.0,
+    ):
+        self.config = config
+        self.health_check_interval = health_check_interval
+        self._sessions: List[_PooledSession] = [
+            _PooledSession(config) for _ in range(max(1, size))
+        ]
+        # Replaced sessions that still have leases
+        self._retiring: List[_PooledSession] = []
+        self._lease_slots = threading.BoundedSemaphore(max_leases)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator["MCPClient"]:
+        """Borrow a started MCP client for the duration of the ``with`` block."""
+        session = self._acquire(timeout)
+        error = None
+        try:
+            yield session.client
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(session, error)
+
+    @asynccontextmanager
+    async def lease_async(
+        self, timeout: Optional[float] = None
+    ) -> AsyncIterator["MCPClient"]:
+        """Async variant of ``lease``; waiting and session start-up run off the event loop."""
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self._acquire, timeout))
+        try:
+            session = await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            # The worker thread may still obtain a session; hand it straight back
+            acquiring.add_done_callback(
+                lambda f: f.exception() is None and self._release(f.result(), None)
+            )
+            raise
+        error = None
+        try:
+            yield session.client
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            self._release(session, error)
+
+    def _acquire(self, timeout: Optional[float]) -> _PooledSession:
+        start = time.perf_counter()
+        if not self._lease_slots.acquire(timeout=timeout):
+            raise TimeoutError("Timed out waiting for an MCP session lease")
+        try:
+            session = self._checkout()
+        except Exception:
+            self._lease_slots.release()
+            raise
+        # Includes the session start-up or health check done by the checkout
+        get_agent_metrics().record_mcp_acquire(time.perf_counter() - start)
+        return session
+
+    def _release(self, session: _PooledSession, error: Optional[BaseException]) -> None:
+        self._drop_lease(session, suspect=is_mcp_error(error))
+        self._lease_slots.release()
+
+    def _drop_lease(self, session: _PooledSession, suspect: bool = False) -> None:
+        with self._lock:
+            session.leases -= 1
+            if suspect:
+                # Re-validate the session before it is handed out again
+                session.last_health_check = 0.0
+            drained = session.retired and session.leases == 0
+            if drained:
+                self._retiring.remove(session)
+        if drained:
+            with session.lock:
+                session.stop()
+
+    def _checkout(self) -> _PooledSession:
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("MCP session pool has been shut down")
+                session = min(self._sessions, key=lambda s: s.leases)
+                session.leases += 1
+            try:
+                checked_out = self._ensure_healthy(session)
+            except Exception:
+                self._drop_lease(session)
+                raise
+            if checked_out is not None:
+                return checked_out
+            # Replaced while this caller waited for its health check
+            self._drop_lease(session)
+
+    def _ensure_healthy(self, session: _PooledSession) -> Optional[_PooledSession]:
+        """Return the session to lease (``session`` or its replacement), or None if it was retired."""
+        with session.lock:
+            if session.retired:
+                return None
+            if session.client is None:
+                session.start()
+                return session
+
+            healthy = session.is_alive()
+            now = time.monotonic()
+            if healthy and now - session.last_health_check >= self.health_check_interval:
+                healthy = session.ping()
+                session.last_health_check = now
+            if healthy:
+                return session
+
+            with self._lock:
+                in_use = session.leases > 1
+            if not in_use:
+                logger.warning("Restarting unhealthy MCP session")
+                session.stop()
+                session.restarts += 1
+                session.start()
+                return session
+
+            # Other leases are still using the client: start a new session for
+            # this and later callers, and stop the old one once they are done
+            logger.warning("Replacing unhealthy MCP session")
+            replacement = _PooledSession(self.config)
+            replacement.restarts = session.restarts + 1
+            replacement.start()
+            with self._lock:
+                self._sessions[self._sessions.index(session)] = replacement
+                replacement.leases += 1
+                session.leases -= 1
+                session.retired = True
+                if session.leases:
+                    self._retiring.append(session)
+            if not session.leases:
+                session.stop()
+            return replacement
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "started": sum(1 for s in self._sessions if s.client is not None),
+                "leases": sum(s.leases for s in self._sessions),
+                "restarts": sum(s.restarts for s in self._sessions),
+                "retiring": len(self._retiring),
+            }
+
+    def shutdown(self) -> None:
+        """Stop every MCP server process; further leases will fail."""
+        with self._lock:
+            self._closed = True
+            sessions = self._sessions + self._retiring
+        for session in sessions:
+            with session.lock:
+                session.stop()
+
+
+_default_pool: Optional[MCPSessionPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_mcp_pool() -> MCPSessionPool:
+    """Return the process-wide OpenSearch MCP session pool, creating it on first use."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = MCPSessionPool(
+                MCPServerConfig.opensearch_from_env(),
+                size=int(os.getenv("MCP_POOL_SIZE", "1")),
+                max_leases=int(os.getenv("MCP_POOL_MAX_LEASES", "8")),
+                health_check_interval=float(
+                    os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30")
+                ),
+            )
+            atexit.register(_default_pool.shutdown)
+        return _default_pool
+
+
+def shutdown_mcp_pool() -> None:
+    """Shut down the process-wide pool; the next ``get_mcp_pool`` starts a new one."""
+    global _default_pool
+    with _default_pool_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -1,11 +1,57 @@
+import asyncio
 import json
-from typing import List, Dict, Any, Optional
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Iterator, List, Dict, Any, Optional, Tuple
 from strands_tools.agent_core_memory import AgentCoreMemoryToolProvider
 
+from .metrics import get_agent_metrics
+
+logger = logging.getLogger(__name__)
+
 MEMORY_ID = "memory_anx9d-xl4QUwBOS0"
 ACTOR_ID = "jiaruj"
 NAMESPACE = "default"
 
+# Each provider owns a boto client, so providers are kept per session
+# instead of being built for every call
+MAX_CACHED_PROVIDERS = int(os.getenv("MEMORY_MAX_PROVIDERS", "256"))
+_providers: "OrderedDict[Tuple[Any, ...], AgentCoreMemoryToolProvider]" = OrderedDict()
+_providers_lock = threading.Lock()
+
+
+def get_memory_provider(
+    session_id: str,
+    memory_id: str = MEMORY_ID,
+    actor_id: str = ACTOR_ID,
+    namespace: str = NAMESPACE,
+    region: Optional[str] = None,
+    boto_session: Optional[Any] = None,
+) -> AgentCoreMemoryToolProvider:
+    """Return the cached AgentCoreMemoryToolProvider of a session, creating it on first use."""
+    key = (session_id, memory_id, actor_id, namespace, region, boto_session)
+    with _providers_lock:
+        provider = _providers.get(key)
+        if provider is None:
+            provider = AgentCoreMemoryToolProvider(
+                boto_session=boto_session,
+                memory_id=memory_id,
+                actor_id=actor_id,
+                session_id=session_id,
+                namespace=namespace,
+                region=region,
+            )
+            _providers[key] = provider
+            if len(_providers) > MAX_CACHED_PROVIDERS:
+                _providers.popitem(last=False)
+        else:
+            _providers.move_to_end(key)
+        return provider
+
 
 def query_agent_core_memory(
     session_id: str,
@@ -25,12 +71,7 @@ def query_agent_core_memory(
     Returns:
         Dict containing the result from agent core memory
     """
-    provider = AgentCoreMemoryToolProvider(
-        memory_id=MEMORY_ID,
-        actor_id=ACTOR_ID,
-        session_id=session_id,
-        namespace=NAMESPACE,
-    )
+    provider = get_memory_provider(session_id)
 
     agent_core_memory = provider.agent_core_memory
 
@@ -43,6 +84,254 @@ def query_agent_core_memory(
     return agent_core_memory(**kwargs)
 
 
+class MemoryWriter:
+    """Write-behind buffer of the interactions of one session.
+
+    ``record`` only buffers; the buffered interactions are written as one
+    AgentCore event per batch, in a worker thread, once ``batch_size`` of
+    them are buffered or ``flush_interval`` seconds after the first one.
+    Batches are written one at a time, in order. A failed batch is retried
+    ``max_retries`` times with exponential backoff, then dropped and
+    logged. Await ``flush`` when the objective completes; with a timeout it
+    returns early and the remaining batches are written in the background.
+    """
+
+    def __init__(
+        self,
+        provider: AgentCoreMemoryToolProvider,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        max_buffered: int = 1000,
+        flush_timeout: Optional[float] = None,
+    ):
+        self.provider = provider
+        self.batch_size = batch_size or int(os.getenv("MEMORY_BATCH_SIZE", "20"))
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else float(os.getenv("MEMORY_FLUSH_INTERVAL", "2.0"))
+        )
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_buffered = max_buffered
+        self.flush_timeout = (
+            flush_timeout
+            if flush_timeout is not None
+            else float(os.getenv("MEMORY_FLUSH_TIMEOUT", "5.0"))
+        )
+        self.dropped = 0
+        self._buffer: List[str] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._draining: Optional[asyncio.Task] = None
+
+    def record(self, data: Dict[str, Any]) -> None:
+        """Buffer one interaction; call from the event loop."""
+        self._buffer.append(json.dumps(data, ensure_ascii=False))
+        if len(self._buffer) > self.max_buffered:
+            # Memory is unreachable for a while: keep the newest interactions
+            del self._buffer[0]
+            self.dropped += 1
+        if len(self._buffer) >= self.batch_size:
+            self._start_drain()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.flush_interval, self._start_drain
+            )
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything buffered and wait until it is written.
+
+        Returns False if it is still being written after ``timeout`` seconds.
+        """
+        try:
+            await asyncio.wait_for(self._wait_drained(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def _wait_drained(self) -> None:
+        self._start_drain()
+        while self._draining is not None and not self._draining.done():
+            # Shielded: a flush that times out leaves the writes running
+            await asyncio.shield(self._draining)
+            self._start_drain()
+
+    def _start_drain(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer and (self._draining is None or self._draining.done()):
+            self._draining = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self) -> None:
+        while self._buffer:
+            batch = self._buffer[: self.batch_size]
+            del self._buffer[: self.batch_size]
+            await self._write(batch)
+
+    async def _write(self, batch: List[str]) -> None:
+        start = time.perf_counter()
+        status = "success"
+        for attempt in range(self.max_retries + 1):
+            try:
+                await asyncio.to_thread(self._create_event, batch)
+                get_history_cache().mark_stale(self.provider.session_id)
+                break
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.warning(
+                        "Dropping %d memory records of session %s: %s",
+                        len(batch),
+                        self.provider.session_id,
+                        e,
+                    )
+                    self.dropped += len(batch)
+                    status = "error"
+                    break
+                await asyncio.sleep(self.retry_backoff * 2**attempt)
+        get_agent_metrics().record_memory_write(time.perf_counter() - start, len(batch), status)
+
+    def _create_event(self, batch: List[str]) -> None:
+        # Same payload as provider.create_event, with one entry per interaction
+        provider = self.provider
+        provider.bedrock_agent_core_client.create_event(
+            memoryId=provider.memory_id,
+            actorId=provider.actor_id,
+            sessionId=provider.session_id,
+            eventTimestamp=datetime.now(timezone.utc),
+            payload=[
+                {"conversational": {"content": {"text": text}, "role": "ASSISTANT"}}
+                for text in batch
+            ],
+        )
+
+
+def _parse_text(text: str) -> Dict[str, Any]:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # 如果不是JSON格式，直接添加文本
+        return {"text": text}
+
+
+def _event_texts(event: Dict[str, Any]) -> List[str]:
+    # An event holds one interaction per payload entry (see MemoryWriter)
+    return [
+        item["conversational"]["content"]["text"]
+        for item in event.get("payload", [])
+        if "conversational" in item
+    ]
+
+
+def iter_session_events(
+    provider: AgentCoreMemoryToolProvider, page_size: int = 50
+) -> Iterator[Dict[str, Any]]:
+    """Yield the raw events of the provider's session one page at a time, newest first."""
+    next_token = None
+    while True:
+        kwargs = {"nextToken": next_token} if next_token else {}
+        response = provider.bedrock_agent_core_client.list_events(
+            memoryId=provider.memory_id,
+            actorId=provider.actor_id,
+            sessionId=provider.session_id,
+            includePayloads=True,
+            maxResults=page_size,
+            **kwargs,
+        )
+        yield from response.get("events", [])
+        next_token = response.get("nextToken")
+        if not next_token:
+            return
+
+
+def iter_conversation_history(session_id: str, page_size: int = 50) -> Iterator[Dict[str, Any]]:
+    """
+    按页读取会话历史记录, 从最新的开始
+
+    Args:
+        session_id: 会话ID
+        page_size: 每页的事件数
+
+    Yields:
+        Conversation steps, newest first
+    """
+    for event in iter_session_events(get_memory_provider(session_id), page_size):
+        for text in reversed(_event_texts(event)):
+            yield _parse_text(text)
+
+
+class HistoryCache:
+    """Read-through cache of session histories.
+
+    ``load`` pages through the session's events only until it reaches the
+    newest event already cached, so a refresh costs one request when
+    nothing is new; within ``max_age`` seconds of the last refresh the
+    cached history is returned without a request. Relies on ListEvents
+    returning the newest events first.
+    """
+
+    def __init__(self, max_sessions: int = 128, max_age: float = 5.0):
+        self.max_sessions = max_sessions
+        self.max_age = max_age
+        self._entries: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(
+        self, provider: AgentCoreMemoryToolProvider, refresh: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Return the session's history, oldest first."""
+        key = (provider.memory_id, provider.actor_id, provider.session_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {"steps": [], "event_ids": set(), "lock": threading.Lock(), "loaded_at": None}
+                self._entries[key] = entry
+                if len(self._entries) > self.max_sessions:
+                    self._entries.popitem(last=False)
+            else:
+                self._entries.move_to_end(key)
+
+        with entry["lock"]:
+            fresh = entry["loaded_at"] is not None and (
+                time.monotonic() - entry["loaded_at"] < self.max_age
+            )
+            if refresh or not fresh:
+                new_events = []
+                for event in iter_session_events(provider):
+                    if event["eventId"] in entry["event_ids"]:
+                        break
+                    new_events.append(event)
+                for event in reversed(new_events):
+                    entry["event_ids"].add(event["eventId"])
+                    entry["steps"].extend(_parse_text(text) for text in _event_texts(event))
+                entry["loaded_at"] = time.monotonic()
+            return list(entry["steps"])
+
+    def mark_stale(self, session_id: str) -> None:
+        """Make the next ``load`` of the session look for new events."""
+        with self._lock:
+            for key, entry in self._entries.items():
+                if key[2] == session_id:
+                    entry["loaded_at"] = None
+
+
+_history_cache: Optional[HistoryCache] = None
+_history_cache_lock = threading.Lock()
+
+
+def get_history_cache() -> HistoryCache:
+    global _history_cache
+    with _history_cache_lock:
+        if _history_cache is None:
+            _history_cache = HistoryCache(
+                max_sessions=int(os.getenv("HISTORY_CACHE_SESSIONS", "128")),
+                max_age=float(os.getenv("HISTORY_CACHE_MAX_AGE", "5.0")),
+            )
+        return _history_cache
+
+
 def get_conversation_history(session_id: str) -> List[Dict[str, Any]]:
     """
     获取指定会话的历史记录
@@ -51,20 +340,9 @@ def get_conversation_history(session_id: str) -> List[Dict[str, Any]]:
         session_id: 会话ID
 
     Returns:
-        List of conversation steps
+        List of conversation steps, oldest first
     """
-    result = query_agent_core_memory(session_id, action="list")
-
-    if result.get("status") == "success" and result.get("content"):
-        steps = []
-        for item in result["content"]:
-            try:
-                steps.append(json.loads(item["text"]))
-            except json.JSONDecodeError:
-                # 如果不是JSON格式，直接添加文本
-                steps.append({"text": item["text"]})
-        return steps
-    return []
+    return get_history_cache().load(get_memory_provider(session_id))
 
 
 def save_to_memory(session_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
@@ -82,6 +360,42 @@ def save_to_memory(session_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
     return query_agent_core_memory(session_id, action="record", content=content)
 
 
+def iter_search_memory(
+    session_id: str, query: str, page_size: int = 20, max_results: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    按页在agent core memory中搜索数据
+
+    Args:
+        session_id: 会话ID
+        query: 搜索查询
+        page_size: 每页的结果数
+        max_results: 最多返回的结果数
+
+    Yields:
+        Matching results, most relevant first
+    """
+    provider = get_memory_provider(session_id)
+    next_token = None
+    returned = 0
+    while True:
+        response = provider.retrieve_memory_records(
+            memory_id=provider.memory_id,
+            namespace=provider.namespace,
+            search_query=query,
+            max_results=page_size,
+            next_token=next_token,
+        )
+        for record in response.get("memoryRecordSummaries", []):
+            yield _parse_text(record["content"]["text"])
+            returned += 1
+            if max_results is not None and returned >= max_results:
+                return
+        next_token = response.get("nextToken")
+        if not next_token:
+            return
+
+
 def search_memory(session_id: str, query: str) -> List[Dict[str, Any]]:
     """
     在agent core memory中搜索数据
@@ -93,14 +407,4 @@ def search_memory(session_id: str, query: str) -> List[Dict[str, Any]]:
     Returns:
         List of matching results
     """
-    result = query_agent_core_memory(session_id, action="search", query=query)
-
-    if result.get("status") == "success" and result.get("content"):
-        matches = []
-        for item in result["content"]:
-            try:
-                matches.append(json.loads(item["text"]))
-            except json.JSONDecodeError:
-                matches.append({"text": item["text"]})
-        return matches
-    return []
+    return list(iter_search_memory(session_id, query))
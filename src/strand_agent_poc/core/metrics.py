@@ -0,0 +1,312 @@
+import bisect
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds; model calls dominate, so the buckets reach well past a minute
+DEFAULT_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class AgentMetrics:
+    """Per-phase latency and token metrics of the agent.
+
+    Values are kept in process for the Prometheus ``/metrics`` endpoint and
+    mirrored to OpenTelemetry instruments on the global meter provider, which
+    ``StrandsTelemetry.setup_meter`` configures.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], Dict[Labels, float]]]] = {}
+        self._otel: Dict[str, Any] = {}
+        self._otel_meter: Any = None
+        self._lock = threading.Lock()
+
+    # Recording
+
+    def observe(self, name: str, value: float, description: str = "", unit: str = "s", **labels: Any) -> None:
+        """Record a value of histogram ``name`` (latencies are in seconds)."""
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self.buckets)
+            histogram.observe(value)
+            self._help.setdefault(name, description)
+        instrument = self._otel_instrument("histogram", name, description, unit)
+        if instrument is not None:
+            instrument.record(value, attributes=dict(key))
+
+    def add(self, name: str, value: float = 1, description: str = "", unit: str = "1", **labels: Any) -> None:
+        """Increase counter ``name``; the exported name gets a ``_total`` suffix."""
+        if value <= 0:
+            return
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            self._help.setdefault(name, description)
+        instrument = self._otel_instrument("counter", name, description, unit)
+        if instrument is not None:
+            instrument.add(value, attributes=dict(key))
+
+    def register_gauge(self, name: str, description: str, callback: Callable[[], Dict[Labels, float]]) -> None:
+        """Register a gauge read at scrape time; ``callback`` maps label tuples to values."""
+        with self._lock:
+            self._gauges[name] = (description, callback)
+        meter = self._meter()
+        if meter is None:
+            return
+        try:
+            from opentelemetry.metrics import Observation
+
+            meter.create_observable_gauge(
+                name,
+                callbacks=[
+                    lambda options: [
+                        Observation(value, attributes=dict(labels))
+                        for labels, value in callback().items()
+                    ]
+                ],
+                description=description,
+            )
+        except Exception as e:
+            logger.debug("Could not register OpenTelemetry gauge %s: %s", name, e)
+
+    # Agent specific helpers
+
+    def record_phase(self, phase: str, seconds: float, usage: Optional[Dict[str, int]] = None) -> None:
+        """Record the latency and token usage of a planner, reflection or executor call."""
+        self.observe(
+            "agent_phase_duration_seconds",
+            seconds,
+            "Latency of planner, reflection and executor calls",
+            phase=phase,
+        )
+        if usage:
+            for kind, key in (("prompt", "inputTokens"), ("completion", "outputTokens")):
+                self.add(
+                    "agent_tokens",
+                    usage.get(key, 0),
+                    "Model tokens per phase",
+                    unit="{token}",
+                    phase=phase,
+                    kind=kind,
+                )
+
+    def record_tool(self, tool: str, seconds: float, status: str = "success") -> None:
+        self.observe(
+            "agent_tool_duration_seconds", seconds, "Latency of tool calls", tool=tool, status=status
+        )
+
+    def record_mcp_acquire(self, seconds: float) -> None:
+        self.observe(
+            "agent_mcp_acquire_seconds", seconds, "Time spent waiting for an MCP session lease"
+        )
+
+    def record_speculation(self, outcome: str, kind: str = "speculative") -> None:
+        """Count a step started ahead of its plan as ``hit``, ``wasted`` (finished, then discarded) or ``cancelled``.
+
+        ``kind`` is ``speculative`` (started during the reflection) or
+        ``early_dispatch`` (started while the plan was being streamed).
+        """
+        self.add(
+            "agent_speculative_steps",
+            1,
+            "Steps started ahead of their plan, by outcome",
+            kind=kind,
+            outcome=outcome,
+        )
+
+    def record_memory_write(self, seconds: float, records: int, status: str) -> None:
+        self.observe(
+            "agent_memory_write_seconds", seconds, "Latency of batched memory writes", status=status
+        )
+        self.add(
+            "agent_memory_records", records, "Interactions written to memory", status=status
+        )
+
+    def record_search_batch(self, seconds: float, searches: int, status: str) -> None:
+        self.observe(
+            "agent_search_batch_seconds", seconds, "Latency of coalesced search requests", status=status
+        )
+        self.add(
+            "agent_coalesced_searches", searches, "Searches sent in coalesced requests", status=status
+        )
+
+    def record_objective(self, seconds: float, status: str) -> None:
+        self.observe(
+            "agent_objective_duration_seconds", seconds, "End-to-end latency of objectives", status=status
+        )
+
+    # Export
+
+    def _meter(self) -> Any:
+        if self._otel_meter is None:
+            try:
+                from opentelemetry import metrics
+
+                # Resolves to the provider set by StrandsTelemetry.setup_meter,
+                # also when that happens after this call
+                self._otel_meter = metrics.get_meter(__name__)
+            except ImportError:
+                self._otel_meter = False
+        return self._otel_meter or None
+
+    def _otel_instrument(self, kind: str, name: str, description: str, unit: str) -> Any:
+        instrument = self._otel.get(name)
+        if instrument is not None:
+            return instrument
+        meter = self._meter()
+        if meter is None:
+            return None
+        with self._lock:
+            if name not in self._otel:
+                create = meter.create_histogram if kind == "histogram" else meter.create_counter
+                self._otel[name] = create(name, unit=unit, description=description)
+            return self._otel[name]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counts, sums and counter values, for logs and benchmarks."""
+        with self._lock:
+            return {
+                "histograms": {
+                    name + _format_labels(k): {"count": h.count, "sum": h.sum}
+                    for name, series in self._histograms.items()
+                    for k, h in series.items()
+                },
+                "counters": {
+                    name + _format_labels(k): v
+                    for name, series in self._counters.items()
+                    for k, v in series.items()
+                },
+            }
+
+    def prometheus_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            histograms = {n: dict(s) for n, s in self._histograms.items()}
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            gauges = dict(self._gauges)
+            help_text = dict(self._help)
+
+        for name, series in sorted(histograms.items()):
+            lines.append(f"# HELP {name} {help_text.get(name, '')}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += count
+                    le = _format_labels(labels, ("le", _format_value(float(bound))))
+                    lines.append(f"{name}_bucket{le} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for name, series in sorted(counters.items()):
+            lines.append(f"# HELP {name}_total {help_text.get(name, '')}")
+            lines.append(f"# TYPE {name}_total counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{name}_total{_format_labels(labels)} {_format_value(value)}")
+
+        for name, (description, callback) in sorted(gauges.items()):
+            try:
+                values = callback()
+            except Exception as e:
+                logger.warning("Gauge %s failed: %s", name, e)
+                continue
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in sorted(values.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def agent_usage(agent: Any) -> Dict[str, int]:
+    """Token usage accumulated by a strands Agent so far."""
+    metrics = getattr(agent, "event_loop_metrics", None)
+    return dict(getattr(metrics, "accumulated_usage", None) or {})
+
+
+def usage_delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    return {k: v - before.get(k, 0) for k, v in after.items()}
+
+
+def _tool_cache_gauge() -> Dict[Labels, float]:
+    from .tool_cache import get_tool_cache
+
+    return {_labels({"stat": k}): v for k, v in get_tool_cache().stats().items()}
+
+
+def _mcp_pool_gauge() -> Dict[Labels, float]:
+    from . import mcp_pool
+
+    # Do not start a pool just to report on it
+    pool = mcp_pool._default_pool
+    if pool is None:
+        return {}
+    return {_labels({"stat": k}): v for k, v in pool.stats().items()}
+
+
+_agent_metrics: Optional[AgentMetrics] = None
+_agent_metrics_lock = threading.Lock()
+
+
+def get_agent_metrics() -> AgentMetrics:
+    """Return the process-wide agent metrics, creating them on first use."""
+    global _agent_metrics
+    with _agent_metrics_lock:
+        if _agent_metrics is None:
+            _agent_metrics = AgentMetrics()
+            _agent_metrics.register_gauge(
+                "agent_tool_cache", "Tool result cache statistics", _tool_cache_gauge
+            )
+            _agent_metrics.register_gauge(
+                "agent_mcp_pool", "MCP session pool statistics", _mcp_pool_gauge
+            )
+        return _agent_metrics
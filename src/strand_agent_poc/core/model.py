@@ -1,22 +1,71 @@
 import os
-import boto3
-from strands.models import BedrockModel
-from dotenv import load_dotenv
+import threading
+from typing import Any, Dict
 
-load_dotenv()
+from .config import load_env
 
-session = boto3.Session(
-    # use BEARER_TOKEN_BEDROCK instead, can be set in .env file
-    region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-2"),
-    # profile_name=os.getenv("AWS_PROFILE", "default"),
-)
+load_env()
 
 # Claude 3.7 Sonnet model for executor
-bedrock37Model = BedrockModel(
-    model_id="us.anthropic.claude-3-7-sonnet-20250219-v1:0", boto_session=session
-)
-
+EXECUTOR_MODEL_ID = "us.anthropic.claude-3-7-sonnet-20250219-v1:0"
 # Claude 4 Sonnet model for planner
-claude4Model = BedrockModel(
-    model_id="us.anthropic.claude-sonnet-4-20250514-v1:0", boto_session=session
-)
+PLANNER_MODEL_ID = "us.anthropic.claude-sonnet-4-20250514-v1:0"
+
+# The boto3 session and Bedrock models are built on first use, so importing
+# the package does not pay for boto3/strands start-up
+_MODEL_ATTRIBUTES = {
+    "bedrock37Model": EXECUTOR_MODEL_ID,
+    "claude4Model": PLANNER_MODEL_ID,
+}
+
+_session = None
+_models: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _lock:
+        if _session is None:
+            import boto3
+
+            _session = boto3.Session(
+                # use BEARER_TOKEN_BEDROCK instead, can be set in .env file
+                region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-2"),
+                # profile_name=os.getenv("AWS_PROFILE", "default"),
+            )
+        return _session
+
+
+def get_model(model_id: str):
+    """Return the shared BedrockModel for ``model_id``."""
+    with _lock:
+        if model_id in _models:
+            return _models[model_id]
+    session = get_session()
+    with _lock:
+        if model_id not in _models:
+            from strands.models import BedrockModel
+
+            from .resilient_model import resilient
+
+            # Rate limited to what Bedrock accepts, with retries and optional hedging
+            _models[model_id] = resilient(BedrockModel(model_id=model_id, boto_session=session))
+        return _models[model_id]
+
+
+def set_model(model_id: str, model: Any) -> None:
+    """Replace the model used for ``model_id``, e.g. with a replay model; None restores it."""
+    with _lock:
+        if model is None:
+            _models.pop(model_id, None)
+        else:
+            _models[model_id] = model
+
+
+def __getattr__(name: str):
+    if name == "session":
+        return get_session()
+    if name in _MODEL_ATTRIBUTES:
+        return get_model(_MODEL_ATTRIBUTES[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
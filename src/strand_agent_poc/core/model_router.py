@@ -0,0 +1,294 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+from strands.models.model import Model
+
+from . import model
+from .metrics import get_agent_metrics
+from .resilient_model import ResilientModel
+
+FAST = "fast"
+STANDARD = "standard"
+STRONG = "strong"
+TIERS = (FAST, STANDARD, STRONG)
+
+# Steps that read cluster metadata or run a single lookup
+_METADATA_STEP = re.compile(
+    r"\b(list|mappings?|fields?|schema|health|shards?|exists?|count|how many|insights?|settings)\b"
+)
+# Steps that combine results or have to reason over them
+_ANALYSIS_STEP = re.compile(
+    r"\b(analy[sz]\w*|correlat\w*|compar\w*|root cause|why|investigat\w*|patterns?|trends?"
+    r"|anomal\w*|diagnos\w*|across|relationships?|impact)\b"
+)
+
+
+def classify_step(step: str) -> str:
+    """Return the model tier a step needs: fast for metadata lookups, strong for multi-hop analysis."""
+    text = step.lower()
+    if _ANALYSIS_STEP.search(text):
+        return STRONG
+    if _METADATA_STEP.search(text) and len(text.split()) <= 40:
+        return FAST
+    return STANDARD
+
+
+class ModelTier:
+    """A model with a concurrency limit and a latency SLO for its calls.
+
+    Calls past ``max_concurrency`` wait for a slot without holding a thread:
+    the waiter's future is resolved on its own event loop when a slot is
+    released, so agents on other loops (threads) share the same limit. The
+    p95 of the last ``window`` calls of the past ``max_age`` seconds is
+    compared to ``slo`` (seconds per model call); a tier over its SLO hands
+    new steps to its ``fallback`` tier, except one in ``probe_every`` that
+    still goes to the tier. Probes and expiring samples let a tier that
+    recovered take its steps back.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model_id: str,
+        max_concurrency: int = 8,
+        slo: float = 30.0,
+        fallback: Optional[str] = None,
+        window: int = 50,
+        max_age: float = 300.0,
+        probe_every: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.model_id = model_id
+        self.max_concurrency = max_concurrency
+        self.slo = slo
+        self.fallback = fallback
+        self._active = 0
+        # [loop, future, granted] per call waiting for a slot, in arrival order
+        self._waiters: Deque[list] = deque()
+        self.max_age = max_age
+        self.probe_every = probe_every
+        self._clock = clock
+        self._bypassed = 0
+        self._latencies: Deque[Tuple[float, float]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < self.max_concurrency and not self._waiters:
+                self._active += 1
+                return
+            waiter = [loop, loop.create_future(), False]
+            self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter[2]
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                # The slot was handed over as the call was cancelled
+                self.release()
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter[2] = True
+                try:
+                    waiter[0].call_soon_threadsafe(_grant, waiter[1])
+                except RuntimeError:  # the waiter's loop is closed
+                    continue
+                return
+            self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for one model call and record its queue time and latency."""
+        metrics = get_agent_metrics()
+        start = time.perf_counter()
+        await self.acquire()
+        queued = time.perf_counter()
+        metrics.observe(
+            "agent_model_queue_seconds", queued - start, "Time model calls waited for a tier slot", tier=self.name
+        )
+        status = "error"
+        try:
+            yield
+            status = "success"
+        finally:
+            self.release()
+            seconds = time.perf_counter() - queued
+            self.observe(seconds)
+            metrics.observe(
+                "agent_model_call_seconds", seconds, "Latency of model calls per tier", tier=self.name, status=status
+            )
+            if seconds > self.slo:
+                metrics.add("agent_model_slo_violations", 1, "Model calls slower than their tier's SLO", tier=self.name)
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append((self._clock(), seconds))
+
+    def p95(self) -> Optional[float]:
+        cutoff = self._clock() - self.max_age
+        with self._lock:
+            while self._latencies and self._latencies[0][0] < cutoff:
+                self._latencies.popleft()
+            latencies = sorted(seconds for _, seconds in self._latencies)
+        if len(latencies) < 5:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def over_slo(self) -> bool:
+        p95 = self.p95()
+        return p95 is not None and p95 > self.slo
+
+    def bypass(self) -> bool:
+        """Whether a new step should skip this tier: over the SLO and not a probe."""
+        if not self.over_slo():
+            return False
+        with self._lock:
+            self._bypassed += 1
+            return self.probe_every <= 0 or self._bypassed % self.probe_every != 0
+
+
+def _grant(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class TieredModel(Model):
+    """Runs the calls of an agent on a tier's model within the tier's limits.
+
+    The underlying model is looked up on every call, so ``model.set_model``
+    (e.g. a replay model) applies to agents that are already built.
+    """
+
+    def __init__(self, tier: ModelTier):
+        self.tier = tier
+
+    @property
+    def inner(self) -> Model:
+        return model.get_model(self.tier.model_id)
+
+    @property
+    def config(self) -> Any:
+        # The event loop reads the model id for its traces from here
+        return self.inner.get_config()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.inner.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.inner.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.inner.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        inner = self.inner
+        if isinstance(inner, ResilientModel):
+            # Holds the slot per attempt, not during its retry backoff
+            events = inner.stream(messages, tool_specs, system_prompt, slot=self.tier.slot, **kwargs)
+            async for event in events:
+                self._count_tokens(event)
+                yield event
+            return
+        async with self.tier.slot():
+            async for event in inner.stream(messages, tool_specs, system_prompt, **kwargs):
+                self._count_tokens(event)
+                yield event
+
+    def _count_tokens(self, event: Any) -> None:
+        usage = event.get("metadata", {}).get("usage") if isinstance(event, dict) else None
+        if not usage:
+            return
+        for kind, key in (("prompt", "inputTokens"), ("completion", "outputTokens")):
+            get_agent_metrics().add(
+                "agent_model_tokens",
+                usage.get(key, 0),
+                "Model tokens per tier",
+                unit="{token}",
+                tier=self.tier.name,
+                kind=kind,
+            )
+
+
+class ModelRouter:
+    """Sends the planner and each executor step to a tier of models."""
+
+    def __init__(self, tiers: Dict[str, ModelTier], planner_tier: str = STRONG):
+        self.tiers = tiers
+        self.planner_tier = planner_tier
+        self._models = {name: TieredModel(tier) for name, tier in tiers.items()}
+
+    def route(self, tier_name: str) -> str:
+        """Follow the fallbacks of tiers that are over their SLO."""
+        seen = set()
+        while tier_name not in seen:
+            seen.add(tier_name)
+            tier = self.tiers[tier_name]
+            if not (tier.fallback and tier.bypass()):
+                return tier_name
+            tier_name = tier.fallback
+        return tier_name
+
+    def model_for_tier(self, tier_name: str) -> TieredModel:
+        tier_name = self.route(tier_name)
+        get_agent_metrics().add("agent_model_routes", 1, "Agents created per model tier", tier=tier_name)
+        return self._models[tier_name]
+
+    def model_for_step(self, step: str) -> TieredModel:
+        return self.model_for_tier(classify_step(step))
+
+    def planner_model(self) -> TieredModel:
+        return self.model_for_tier(self.planner_tier)
+
+    def model_ids(self) -> List[str]:
+        return sorted({tier.model_id for tier in self.tiers.values()})
+
+
+def _tier_from_env(name: str, model_id: str, max_concurrency: int, slo: float, fallback: str = "") -> ModelTier:
+    prefix = f"MODEL_TIER_{name.upper()}"
+    return ModelTier(
+        name,
+        os.getenv(prefix, model_id),
+        max_concurrency=int(os.getenv(f"{prefix}_CONCURRENCY", str(max_concurrency))),
+        slo=float(os.getenv(f"{prefix}_SLO", str(slo))),
+        fallback=os.getenv(f"{prefix}_FALLBACK", fallback) or None,
+        max_age=float(os.getenv("MODEL_TIER_SLO_WINDOW", "300")),
+    )
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide router, configured from MODEL_TIER_* variables.
+
+    Without configuration the fast and standard tiers use the executor
+    model and the strong tier the planner model.
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(
+                {
+                    FAST: _tier_from_env(FAST, model.EXECUTOR_MODEL_ID, 8, 15.0, STANDARD),
+                    STANDARD: _tier_from_env(STANDARD, model.EXECUTOR_MODEL_ID, 8, 30.0),
+                    STRONG: _tier_from_env(STRONG, model.PLANNER_MODEL_ID, 4, 60.0),
+                },
+                planner_tier=os.getenv("MODEL_PLANNER_TIER", STRONG),
+            )
+        return _router
@@ -0,0 +1,47 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from .config import load_env
+
+if TYPE_CHECKING:
+    from opensearchpy import OpenSearch
+
+load_env()
+
+_client: Optional["OpenSearch"] = None
+_client_lock = threading.Lock()
+
+
+def get_opensearch_client() -> "OpenSearch":
+    """Return the process-wide OpenSearch client.
+
+    The client keeps a pool of keep-alive HTTP connections, so tool calls
+    reuse connections instead of setting up a new client per call.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from opensearchpy import OpenSearch
+
+            _client = OpenSearch(
+                hosts=[os.getenv("OPENSEARCH_URL")],
+                http_auth=(
+                    os.getenv("OPENSEARCH_USERNAME"),
+                    os.getenv("OPENSEARCH_PASSWORD"),
+                ),
+                use_ssl=False,
+                verify_certs=False,
+                ssl_show_warn=False,
+                pool_maxsize=int(os.getenv("OPENSEARCH_POOL_MAXSIZE", "16")),
+                timeout=int(os.getenv("OPENSEARCH_TIMEOUT", "30")),
+            )
+        return _client
+
+
+def close_opensearch_client() -> None:
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
@@ -1,14 +1,17 @@
+import asyncio
 import json
+import logging
 import os
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Any, List, Optional, Sequence, Tuple
 from strands import Agent
-from strands.session.file_session_manager import FileSessionManager
 
 # from strands.session.repository_session_manager import RepositorySessionManager
 from strands_tools import current_time
 from strands_tools.agent_core_memory import AgentCoreMemoryToolProvider
 from strands.agent.conversation_manager import SummarizingConversationManager
-from strands.telemetry import StrandsTelemetry
 from strands.telemetry.tracer import get_tracer
 from opentelemetry import trace as trace_api
 
@@ -17,28 +20,75 @@ from .prompt_management.prompts import (
     DEFAULT_REFLECT_PROMPT,
     FINAL_RESULT_RESPONSE_INSTRUCTIONS,
     PLAN_EXECUTE_REFLECT_RESPONSE_FORMAT,
+    PARALLEL_PLAN_RESPONSE_FORMAT,
     PLANNER_RESPONSIBILITY,
+    STEP_RESULT_DIGEST_PROMPT,
 )
 
-# from .session_manager import AgentCoreSessionRepository
 from . import model
-from .executor import executor_agent, get_tool_prompt
+from .events import AgentEventType, EventSink, make_event, stream_agent
+from .executor import executor_agent_async, get_tool_prompt
+from .investigation_index import OBJECTIVE, get_investigation_index
+from .memory_utils import MemoryWriter, get_history_cache, get_memory_provider
+from .metrics import agent_usage, get_agent_metrics, usage_delta
+from .model_router import get_model_router
+from .plan_parser import RESULT_STARTED, IncrementalPlanParser, parse_plan
+from .session_manager import create_session_manager
+from .step_scheduler import PlanStep, StepScheduler, normalize_steps, same_step, step_key
+from .step_store import StepResultStore, digest_text, make_expand_step_result_tool
 
-from dotenv import load_dotenv
+from .config import load_env
 
-load_dotenv()
+load_env()
+
+logger = logging.getLogger(__name__)
 
 MEMORY_ID = os.getenv("MEMORY_ID","memory_ux56y-yA1dMNGN1i")
 ACTOR_ID = os.getenv("ACTOR_ID", "plan_execute_reflect_agent")
 NAMESPACE = os.getenv("NAMESPACE", "default")
 REGION = os.getenv("REGION", "us-east-1")
 
+# Stand-ins for the messages of a reflect turn that a later reflection supersedes
+_TRIMMED_TEXT = {
+    "user": "[Earlier reflection removed; the latest prompt lists every completed step]",
+    "assistant": "[Earlier plan removed]",
+}
+
+# A step started before the plan that schedules it was final, and why
+# ("speculative" or "early_dispatch")
+PrestartedStep = Tuple[PlanStep, "asyncio.Task[Tuple[str, bool]]", str]
+
+
+def _run_sync(coro):
+    # Run a coroutine to completion from sync code, even if the caller is
+    # already inside a running event loop
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
+
+
+strands_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def setup_telemetry():
+    """Enable tracing for the agent; runs once, when the first agent is built."""
+    global strands_telemetry
+    if os.getenv("OTEL_SDK_DISABLED", "").lower() == "true":
+        return None
+    with _telemetry_lock:
+        if strands_telemetry is None:
+            from strands.telemetry import StrandsTelemetry
+
+            strands_telemetry = StrandsTelemetry()
+            strands_telemetry.setup_otlp_exporter()     # Send traces to OTLP endpoint
+            strands_telemetry.setup_meter(
+                enable_otlp_exporter=True)
+        return strands_telemetry
 
-# Enable tracing for the agent
-strands_telemetry = StrandsTelemetry()
-strands_telemetry.setup_otlp_exporter()     # Send traces to OTLP endpoint
-strands_telemetry.setup_meter(
-    enable_otlp_exporter=True)
 
 class PlanExecuteReflectAgent:
     def __init__(
@@ -46,11 +96,59 @@ class PlanExecuteReflectAgent:
         session_id="default_conversation",
         max_steps: int = 20,
         executor_max_iterations: int = 20,
+        parallel_steps: bool = False,
+        max_parallel_steps: int = 4,
+        speculative_steps: bool = False,
+        early_dispatch: bool = False,
     ):
+        setup_telemetry()
+
         self.max_steps = max_steps
         self.executor_max_iterations = executor_max_iterations
+        # In parallel mode the planner declares step dependencies and every
+        # ready step of the plan runs concurrently before a single reflection
+        self.parallel_steps = parallel_steps
+        self.scheduler = StepScheduler(max_parallel_steps if parallel_steps else 1)
+        # Run the next planned step while the reflection is in flight and keep
+        # its result if the revised plan still contains the step
+        self.speculative_steps = speculative_steps
+        self.speculation_stats = {"hit": 0, "wasted": 0, "cancelled": 0}
+        # Start steps while the planner is still streaming the rest of the plan
+        self.early_dispatch = early_dispatch
+        self.early_dispatch_stats = {"hit": 0, "wasted": 0, "cancelled": 0}
+        self._prestart_stats = {
+            "speculative": self.speculation_stats,
+            "early_dispatch": self.early_dispatch_stats,
+        }
         self.completed_steps = []
         self.plan_steps = []
+        self.session_id = session_id
+        # Step results and final answers are only written to AgentCore memory on request
+        self.memory_writer: Optional[MemoryWriter] = None
+        if os.getenv("MEMORY_SAVE_INTERACTIONS", "").lower() == "true":
+            self.memory_writer = MemoryWriter(self._get_agent_core_memory_provider(session_id))
+        # Past investigations: a close objective gives the planner its plan,
+        # a recent step asking the same is answered without the executor
+        self.investigation_index = get_investigation_index()
+        # Records are kept per session; other sessions' investigations are
+        # only searched when sharing is turned on
+        self.investigation_scope = (
+            None if os.getenv("INVESTIGATION_INDEX_SHARED", "").lower() == "true" else session_id
+        )
+        self.plan_reuse_min_score = float(os.getenv("PLAN_REUSE_MIN_SCORE", "0.6"))
+        self.step_reuse_min_score = float(os.getenv("STEP_REUSE_MIN_SCORE", "0.9"))
+        # Cluster data changes, so reused step results must be recent
+        self.step_reuse_max_age = float(os.getenv("STEP_REUSE_MAX_AGE", "900"))
+        self.reused_steps: set = set()
+        self.final_answer: Optional[str] = None
+        # Full step outputs live here; reflection prompts only carry digests
+        self.step_store = StepResultStore(
+            digest_chars=int(os.getenv("STEP_DIGEST_CHARS", "400")),
+            latest_digest_chars=int(os.getenv("STEP_LATEST_DIGEST_CHARS", "2000")),
+        )
+        # Each reflect prompt lists every completed step again, so the previous
+        # reflect turn is dropped from the planner's history before the next one
+        self._reflect_prompt: Optional[str] = None
 
         self.tool_prompt = get_tool_prompt()
 
@@ -61,20 +159,17 @@ class PlanExecuteReflectAgent:
         # memory_tool = self._get_agent_core_memory(session_id)
 
         # Initialize session manager with conversationId
-        session_manager = FileSessionManager(
-            storage_dir=os.getenv("SESSION_STORAGE_DIR", "./sessions"),
-            session_id=session_id,
-        )
+        self.planner_session = create_session_manager(session_id)
 
         # Create planner agent
         self.planner = Agent(
-            model=model.bedrock37Model,
+            model=get_model_router().planner_model(),
             system_prompt=self.planner_system_prompt,
-            tools=[current_time],
+            tools=[current_time, make_expand_step_result_tool(self.step_store)],
             conversation_manager=SummarizingConversationManager(
                 preserve_recent_messages=10,
             ),
-            session_manager=session_manager,
+            session_manager=self.planner_session,
             agent_id="planner_agent",
             name="Planner Agent",
             description="Planner agent for creating step-by-step plans",
@@ -83,7 +178,11 @@ class PlanExecuteReflectAgent:
     def _get_planner_system_prompt(self) -> str:
         return (
             PLANNER_RESPONSIBILITY
-            + PLAN_EXECUTE_REFLECT_RESPONSE_FORMAT
+            + (
+                PARALLEL_PLAN_RESPONSE_FORMAT
+                if self.parallel_steps
+                else PLAN_EXECUTE_REFLECT_RESPONSE_FORMAT
+            )
             + FINAL_RESULT_RESPONSE_INSTRUCTIONS
         )
 
@@ -122,68 +221,309 @@ class PlanExecuteReflectAgent:
         You have currently executed the following steps from the original plan:
         [${parameters['completed_steps']}]
 
+        ${parameters['step_result_prompt']}
+
         ${parameters['reflect_prompt']}
 
         Remember: Respond only in JSON format following the required schema.
     """
 
     def _parse_llm_output(self, response: str) -> Dict[str, Any]:
-        # Parse LLM response and extract JSON
-        try:
-            # Remove markdown code blocks if present
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                response = response[start:end].strip()
-            elif "```" in response:
-                start = response.find("```") + 3
-                end = response.find("```", start)
-                response = response[start:end].strip()
-
-            return json.loads(response)
-        except json.JSONDecodeError as e:
-            return {"steps": [], "result": f"Error parsing response: {str(e)}"}
+        # Parse LLM response and extract JSON; text around the object (such as
+        # markdown fences) is skipped and truncated plans keep their closed steps
+        return parse_plan(response)
 
     def _get_agent_core_memory_provider(self, session_id: str) -> AgentCoreMemoryToolProvider:
-        # Create a new AgentCoreMemoryToolProvider for each session
-        provider = AgentCoreMemoryToolProvider(
-            boto_session=model.session,
+        # One provider (and boto client) per session, reused across calls
+        return get_memory_provider(
+            session_id,
             memory_id=MEMORY_ID,
             actor_id=ACTOR_ID,
-            session_id=session_id,
             namespace=NAMESPACE,
             region=REGION,
+            boto_session=model.session,
         )
-        return provider
 
     def _load_conversation_history(self, conversationId: str) -> list:
-        # Use agent_core_memory with current session_id (conversationId)
-        provider = self._get_agent_core_memory_provider(conversationId)
-        result = provider.agent_core_memory(
-            action="list",
-        ) # type: ignore
-        print("&&&&&")
-        print(result)
-        # result["content"] 是一个列表，每个元素是 {"text": ...}
-        if result.get("status") == "success" and result.get("content"):
-            steps = []
-            for item in result["content"]:
-                try:
-                    # 这里假设存储的内容是json字符串
-                    steps.append(json.loads(item["text"]))
-                except Exception:
-                    continue
-            return steps
-        return []
-
-    def _save_interaction(self, conversationId: str, interaction: dict):
-        # Use agent_core_memory with current session_id (conversationId)
-        provider = self._get_agent_core_memory_provider(conversationId)
-        provider.agent_core_memory(
-            action="record", content=json.dumps(interaction, ensure_ascii=False)
-        ) # type: ignore
+        # Served from the read-through cache; only events newer than the
+        # cached ones are fetched
+        return get_history_cache().load(self._get_agent_core_memory_provider(conversationId))
+
+    def _save_interaction(self, interaction: dict):
+        # Buffered; the memory writer persists it off the step's critical path
+        if self.memory_writer is not None:
+            self.memory_writer.record(interaction)
 
     def execute(self, objective: str, trace_id: Optional[str] = None) -> str:
+        return _run_sync(self.execute_async(objective, trace_id))
+
+    async def execute_async(
+        self,
+        objective: str,
+        trace_id: Optional[str] = None,
+        event_sink: Optional[EventSink] = None,
+    ) -> str:
+        start = time.perf_counter()
+        status = "error"
+        try:
+            result = await self._execute_loop(objective, trace_id, event_sink)
+            status = "success"
+            if self.investigation_index is not None and self.final_answer is not None:
+                try:
+                    await asyncio.to_thread(self._index_investigation, objective)
+                except Exception as e:
+                    # The result is already computed; losing the index entry is not fatal
+                    logger.warning("Could not index investigation: %s", e)
+        finally:
+            if self.memory_writer is not None:
+                # Bounded, so a slow memory service does not hold back the result
+                if not await self.memory_writer.flush(self.memory_writer.flush_timeout):
+                    logger.warning(
+                        "Memory writes of session %s still pending after %.1fs; continuing in the background",
+                        self.session_id,
+                        self.memory_writer.flush_timeout,
+                    )
+            get_agent_metrics().record_objective(time.perf_counter() - start, status)
+        await self._emit(event_sink, AgentEventType.RESULT, content=result)
+        return result
+
+    async def stream_async(
+        self,
+        objective: str,
+        trace_id: Optional[str] = None,
+        max_buffered_events: int = 64,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield agent events as they happen, ending with the ``result`` event.
+
+        Events are buffered in a bounded queue, so a slow consumer pauses the
+        agent instead of growing memory.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered_events)
+        done = object()
+
+        async def run():
+            try:
+                await self.execute_async(objective, trace_id, event_sink=queue.put)
+            except Exception as e:
+                await queue.put(make_event(AgentEventType.ERROR, content=str(e)))
+            await queue.put(done)
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await queue.get()
+                if event is done:
+                    break
+                yield event
+        finally:
+            # Stop the investigation if the consumer went away early
+            task.cancel()
+
+    async def _emit(
+        self, event_sink: Optional[EventSink], event_type: AgentEventType, **data
+    ) -> None:
+        if event_sink is not None:
+            await event_sink(make_event(event_type, **data))
+
+    def _index_investigation(self, objective: str) -> None:
+        # Reused results keep their original age instead of being re-indexed as fresh
+        self.investigation_index.add_investigation(
+            objective,
+            [s["input"] for s in self.completed_steps],
+            [s for s in self.completed_steps if s["input"] not in self.reused_steps],
+            self.final_answer,
+            scope=self.session_id,
+        )
+
+    def _similar_investigation_prompt(self, objective: str) -> str:
+        if self.investigation_index is None:
+            return ""
+        matches = self.investigation_index.search(
+            objective,
+            kind=OBJECTIVE,
+            k=1,
+            min_score=self.plan_reuse_min_score,
+            scope=self.investigation_scope,
+        )
+        if not matches:
+            return ""
+        score, record = matches[0]
+        get_agent_metrics().add(
+            "agent_investigation_reuse", 1, "Past investigations reused", kind="plan"
+        )
+        return f"""
+        A similar past investigation (similarity {score:.2f}) may help.
+        Its objective: ```{record['text']}```
+        Its steps: {json.dumps(record['steps'], ensure_ascii=False)}
+        Its conclusion: {digest_text(record['result'], 1000)}
+        Reuse its steps where they fit this objective; its conclusion may be outdated.
+"""
+
+    async def _run_step(self, step: PlanStep, event_sink: Optional[EventSink]) -> Tuple[str, bool]:
+        """Run a step, or answer it from a past investigation; returns (result, reused)."""
+        await self._emit(event_sink, AgentEventType.STEP_STARTED, step=step.text)
+        if self.investigation_index is not None:
+            record = self.investigation_index.find_step_result(
+                step.text,
+                self.step_reuse_min_score,
+                self.step_reuse_max_age,
+                scope=self.investigation_scope,
+            )
+            if record is not None:
+                await self._emit(
+                    event_sink,
+                    AgentEventType.STEP_COMPLETED,
+                    step=step.text,
+                    result=record["result"],
+                    reused=True,
+                )
+                return record["result"], True
+        span = self.planner.tracer._start_span(span_name=step.text, parent_span=self.planner.trace_span)
+        try:
+            step_result = await executor_agent_async(step.text, event_sink=event_sink)
+        finally:
+            self.planner.tracer._end_span(span)
+        await self._emit(
+            event_sink,
+            AgentEventType.STEP_COMPLETED,
+            step=step.text,
+            result=step_result,
+        )
+        return step_result, False
+
+    def _record_reuse(self, step: PlanStep) -> None:
+        # Only for steps that are kept: a discarded speculative step reused nothing
+        self.reused_steps.add(step.text)
+        get_agent_metrics().add("agent_investigation_reuse", 1, "Past investigations reused", kind="step")
+
+    def _start_speculation(self) -> Optional[PrestartedStep]:
+        """Start the next step of the current plan without waiting for the reflection."""
+        remaining = self.max_steps - len(self.completed_steps)
+        if remaining <= 0:
+            return None
+        ready = self.scheduler.ready_steps(
+            normalize_steps(self.plan_steps),
+            {s.get("input") for s in self.completed_steps},
+            limit=1,
+        )
+        if not ready:
+            return None
+        # No event sink: nothing is reported unless the step is committed
+        return ready[0], asyncio.create_task(self._run_step(ready[0], None)), "speculative"
+
+    def _dispatch_early(self, streamed_steps: list, prestarted: List[PrestartedStep]) -> None:
+        """Start a step of a plan that is still being streamed once it is closed and ready."""
+        early = [p for p in prestarted if p[2] == "early_dispatch"]
+        completed = {step_key(s["input"]) for s in self.completed_steps}
+        partial = normalize_steps(streamed_steps)
+        # Later steps are not known yet, so only completed dependencies count
+        done_ids = {s.id for s in partial if step_key(s.text) in completed}
+        # Several steps can close in one chunk; take them in plan order like the scheduler
+        for step in partial:
+            if (
+                len(early) >= self.scheduler.max_parallel_steps
+                or len(self.completed_steps) + len(early) >= self.max_steps
+            ):
+                return
+            if step_key(step.text) in completed or not all(dep in done_ids for dep in step.depends_on):
+                continue
+            if any(same_step(step.text, p[0].text) for p in prestarted):
+                continue
+            entry = (step, asyncio.create_task(self._run_step(step, None)), "early_dispatch")
+            prestarted.append(entry)
+            early.append(entry)
+
+    async def _commit_prestarted(
+        self,
+        prestarted: PrestartedStep,
+        step: PlanStep,
+        event_sink: Optional[EventSink],
+    ) -> Tuple[str, bool]:
+        _, task, kind = prestarted
+        await self._emit(event_sink, AgentEventType.STEP_STARTED, step=step.text, prestarted=kind)
+        step_result, reused = await task
+        self._prestart_stats[kind]["hit"] += 1
+        get_agent_metrics().record_speculation("hit", kind)
+        await self._emit(
+            event_sink,
+            AgentEventType.STEP_COMPLETED,
+            step=step.text,
+            result=step_result,
+            prestarted=kind,
+            **({"reused": True} if reused else {}),
+        )
+        return step_result, reused
+
+    async def _discard_prestarted(self, prestarted: List[PrestartedStep]) -> None:
+        for _, task, kind in prestarted:
+            outcome = "wasted" if task.done() else "cancelled"
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._prestart_stats[kind][outcome] += 1
+            get_agent_metrics().record_speculation(outcome, kind)
+        prestarted.clear()
+
+    def _trim_reflect_history(self) -> None:
+        """Replace the previous reflect turn (prompt, tool calls, plan) with short stand-ins.
+
+        The messages are replaced, not deleted, in memory and in the planner's
+        session, so the session's message ids and the restore offset of the
+        conversation manager still line up.
+        """
+        if self._reflect_prompt is None:
+            return
+        messages = self.planner.messages
+        start = next(
+            (
+                i
+                for i, message in enumerate(messages)
+                if message["role"] == "user"
+                and any(block.get("text") == self._reflect_prompt for block in message["content"])
+            ),
+            None,
+        )
+        self._reflect_prompt = None
+        if start is None:  # already summarized away
+            return
+        end = start + 1
+        # The turn ends before the next prompt; tool results are user messages too
+        while end < len(messages) and not (
+            messages[end]["role"] == "user"
+            and not any("toolResult" in block for block in messages[end]["content"])
+        ):
+            end += 1
+
+        # Session message id of messages[0]: the ones summarized away come
+        # first, and a summary message is not stored in the session
+        state = self.planner.conversation_manager.get_state()
+        first_id = state["removed_message_count"] - (1 if state.get("summary_message") else 0)
+        repository = getattr(self.planner_session, "session_repository", None)
+        for i in range(start, end):
+            role = messages[i]["role"]
+            trimmed = {"role": role, "content": [{"text": _TRIMMED_TEXT[role]}]}
+            messages[i] = trimmed
+            if repository is None:
+                continue
+            try:
+                stored = repository.read_message(
+                    self.planner_session.session_id, self.planner.agent_id, first_id + i
+                )
+                if stored is not None:
+                    # Restored sessions load the redacted message instead
+                    stored.redact_message = trimmed
+                    repository.update_message(self.planner_session.session_id, self.planner.agent_id, stored)
+            except Exception as e:
+                logger.warning("Could not trim reflect turn in session %s: %s", self.session_id, e)
+
+    async def _execute_loop(
+        self,
+        objective: str,
+        trace_id: Optional[str],
+        event_sink: Optional[EventSink],
+    ) -> str:
         # self.completed_steps = self._load_conversation_history(conversationId)
         # interactionId = 0  # Initialize interactionId
         # tracer = get_tracer()
@@ -203,18 +543,21 @@ class PlanExecuteReflectAgent:
                         "user_prompt": objective,
                         "steps": json.dumps(self.plan_steps, ensure_ascii=False),
                         "completed_steps": json.dumps(
-                            self.completed_steps, ensure_ascii=False
+                            self.step_store.digests(), ensure_ascii=False
                         ),
+                        "step_result_prompt": STEP_RESULT_DIGEST_PROMPT,
                         "reflect_prompt": DEFAULT_REFLECT_PROMPT,
                     }
                 )
+                self._trim_reflect_history()
+                self._reflect_prompt = prompt
             else:
                 # Use planner prompt without completed steps
                 prompt = self._get_planner_prompt_template(
                     {
                         "tools_prompt": self.tool_prompt,
                         "planner_prompt": DEFAULT_PLANNER_PROMPT,
-                        "user_prompt": objective,
+                        "user_prompt": objective + self._similar_investigation_prompt(objective),
                     }
                 )
 
@@ -222,49 +565,131 @@ class PlanExecuteReflectAgent:
             # self.planner.tools = [self._get_agent_core_memory(conversationId)]
 
             # Get plan from planner
-            planner_response = str(self.planner(prompt))
+            is_reflection = bool(self.completed_steps)
+            phase = "reflection" if is_reflection else "planner"
+            prestarted: List[PrestartedStep] = []
+            if is_reflection and self.speculative_steps:
+                speculation = self._start_speculation()
+                if speculation is not None:
+                    prestarted.append(speculation)
+
+            parser = IncrementalPlanParser()
+
+            async def on_text(delta: str) -> None:
+                for kind, _ in parser.feed(delta):
+                    if kind == RESULT_STARTED:
+                        # A final answer is coming, steps started early are not needed
+                        await self._discard_prestarted(prestarted)
+                    elif not parser.result_started:
+                        self._dispatch_early(parser.steps, prestarted)
+
+            async def on_message(message: Dict[str, Any]) -> None:
+                nonlocal parser
+                if not any("toolUse" in block for block in message.get("content", [])):
+                    return
+                # The turn called a tool, so its text was not the plan: drop the
+                # steps it started and parse the next turn from scratch
+                early = [p for p in prestarted if p[2] == "early_dispatch"]
+                prestarted[:] = [p for p in prestarted if p[2] != "early_dispatch"]
+                await self._discard_prestarted(early)
+                parser = IncrementalPlanParser()
+
+            # The planner is reused across turns, so its usage accumulates
+            usage_before = agent_usage(self.planner)
+            phase_start = time.perf_counter()
+            try:
+                planner_response = str(
+                    await stream_agent(
+                        self.planner,
+                        prompt,
+                        event_sink,
+                        on_text=on_text if self.early_dispatch else None,
+                        on_message=on_message if self.early_dispatch else None,
+                        source=phase,
+                    )
+                )
+            except BaseException:
+                await self._discard_prestarted(prestarted)
+                raise
+            get_agent_metrics().record_phase(
+                phase,
+                time.perf_counter() - phase_start,
+                usage_delta(usage_before, agent_usage(self.planner)),
+            )
             parsed_response = self._parse_llm_output(planner_response)
+            self.step_store.mark_reflected()
 
             steps = parsed_response.get("steps", [])
             self.plan_steps = steps
+            await self._emit(
+                event_sink,
+                AgentEventType.REFLECTION if is_reflection else AgentEventType.PLAN,
+                steps=steps,
+                result=parsed_response.get("result", ""),
+            )
 
             # Check if we have a final result
             if parsed_response.get("result"):
-                # # Save final result
-                # self._save_interaction(conversationId, {
-                #     "conversationId": conversationId,
-                #     "input": objective,
-                #     "result": parsed_response["result"]
-                # })
+                await self._discard_prestarted(prestarted)
+                self.final_answer = parsed_response["result"]
+                self._save_interaction(
+                    {
+                        "conversationId": self.session_id,
+                        "input": objective,
+                        "result": parsed_response["result"],
+                    }
+                )
                 return parsed_response["result"]
 
             # Execute next step if available
 
             if not steps:
+                await self._discard_prestarted(prestarted)
                 return "No more steps to execute and no final result provided."
 
-            # Find the next unfinished step
+            # Find the next unfinished steps whose dependencies are done
             completed_step_texts = {s.get("input") for s in self.completed_steps}
-            next_step = None
-            for s in steps:
-                if s not in completed_step_texts:
-                    next_step = s
-                    break
-
-            if next_step is None:
+            batch = self.scheduler.ready_steps(
+                normalize_steps(steps),
+                completed_step_texts,
+                limit=self.max_steps - len(self.completed_steps),
+            )
+
+            # Keep the steps started ahead of the plan that it still schedules now
+            unscheduled = [
+                p for p in prestarted if not any(same_step(s.text, p[0].text) for s in batch)
+            ]
+            prestarted = [p for p in prestarted if p not in unscheduled]
+            await self._discard_prestarted(unscheduled)
+
+            if not batch:
                 # All steps have been executed
-                return f"All planned steps executed. Completed steps: {json.dumps(self.completed_steps, indent=2)}"
-
-            span = self.planner.tracer._start_span(span_name=next_step, parent_span=self.planner.trace_span)
-            step_result = executor_agent(next_step)
-            self.planner.tracer._end_span(span)
-
-            interaction = {"input": next_step, "result": step_result}
-            self.completed_steps.append(interaction)
-            # self._save_interaction(conversationId, interaction)
+                return f"All planned steps executed. Completed steps: {self._completed_digests()}"
+
+            async def run_step(step: PlanStep) -> str:
+                for p in prestarted:
+                    if same_step(step.text, p[0].text):
+                        step_result, reused = await self._commit_prestarted(p, step, event_sink)
+                        break
+                else:
+                    step_result, reused = await self._run_step(step, event_sink)
+                if reused:
+                    self._record_reuse(step)
+                return step_result
+
+            # Reflect once per batch of concurrently executed steps
+            for step, step_result in await self.scheduler.run_batch(batch, run_step):
+                result_id = self.step_store.put(step.text, step_result)
+                interaction = {"id": result_id, "input": step.text, "result": step_result}
+                self.completed_steps.append(interaction)
+                self._save_interaction(interaction)
 
         # Max steps reached
-        return f"Maximum steps ({self.max_steps}) reached. Completed steps: {json.dumps(self.completed_steps, indent=2)}"
+        return f"Maximum steps ({self.max_steps}) reached. Completed steps: {self._completed_digests()}"
+
+    def _completed_digests(self) -> str:
+        # Full results can be large; they stay available in the step store
+        return json.dumps(self.step_store.digests(), indent=2, ensure_ascii=False)
 
 
 def run_agent(
@@ -276,6 +701,10 @@ def run_agent(
     executor_system_prompt: Optional[str] = None,
     planner_prompt: Optional[str] = None,
     reflect_prompt: Optional[str] = None,
+    parallel_steps: bool = False,
+    max_parallel_steps: int = 4,
+    speculative_steps: bool = False,
+    early_dispatch: bool = False,
 ) -> str:
     # Create the main agent instance
     if not memory_id:
@@ -284,6 +713,110 @@ def run_agent(
         session_id=memory_id,
         max_steps=max_steps,
         executor_max_iterations=executor_max_iterations,
+        parallel_steps=parallel_steps,
+        max_parallel_steps=max_parallel_steps,
+        speculative_steps=speculative_steps,
+        early_dispatch=early_dispatch,
     )
     # Main entry point for the Plan-Execute-Reflect agent
     return plan_execute_reflect_agent.execute(objective)
+
+
+async def run_agent_async(
+    objective: str,
+    memory_id: Optional[str] = None,
+    max_steps: int = 20,
+    executor_max_iterations: int = 20,
+    system_prompt: Optional[str] = None,
+    executor_system_prompt: Optional[str] = None,
+    planner_prompt: Optional[str] = None,
+    reflect_prompt: Optional[str] = None,
+    parallel_steps: bool = False,
+    max_parallel_steps: int = 4,
+    speculative_steps: bool = False,
+    early_dispatch: bool = False,
+) -> str:
+    """Async variant of ``run_agent`` for callers running inside an event loop."""
+    if not memory_id:
+        memory_id = os.urandom(16).hex()
+    # Agent construction may start the MCP session pool, keep it off the loop
+    plan_execute_reflect_agent = await asyncio.to_thread(
+        PlanExecuteReflectAgent,
+        session_id=memory_id,
+        max_steps=max_steps,
+        executor_max_iterations=executor_max_iterations,
+        parallel_steps=parallel_steps,
+        max_parallel_steps=max_parallel_steps,
+        speculative_steps=speculative_steps,
+        early_dispatch=early_dispatch,
+    )
+    return await plan_execute_reflect_agent.execute_async(objective)
+
+
+async def run_agents_async(
+    objectives: Sequence[str],
+    max_concurrency: int = 4,
+    slots: Optional[asyncio.Semaphore] = None,
+    **agent_kwargs: Any,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run many objectives concurrently, yielding each outcome as soon as it completes.
+
+    At most ``max_concurrency`` objectives run at a time (and each also holds
+    one of ``slots`` when given). All of them share the process-wide MCP
+    session pool, tool catalog and models. ``agent_kwargs`` are passed to
+    ``run_agent_async``. Outcomes are dicts with ``index``, ``objective``,
+    ``success``, ``result`` or ``error`` and ``duration_s``.
+    """
+    # Start the MCP session and list the tools once, before the fan-out
+    try:
+        await asyncio.to_thread(get_tool_prompt)
+    except Exception as e:
+        # Every objective would fail the same way; report each instead of ending the stream
+        logger.warning("Could not load the tool catalog: %s", e)
+        for index, objective in enumerate(objectives):
+            yield {"index": index, "objective": objective, "success": False, "error": str(e), "duration_s": 0.0}
+        return
+    concurrency = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run_one(index: int, objective: str) -> Dict[str, Any]:
+        async with concurrency:
+            if slots is not None:
+                await slots.acquire()
+            start = time.perf_counter()
+            try:
+                result = await run_agent_async(objective, **agent_kwargs)
+                outcome = {"success": True, "result": result}
+            except Exception as e:
+                outcome = {"success": False, "error": str(e)}
+            finally:
+                if slots is not None:
+                    slots.release()
+            return {
+                "index": index,
+                "objective": objective,
+                **outcome,
+                "duration_s": time.perf_counter() - start,
+            }
+
+    tasks = [asyncio.create_task(run_one(i, o)) for i, o in enumerate(objectives)]
+    try:
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+    finally:
+        # The consumer stopped early: do not leave objectives running
+        for task in tasks:
+            task.cancel()
+
+
+def run_agents(
+    objectives: Sequence[str], max_concurrency: int = 4, **agent_kwargs: Any
+) -> List[Dict[str, Any]]:
+    """Sync variant of ``run_agents_async``; returns the outcomes in input order."""
+
+    async def collect() -> List[Dict[str, Any]]:
+        return [
+            outcome
+            async for outcome in run_agents_async(objectives, max_concurrency, **agent_kwargs)
+        ]
+
+    return sorted(_run_sync(collect()), key=lambda outcome: outcome["index"])
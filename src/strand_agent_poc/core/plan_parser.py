@@ -0,0 +1,187 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Events returned by IncrementalPlanParser.feed
+STEP = "step"
+RESULT_STARTED = "result_started"
+
+PlanEvent = Tuple[str, Any]
+
+
+class IncrementalPlanParser:
+    """Parses the planner's JSON response while it is being streamed.
+
+    ``feed`` returns a ``("step", step)`` event for every element of the
+    ``steps`` array as soon as the element is closed, and one
+    ``("result_started", None)`` event once the ``result`` string turns out
+    to be non-empty. ``close`` parses the complete response. Text around the
+    JSON object, such as markdown fences, is ignored; a ``{`` that does not
+    start a JSON object (``Plan for {service}:``) is skipped and scanning
+    restarts at the next one.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.steps: List[Any] = []
+        self.result_started = False
+        self._object_start: Optional[int] = None
+        self._object_end: Optional[int] = None
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._key: Optional[str] = None
+        self._expect_key = False
+        self._steps_depth: Optional[int] = None
+        self._element_start: Optional[int] = None
+        self._in_result = False
+
+    def feed(self, chunk: str) -> List[PlanEvent]:
+        self.text += chunk
+        events: List[PlanEvent] = []
+        text = self.text
+        while self._pos < len(text) and self._object_end is None:
+            self._scan(text, self._pos, events)
+            self._pos += 1
+        return events
+
+    def _scan(self, text: str, i: int, events: List[PlanEvent]) -> None:
+        c = text[i]
+        depth = len(self._stack)
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif c == "\\":
+                self._escape = True
+            elif c == '"':
+                self._in_string = False
+                self._string_closed(text, i, depth, events)
+            elif self._in_result and not c.isspace() and not self.result_started:
+                self.result_started = True
+                events.append((RESULT_STARTED, None))
+            return
+
+        if self._object_start is None:
+            # Skip fences or prose before the JSON object
+            if c == "{":
+                self._object_start = i
+                self._stack.append("{")
+                self._expect_key = True
+            return
+
+        if depth == 1 and self._expect_key and not (c in '":}' or c.isspace()):
+            # Not a JSON object after all: try the next "{"
+            self._restart()
+            return
+
+        if c == '"':
+            self._in_string = True
+            self._string_start = i
+            self._in_result = depth == 1 and not self._expect_key and self._key == "result"
+            self._start_element(i)
+        elif c in "{[":
+            if depth == 1 and c == "[" and self._key == "steps":
+                self._steps_depth = depth + 1
+            else:
+                self._start_element(i)
+            self._stack.append(c)
+        elif c in "}]":
+            if self._stack:
+                self._stack.pop()
+            depth = len(self._stack)
+            if depth == 0:
+                if self._is_object(text[self._object_start : i + 1]):
+                    self._object_end = i
+                else:
+                    self._restart()
+            elif self._steps_depth is not None and depth == self._steps_depth:
+                self._end_element(text, i, events)
+            elif self._steps_depth is not None and depth < self._steps_depth:
+                self._end_element(text, i - 1, events)
+                self._steps_depth = None
+        elif c == ",":
+            if depth == 1:
+                self._expect_key = True
+            elif self._steps_depth is not None and depth == self._steps_depth:
+                self._end_element(text, i - 1, events)
+        elif c == ":" and depth == 1:
+            self._expect_key = False
+        elif not c.isspace():
+            self._start_element(i)
+
+    @staticmethod
+    def _is_object(candidate: str) -> bool:
+        try:
+            return isinstance(json.loads(candidate, strict=False), dict)
+        except json.JSONDecodeError:
+            return False
+
+    def _restart(self) -> None:
+        # Continue right after the "{" that turned out not to start the object
+        self._pos = self._object_start
+        self._reset()
+
+    def _string_closed(self, text: str, i: int, depth: int, events: List[PlanEvent]) -> None:
+        if depth == 1 and self._expect_key:
+            try:
+                self._key = json.loads(text[self._string_start : i + 1])
+            except json.JSONDecodeError:
+                self._key = None
+        elif self._steps_depth is not None and depth == self._steps_depth:
+            self._end_element(text, i, events)
+        self._in_result = False
+
+    def _start_element(self, i: int) -> None:
+        if (
+            self._steps_depth is not None
+            and len(self._stack) == self._steps_depth
+            and self._element_start is None
+        ):
+            self._element_start = i
+
+    def _end_element(self, text: str, end: int, events: List[PlanEvent]) -> None:
+        if self._element_start is None:
+            return
+        raw = text[self._element_start : end + 1].strip()
+        self._element_start = None
+        try:
+            step = json.loads(raw, strict=False)
+        except json.JSONDecodeError:
+            return
+        self.steps.append(step)
+        events.append((STEP, step))
+
+    def close(self) -> Dict[str, Any]:
+        """Parse the complete response.
+
+        Falls back to the steps closed so far when the JSON object is
+        malformed or cut off, and to an error result when there are none.
+        """
+        if self._object_start is not None:
+            end = self._object_end + 1 if self._object_end is not None else len(self.text)
+            try:
+                parsed = json.loads(self.text[self._object_start : end], strict=False)
+                if isinstance(parsed, dict):
+                    return parsed
+            except json.JSONDecodeError as e:
+                error = e
+            else:
+                error = ValueError("response is not a JSON object")
+        else:
+            error = ValueError("no JSON object in response")
+
+        if self.steps and not self.result_started:
+            return {"steps": list(self.steps), "result": ""}
+        return {"steps": [], "result": f"Error parsing response: {str(error)}"}
+
+
+def parse_plan(response: str) -> Dict[str, Any]:
+    """Parse a complete planner response."""
+    parser = IncrementalPlanParser()
+    parser.feed(response)
+    return parser.close()
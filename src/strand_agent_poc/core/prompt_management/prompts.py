@@ -66,3 +66,43 @@ For the given objective, generate a step-by-step plan composed of simple, self-c
 DEFAULT_REFLECT_PROMPT: str = (
     """Update your plan based on the latest step results. If the task is complete, return the final answer. Otherwise, include only the remaining steps. Do not repeat previously completed steps."""
 )
+
+
+PARALLEL_PLAN_RESPONSE_FORMAT: str = """
+Response Instructions:
+Only respond in JSON format. Always follow the given response instructions. Do not return any content that does not follow the response instructions. Do not add anything before or after the expected JSON.
+Always respond with a valid JSON object that strictly follows the below schema:
+{
+	"steps": array[{"id": string, "step": string, "depends_on": array[string]}],
+	"result": string
+}
+Use "steps" to return an array of step objects to complete the objective, leave it empty if you know the final result. Please escape any special characters within the strings.
+- "id" is a short unique identifier for the step, such as "s1".
+- "step" is the instruction to execute.
+- "depends_on" lists the ids of the steps whose results this step needs. Use an empty array when the step is independent; independent steps are executed in parallel.
+Use "result" return the final response when you have enough information, leave it empty if you want to execute more steps. Please escape any special characters within the result.
+Here are examples of valid responses following the required JSON schema:
+
+Example 1 - When you need to execute steps:
+{
+	"steps": [
+		{"id": "s1", "step": "This is an example step", "depends_on": []},
+		{"id": "s2", "step": "This is another independent example step", "depends_on": []},
+		{"id": "s3", "step": "This step combines the results of s1 and s2", "depends_on": ["s1", "s2"]}
+	],
+	"result": ""
+}
+
+Example 2 - When you have the final result:
+{
+	"steps": [],
+	"result": "This is an example result\n with escaped special characters"
+}
+Important rules for the response:
+1. Only declare a dependency when a step really needs the result of another step
+2. Do not add any content before or after the JSON
+3. Only respond with a pure JSON object
+"""
+
+
+STEP_RESULT_DIGEST_PROMPT: str = """Each executed step is listed with its result id and a digest of its output. If a digest is not enough to decide the next steps or to write the final result, call the expand_step_result tool with the result id to read the full output."""
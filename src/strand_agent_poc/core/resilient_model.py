@@ -0,0 +1,319 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, AsyncIterator, Callable, Deque, Dict, Optional
+
+from strands.models.model import Model
+from strands.types.exceptions import ModelThrottledException
+
+from .metrics import get_agent_metrics
+
+logger = logging.getLogger(__name__)
+
+# Bedrock errors that are worth another attempt; matched by name so botocore
+# is not imported for them
+_TRANSIENT_ERROR_CODES = frozenset(
+    {"ServiceUnavailableException", "InternalServerException", "ModelNotReadyException"}
+)
+_TRANSIENT_ERROR_TYPES = frozenset(
+    {"ReadTimeoutError", "ConnectTimeoutError", "EndpointConnectionError", "ConnectionClosedError"}
+)
+
+
+# Context manager factory held around each attempt, e.g. ModelTier.slot
+Slot = Callable[[], AsyncContextManager[None]]
+
+
+class ModelUnavailableError(RuntimeError):
+    """The model was still throttled after every retry."""
+
+
+def is_throttle(error: BaseException) -> bool:
+    return isinstance(error, ModelThrottledException)
+
+
+def is_transient(error: BaseException) -> bool:
+    if is_throttle(error) or type(error).__name__ in _TRANSIENT_ERROR_TYPES:
+        return True
+    response = getattr(error, "response", None)
+    code = response.get("Error", {}).get("Code") if isinstance(response, dict) else None
+    return code in _TRANSIENT_ERROR_CODES
+
+
+class AdaptiveTokenBucket:
+    """Client-side rate limit of model requests that adapts to throttling.
+
+    Each request takes a token; tokens refill at ``rate`` per second up to
+    ``burst``. A throttle cuts the rate by ``decrease`` and empties the
+    bucket, each success adds ``increase`` back (AIMD), so the rate settles
+    just under the quota the service enforces.
+    """
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: float = 10.0,
+        min_rate: float = 0.2,
+        max_rate: float = 50.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it."""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    async def acquire(self) -> float:
+        wait = self.reserve()
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def on_success(self) -> None:
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+
+
+async def _discard(task: asyncio.Future, stream: AsyncIterator[Any]) -> None:
+    """Cancel a request that lost the race and close its stream."""
+    task.cancel()
+    try:
+        await task
+    except BaseException:
+        pass
+    if hasattr(stream, "aclose"):
+        try:
+            await stream.aclose()
+        except Exception:
+            pass
+
+
+class ResilientModel(Model):
+    """Wraps a model with an adaptive rate limit, retries and hedged requests.
+
+    Throttled and transient failures are retried up to ``max_retries`` times
+    after a full-jitter exponential backoff, as long as no event of the
+    failed attempt reached the caller. With ``hedge`` enabled, a request
+    that has not produced its first event after the p95 time to first event
+    (at least ``hedge_min_delay``) gets a second request when the bucket has
+    a token to spare; the first to respond is kept and the other cancelled.
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        bucket: Optional[AdaptiveTokenBucket] = None,
+        max_retries: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        hedge: bool = False,
+        hedge_min_delay: float = 2.0,
+        window: int = 100,
+    ):
+        self.model = model
+        self.bucket = bucket or AdaptiveTokenBucket()
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self._first_event_times: Deque[float] = deque(maxlen=window)
+        self._discarding: set = set()
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "throttles": 0,
+            "retries": 0,
+            "failures": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "rate_limited_seconds": 0.0,
+        }
+
+    @property
+    def config(self) -> Any:
+        return self.model.get_config()
+
+    def update_config(self, **model_config: Any) -> None:
+        self.model.update_config(**model_config)
+
+    def get_config(self) -> Any:
+        return self.model.get_config()
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        return self.model.structured_output(output_model, prompt, system_prompt=system_prompt, **kwargs)
+
+    # Stats
+
+    @property
+    def model_id(self) -> str:
+        config = self.model.get_config()
+        return str(config.get("model_id", "unknown")) if isinstance(config, dict) else "unknown"
+
+    def _count(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._stats[name] += value
+        if name == "rate_limited_seconds":
+            get_agent_metrics().observe(
+                "agent_model_rate_limit_wait_seconds", value, "Time model requests waited for the rate limit",
+                model=self.model_id,
+            )
+        else:
+            get_agent_metrics().add(
+                f"agent_model_{name}", value, f"Model {name.replace('_', ' ')}", model=self.model_id
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["rate"] = self.bucket.rate
+        stats["throttle_rate"] = stats["throttles"] / stats["requests"] if stats["requests"] else 0.0
+        stats["p95_first_event_seconds"] = self.p95_first_event()
+        return stats
+
+    def p95_first_event(self) -> Optional[float]:
+        with self._lock:
+            times = sorted(self._first_event_times)
+        if len(times) < 10:
+            return None
+        return times[min(len(times) - 1, int(len(times) * 0.95))]
+
+    # Requests
+
+    def _request(self, messages, tool_specs, system_prompt, kwargs) -> AsyncIterator[Any]:
+        self._count("requests")
+        return self.model.stream(messages, tool_specs, system_prompt, **kwargs).__aiter__()
+
+    async def _first_event(self, messages, tool_specs, system_prompt, kwargs):
+        """Start a request (hedged when enabled) and return its iterator and first event."""
+        start = time.perf_counter()
+        primary = self._request(messages, tool_specs, system_prompt, kwargs)
+        first = asyncio.ensure_future(primary.__anext__())
+        attempts = {first: primary}
+        delay = self.p95_first_event()
+        if self.hedge and delay is not None:
+            done, _ = await asyncio.wait({first}, timeout=max(delay, self.hedge_min_delay))
+            if not done and self.bucket.try_acquire():
+                self._count("hedges")
+                hedge = self._request(messages, tool_specs, system_prompt, kwargs)
+                attempts[asyncio.ensure_future(hedge.__anext__())] = hedge
+
+        try:
+            pending = set(attempts)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self._count("hedge_wins")
+                        with self._lock:
+                            self._first_event_times.append(time.perf_counter() - start)
+                        return attempts.pop(task), task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task, stream in attempts.items():
+                discard = asyncio.ensure_future(_discard(task, stream))
+                self._discarding.add(discard)
+                discard.add_done_callback(self._discarding.discard)
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, slot: Optional[Slot] = None, **kwargs):
+        """Stream a response, retrying failed attempts.
+
+        ``slot`` (such as a model tier's) is held for each attempt only, so
+        backoff sleeps do not take up a concurrency slot.
+        """
+        for attempt in range(self.max_retries + 1):
+            self._count("rate_limited_seconds", await self.bucket.acquire())
+            started = False
+            try:
+                async with slot() if slot is not None else nullcontext():
+                    try:
+                        stream, event = await self._first_event(messages, tool_specs, system_prompt, kwargs)
+                    except StopAsyncIteration:
+                        self.bucket.on_success()
+                        return
+                    self.bucket.on_success()
+                    started = True
+                    yield event
+                    # Events already reached the caller, so a later failure is not retried
+                    async for event in stream:
+                        yield event
+                return
+            except Exception as e:
+                if started:
+                    raise
+                if is_throttle(e):
+                    self._count("throttles")
+                    self.bucket.on_throttle()
+                if not is_transient(e) or attempt == self.max_retries:
+                    self._count("failures")
+                    if is_throttle(e):
+                        # Not a throttle any more, or strands would retry it again
+                        # with blocking sleeps
+                        raise ModelUnavailableError(
+                            f"Model still throttled after {self.max_retries} retries: {e}"
+                        ) from e
+                    raise
+                failure = e
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+            logger.debug("Model request failed (%s), retry %d in %.2fs", failure, attempt + 1, delay)
+            self._count("retries")
+            await asyncio.sleep(delay)
+
+
+def resilient(model: Model) -> Model:
+    """Wrap ``model`` with the MODEL_* resilience settings; MODEL_RESILIENCE=false returns it as is."""
+    if os.getenv("MODEL_RESILIENCE", "true").lower() == "false":
+        return model
+    return ResilientModel(
+        model,
+        bucket=AdaptiveTokenBucket(
+            rate=float(os.getenv("MODEL_RATE_LIMIT", "5")),
+            burst=float(os.getenv("MODEL_RATE_BURST", "10")),
+        ),
+        max_retries=int(os.getenv("MODEL_MAX_RETRIES", "4")),
+        base_delay=float(os.getenv("MODEL_RETRY_BASE_DELAY", "0.5")),
+        max_delay=float(os.getenv("MODEL_RETRY_MAX_DELAY", "20")),
+        hedge=os.getenv("MODEL_HEDGE", "false").lower() == "true",
+        hedge_min_delay=float(os.getenv("MODEL_HEDGE_MIN_DELAY", "2")),
+    )
@@ -0,0 +1,258 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from strands.types.tools import AgentTool
+
+from .metrics import get_agent_metrics
+from .opensearch_client import get_opensearch_client
+
+# Same cap the OpenSearch MCP server puts on SearchIndexTool
+MAX_SEARCH_SIZE = 100
+# A named cluster or connection overrides make a call target another cluster
+# than the pooled client, so such calls go to the MCP server
+_CLUSTER_ARGS = (
+    "opensearch_cluster_name",
+    "opensearch_url",
+    "opensearch_username",
+    "opensearch_password",
+    "aws_region",
+)
+
+
+class SearchError(Exception):
+    """A search of a coalesced batch failed; the other searches are not affected."""
+
+
+class _Batch:
+    def __init__(self):
+        self.searches: List[Tuple[Dict[str, Any], Dict[str, Any], asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class SearchCoalescer:
+    """Merges searches submitted within ``window`` seconds into one ``_msearch``.
+
+    Tool calls of an agent run as tasks of one event loop, so searches the
+    model issues in parallel arrive within a few milliseconds. The first
+    search of a batch starts the window; a full batch (``max_batch``) is
+    sent at once. A batch of one is sent as a plain search.
+    """
+
+    def __init__(
+        self,
+        window: float = 0.005,
+        max_batch: int = 20,
+        client_factory: Callable[[], Any] = get_opensearch_client,
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self.client_factory = client_factory
+        self._batches: Dict[asyncio.AbstractEventLoop, _Batch] = {}
+        self._tasks: set = set()
+        self.requests = 0
+        self.searches = 0
+
+    async def search(self, index: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the search response for ``body``, raising SearchError when it failed."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = _Batch()
+            batch.timer = loop.call_later(self.window, self._flush, loop)
+        batch.searches.append(({"index": index}, body, future))
+        if len(batch.searches) >= self.max_batch:
+            self._flush(loop)
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        batch = self._batches.pop(loop, None)
+        if batch is None:
+            return
+        batch.timer.cancel()
+        task = loop.create_task(self._send(batch.searches))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, searches: List[Tuple[Dict[str, Any], Dict[str, Any], asyncio.Future]]) -> None:
+        self.requests += 1
+        self.searches += len(searches)
+        start = time.perf_counter()
+        try:
+            client = self.client_factory()
+            if len(searches) == 1:
+                header, body, _ = searches[0]
+                responses = [await asyncio.to_thread(client.search, index=header["index"], body=body)]
+            else:
+                lines = [line for header, body, _ in searches for line in (header, body)]
+                response = await asyncio.to_thread(client.msearch, body=lines)
+                responses = response["responses"]
+        except Exception as e:
+            for _, _, future in searches:
+                if not future.done():
+                    future.set_exception(SearchError(str(e)))
+            get_agent_metrics().record_search_batch(time.perf_counter() - start, len(searches), "error")
+            return
+
+        get_agent_metrics().record_search_batch(time.perf_counter() - start, len(searches), "success")
+        for (_, _, future), response in zip(searches, responses):
+            if future.done():  # the caller was cancelled
+                continue
+            error = response.get("error")
+            if error is not None:
+                if isinstance(error, dict):
+                    error = f"{error.get('type', 'error')}: {error.get('reason', '')}"
+                future.set_exception(SearchError(str(error)))
+            else:
+                future.set_result(response)
+
+
+def _parse_input(tool_input: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(tool_input, str):
+        try:
+            tool_input = json.loads(tool_input)
+        except json.JSONDecodeError:
+            return None
+    return tool_input if isinstance(tool_input, dict) else None
+
+
+def _query_body(value: Any) -> Optional[Dict[str, Any]]:
+    if value is None:
+        return {}
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return None
+    return dict(value) if isinstance(value, dict) else None
+
+
+def search_request(tool_name: str, tool_input: Any) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Return the (index, body) a SearchIndexTool or CountTool call runs, or None.
+
+    None means the call has arguments the coalescer does not reproduce
+    (CSV output, URL parameters, another cluster) and goes to the tool.
+    """
+    args = _parse_input(tool_input)
+    if not args or not isinstance(args.get("index"), str):
+        return None
+    args = {k: v for k, v in args.items() if v not in (None, "")}
+    if any(k in args for k in _CLUSTER_ARGS):
+        return None
+    extra = set(args) - {"index"}
+    if tool_name == "SearchIndexTool":
+        if extra - {"query_dsl", "size", "format"} or str(args.get("format", "json")).lower() != "json":
+            return None
+        body = _query_body(args.get("query_dsl"))
+        if body is None:
+            return None
+        # The size argument wins over the body's own size, e.g. 0 for aggregations
+        try:
+            size = int(args["size"] if "size" in args else body.get("size", 10))
+        except (TypeError, ValueError):
+            return None
+        body["size"] = min(size, MAX_SEARCH_SIZE)
+        return args["index"], body
+    if tool_name == "CountTool":
+        if extra - {"body"}:
+            return None
+        body = _query_body(args.get("body"))
+        if body is None or set(body) - {"query"}:
+            return None
+        return args["index"], {**body, "size": 0, "track_total_hits": True}
+    return None
+
+
+def _tool_text(tool_name: str, index: str, response: Dict[str, Any]) -> str:
+    # The text the MCP server returns for the same call
+    if tool_name == "CountTool":
+        total = response.get("hits", {}).get("total", {})
+        count = total.get("value", 0) if isinstance(total, dict) else total
+        return json.dumps({"count": count, "_shards": response.get("_shards", {})})
+    formatted = json.dumps(response, separators=(",", ":"), ensure_ascii=False)
+    return f"Search results from {index} (JSON format):\n{formatted}"
+
+
+class CoalescingTool(AgentTool):
+    """Runs SearchIndexTool and CountTool calls through a SearchCoalescer."""
+
+    def __init__(self, tool: AgentTool, coalescer: SearchCoalescer):
+        super().__init__()
+        self._tool = tool
+        self._coalescer = coalescer
+
+    @property
+    def tool_name(self) -> str:
+        return self._tool.tool_name
+
+    @property
+    def tool_spec(self):
+        return self._tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self._tool.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        request = search_request(self.tool_name, tool_use.get("input"))
+        if request is None:
+            async for event in self._tool.stream(tool_use, invocation_state, **kwargs):
+                yield event
+            return
+
+        index, body = request
+        try:
+            response = await self._coalescer.search(index, body)
+        except SearchError as e:
+            operation = "counting documents" if self.tool_name == "CountTool" else "searching index"
+            yield {
+                "toolUseId": tool_use["toolUseId"],
+                "status": "error",
+                "content": [{"text": f"Error {operation}: {e}"}],
+            }
+            return
+        yield {
+            "toolUseId": tool_use["toolUseId"],
+            "status": "success",
+            "content": [{"text": _tool_text(self.tool_name, index, response)}],
+        }
+
+
+COALESCED_TOOLS = ("SearchIndexTool", "CountTool")
+
+
+def coalesce_tools(tools: List[AgentTool], coalescer: Optional[SearchCoalescer] = None) -> List[AgentTool]:
+    """Send the searches of a tool list through the coalescer.
+
+    Returns the tools unchanged when SEARCH_COALESCE_WINDOW_MS is 0.
+    """
+    coalescer = coalescer or get_search_coalescer()
+    if coalescer is None:
+        return tools
+    return [
+        CoalescingTool(tool, coalescer) if tool.tool_name in COALESCED_TOOLS else tool
+        for tool in tools
+    ]
+
+
+_search_coalescer: Optional[SearchCoalescer] = None
+_search_coalescer_lock = threading.Lock()
+
+
+def get_search_coalescer() -> Optional[SearchCoalescer]:
+    """Return the process-wide coalescer, or None when SEARCH_COALESCE_WINDOW_MS is 0."""
+    global _search_coalescer
+    window = float(os.getenv("SEARCH_COALESCE_WINDOW_MS", "5")) / 1000
+    if window <= 0:
+        return None
+    with _search_coalescer_lock:
+        if _search_coalescer is None:
+            _search_coalescer = SearchCoalescer(
+                window=window,
+                max_batch=int(os.getenv("SEARCH_COALESCE_MAX_BATCH", "20")),
+            )
+        return _search_coalescer
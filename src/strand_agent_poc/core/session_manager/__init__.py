@@ -1 +1,6 @@
-from .agent_core_session import AgentCoreSessionRepository
+from .factory import create_session_manager
+from .sqlite_session import (
+    SQLiteSessionManager,
+    SQLiteSessionRepository,
+    get_sqlite_session_repository,
+)
@@ -0,0 +1,25 @@
+import os
+
+from strands.session.file_session_manager import FileSessionManager
+from strands.session.session_manager import SessionManager
+
+from .sqlite_session import SQLiteSessionManager, get_sqlite_session_repository
+
+
+def create_session_manager(session_id: str) -> SessionManager:
+    """Build the session manager for ``session_id`` on the SESSION_BACKEND store.
+
+    ``file`` (default) keeps one JSON file per message under SESSION_STORAGE_DIR;
+    ``sqlite`` uses the shared database at SESSION_DB_PATH.
+    """
+    backend = os.getenv("SESSION_BACKEND", "file").lower()
+    if backend == "sqlite":
+        return SQLiteSessionManager(
+            session_id=session_id, repository=get_sqlite_session_repository()
+        )
+    if backend != "file":
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    return FileSessionManager(
+        storage_dir=os.getenv("SESSION_STORAGE_DIR", "./sessions"),
+        session_id=session_id,
+    )
@@ -0,0 +1,301 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from strands.hooks import AfterInvocationEvent, HookRegistry
+from strands.session.repository_session_manager import RepositorySessionManager
+from strands.session.session_repository import SessionRepository
+from strands.types.exceptions import SessionException
+from strands.types.session import Session, SessionAgent, SessionMessage
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS agents (
+    session_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, agent_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    message_id INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (session_id, agent_id, message_id)
+);
+"""
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class SQLiteSessionRepository(SessionRepository):
+    """Session repository on one SQLite database in WAL mode.
+
+    Message and agent writes are buffered and committed in one transaction
+    per agent turn (see ``SQLiteSessionManager``), so a turn costs one
+    commit instead of a file write per message and per state update.
+    Agent state updates within a batch are coalesced. Reads see buffered
+    writes. ``compact`` checkpoints the WAL, drops expired sessions and
+    returns free pages to the file system.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_pending: int = 256,
+        compact_every: int = 1000,
+        retention_seconds: Optional[float] = None,
+    ):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_pending = max_pending
+        self.compact_every = compact_every
+        self.retention_seconds = retention_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # page_size and auto_vacuum only take effect on a new database; large
+        # pages keep several multi-KB messages per page instead of one
+        self._conn.execute("PRAGMA page_size=16384")
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.RLock()
+        self._pending_messages: Dict[Tuple[str, str, int], str] = {}
+        self._pending_agents: Dict[Tuple[str, str], str] = {}
+        self._flushes = 0
+
+    # Sessions are written straight away: they are created once per session
+
+    def create_session(self, session: Session, **kwargs: Any) -> Session:
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO sessions (session_id, data, updated_at) VALUES (?, ?, ?)",
+                    (session.session_id, _dumps(session.to_dict()), time.time()),
+                )
+            except sqlite3.IntegrityError:
+                raise SessionException(f"Session {session.session_id} already exists")
+        return session
+
+    def read_session(self, session_id: str, **kwargs: Any) -> Optional[Session]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return Session.from_dict(json.loads(row[0])) if row else None
+
+    def delete_session(self, session_id: str, **kwargs: Any) -> None:
+        with self._lock:
+            self._drop_pending(session_id)
+            self._delete_sessions([session_id])
+
+    # Agents and messages are buffered until the end of the turn
+
+    def create_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        with self._lock:
+            self._pending_agents[(session_id, session_agent.agent_id)] = _dumps(
+                session_agent.to_dict()
+            )
+            self._maybe_flush()
+
+    def _agent_data(self, session_id: str, agent_id: str) -> Optional[str]:
+        with self._lock:
+            data = self._pending_agents.get((session_id, agent_id))
+            if data is None:
+                row = self._conn.execute(
+                    "SELECT data FROM agents WHERE session_id = ? AND agent_id = ?",
+                    (session_id, agent_id),
+                ).fetchone()
+                data = row[0] if row else None
+        return data
+
+    def read_agent(self, session_id: str, agent_id: str, **kwargs: Any) -> Optional[SessionAgent]:
+        data = self._agent_data(session_id, agent_id)
+        return SessionAgent.from_dict(json.loads(data)) if data else None
+
+    def update_agent(self, session_id: str, session_agent: SessionAgent, **kwargs: Any) -> None:
+        # Called on every message, so skip building a SessionAgent for created_at
+        previous = self._agent_data(session_id, session_agent.agent_id)
+        if previous is None:
+            raise SessionException(
+                f"Agent {session_agent.agent_id} in session {session_id} does not exist"
+            )
+        session_agent.created_at = json.loads(previous)["created_at"]
+        self.create_agent(session_id, session_agent)
+
+    def create_message(
+        self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any
+    ) -> None:
+        with self._lock:
+            key = (session_id, agent_id, session_message.message_id)
+            self._pending_messages[key] = _dumps(session_message.to_dict())
+            self._maybe_flush()
+
+    def _message_data(self, session_id: str, agent_id: str, message_id: int) -> Optional[str]:
+        with self._lock:
+            data = self._pending_messages.get((session_id, agent_id, message_id))
+            if data is None:
+                row = self._conn.execute(
+                    "SELECT data FROM messages WHERE session_id = ? AND agent_id = ? AND message_id = ?",
+                    (session_id, agent_id, message_id),
+                ).fetchone()
+                data = row[0] if row else None
+        return data
+
+    def read_message(
+        self, session_id: str, agent_id: str, message_id: int, **kwargs: Any
+    ) -> Optional[SessionMessage]:
+        data = self._message_data(session_id, agent_id, message_id)
+        return SessionMessage.from_dict(json.loads(data)) if data else None
+
+    def update_message(
+        self, session_id: str, agent_id: str, session_message: SessionMessage, **kwargs: Any
+    ) -> None:
+        previous = self._message_data(session_id, agent_id, session_message.message_id)
+        if previous is None:
+            raise SessionException(f"Message {session_message.message_id} does not exist")
+        session_message.created_at = json.loads(previous)["created_at"]
+        self.create_message(session_id, agent_id, session_message)
+
+    def list_messages(
+        self,
+        session_id: str,
+        agent_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        **kwargs: Any,
+    ) -> List[SessionMessage]:
+        with self._lock:
+            # Buffered messages are the newest, so commit them to keep the order simple
+            if any(k[0] == session_id and k[1] == agent_id for k in self._pending_messages):
+                self.flush()
+            rows = self._conn.execute(
+                "SELECT data FROM messages WHERE session_id = ? AND agent_id = ? "
+                "ORDER BY message_id LIMIT ? OFFSET ?",
+                (session_id, agent_id, -1 if limit is None else limit, offset),
+            ).fetchall()
+        return [SessionMessage.from_dict(json.loads(row[0])) for row in rows]
+
+    # Batching and maintenance
+
+    def flush(self) -> None:
+        """Commit the buffered writes in one transaction."""
+        with self._lock:
+            if not self._pending_messages and not self._pending_agents:
+                return
+            now = time.time()
+            sessions = {k[0] for k in self._pending_messages} | {k[0] for k in self._pending_agents}
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO agents (session_id, agent_id, data) VALUES (?, ?, ?)",
+                    [(s, a, data) for (s, a), data in self._pending_agents.items()],
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO messages (session_id, agent_id, message_id, data) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(s, a, m, data) for (s, a, m), data in self._pending_messages.items()],
+                )
+                self._conn.executemany(
+                    "UPDATE sessions SET updated_at = ? WHERE session_id = ?",
+                    [(now, s) for s in sessions],
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            self._pending_agents.clear()
+            self._pending_messages.clear()
+            self._flushes += 1
+            if self.compact_every and self._flushes % self.compact_every == 0:
+                self.compact()
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending_messages) + len(self._pending_agents) >= self.max_pending:
+            self.flush()
+
+    def _drop_pending(self, session_id: str) -> None:
+        for pending in (self._pending_messages, self._pending_agents):
+            for key in [k for k in pending if k[0] == session_id]:
+                del pending[key]
+
+    def _delete_sessions(self, session_ids: List[str]) -> None:
+        params = [(s,) for s in session_ids]
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in ("messages", "agents", "sessions"):
+                self._conn.executemany(f"DELETE FROM {table} WHERE session_id = ?", params)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def compact(self) -> None:
+        """Drop sessions older than the retention, then shrink the WAL and the database."""
+        with self._lock:
+            if self.retention_seconds:
+                cutoff = time.time() - self.retention_seconds
+                expired = [
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT session_id FROM sessions WHERE updated_at < ?", (cutoff,)
+                    )
+                ]
+                for session_id in expired:
+                    self._drop_pending(session_id)
+                if expired:
+                    self._delete_sessions(expired)
+            self._conn.execute("PRAGMA incremental_vacuum")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+
+class SQLiteSessionManager(RepositorySessionManager):
+    """Session manager on a shared SQLiteSessionRepository; commits once per agent turn."""
+
+    def __init__(self, session_id: str, repository: SQLiteSessionRepository, **kwargs: Any):
+        self.repository = repository
+        super().__init__(session_id=session_id, session_repository=repository, **kwargs)
+
+    def register_hooks(self, registry: HookRegistry, **kwargs: Any) -> None:
+        super().register_hooks(registry, **kwargs)
+        # Registered after the base hooks, which sync the agent state first
+        registry.add_callback(AfterInvocationEvent, lambda event: self.repository.flush())
+
+
+_repositories: Dict[str, SQLiteSessionRepository] = {}
+_repositories_lock = threading.Lock()
+
+
+def get_sqlite_session_repository(path: Optional[str] = None) -> SQLiteSessionRepository:
+    """Return the process-wide repository for ``path`` (SESSION_DB_PATH by default)."""
+    path = path or os.getenv("SESSION_DB_PATH", "./sessions.db")
+    with _repositories_lock:
+        repository = _repositories.get(path)
+        if repository is None:
+            retention_days = os.getenv("SESSION_RETENTION_DAYS")
+            repository = SQLiteSessionRepository(
+                path,
+                retention_seconds=float(retention_days) * 86400 if retention_days else None,
+            )
+            atexit.register(repository.close)
+            _repositories[path] = repository
+        return repository
@@ -0,0 +1,110 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+
+class PlanStep:
+    """A planned step and the ids of the steps it depends on."""
+
+    def __init__(self, step_id: str, text: str, depends_on: Iterable[str] = ()):
+        self.id = step_id
+        self.text = text
+        self.depends_on = list(depends_on)
+
+    def __repr__(self) -> str:
+        return f"PlanStep(id={self.id!r}, text={self.text!r}, depends_on={self.depends_on!r})"
+
+
+def step_text(step: Any) -> str:
+    """Text of a raw planner step, which is either a string or a step object."""
+    if isinstance(step, dict):
+        return str(step.get("step") or step.get("input") or "")
+    return str(step)
+
+
+def step_key(text: str) -> str:
+    """Comparison key of a step text: case and whitespace are ignored."""
+    return " ".join(text.split()).lower()
+
+
+def same_step(a: str, b: str) -> bool:
+    """Whether two step texts are the same step, ignoring case and whitespace."""
+    return step_key(a) == step_key(b)
+
+
+def normalize_steps(raw_steps: List[Any]) -> List[PlanStep]:
+    """Turn the planner's ``steps`` array into PlanSteps.
+
+    Plain strings keep the sequential semantics of the original schema: each
+    one depends on the string step before it. Step objects
+    (``{"id", "step", "depends_on"}``) declare their dependencies explicitly.
+    """
+    steps: List[PlanStep] = []
+    previous_id: Optional[str] = None
+    for i, raw in enumerate(raw_steps):
+        if isinstance(raw, dict):
+            step_id = str(raw.get("id") or f"step-{i + 1}")
+            depends_on = raw.get("depends_on") or []
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            steps.append(PlanStep(step_id, step_text(raw), map(str, depends_on)))
+        else:
+            step_id = f"step-{i + 1}"
+            steps.append(
+                PlanStep(step_id, str(raw), [previous_id] if previous_id else [])
+            )
+        previous_id = step_id
+    return steps
+
+
+class StepScheduler:
+    """Dependency-aware scheduler that runs ready plan steps concurrently."""
+
+    def __init__(self, max_parallel_steps: int = 4):
+        self.max_parallel_steps = max(1, max_parallel_steps)
+
+    def ready_steps(
+        self, steps: List[PlanStep], completed_texts: Iterable[str], limit: int
+    ) -> List[PlanStep]:
+        """Uncompleted steps whose dependencies are all satisfied, in plan order.
+
+        A dependency on an id that is no longer in the plan is treated as
+        satisfied: the reflection drops steps once they have been executed.
+        Steps are matched with ``step_key``, so a step the reflection restates
+        with different case or spacing is still completed.
+        """
+        completed = {step_key(text) for text in completed_texts}
+        by_id = {s.id: s for s in steps}
+        pending = []
+        ready = []
+        for step in steps:
+            key = step_key(step.text)
+            if key in completed or key in pending:
+                continue
+            pending.append(key)
+            if all(
+                dep not in by_id or step_key(by_id[dep].text) in completed
+                for dep in step.depends_on
+            ):
+                ready.append(step)
+            if len(ready) >= min(limit, self.max_parallel_steps):
+                break
+
+        if not ready and pending:
+            # Dependency cycle or dangling reference: fall back to plan order
+            ready = [next(s for s in steps if step_key(s.text) == pending[0])]
+        return ready
+
+    async def run_batch(
+        self,
+        steps: List[PlanStep],
+        run_step: Callable[[PlanStep], Awaitable[str]],
+    ) -> List[Tuple[PlanStep, str]]:
+        """Run ``steps`` concurrently and return their results in plan order."""
+        slots = asyncio.Semaphore(self.max_parallel_steps)
+
+        async def run(step: PlanStep) -> str:
+            async with slots:
+                return await run_step(step)
+
+        results = await asyncio.gather(*(run(step) for step in steps))
+        return list(zip(steps, results))
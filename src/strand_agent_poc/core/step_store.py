@@ -0,0 +1,90 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from strands import tool
+
+
+def digest_text(text: str, max_chars: int) -> str:
+    """Compact a step result to at most about ``max_chars`` characters.
+
+    Keeps the head and the tail, where executors usually put their summary.
+    """
+    text = re.sub(r"\s+", " ", text).strip()
+    if len(text) <= max_chars:
+        return text
+    head = max_chars * 2 // 3
+    tail = max_chars - head
+    return f"{text[:head]} … {text[-tail:]} [{len(text)} chars total]"
+
+
+class StepResultStore:
+    """Keeps full executor outputs out of the prompt under stable ids.
+
+    The reflection prompt only carries a digest of each result; the planner
+    reads a full result through the ``expand_step_result`` tool.
+    """
+
+    def __init__(self, digest_chars: int = 400, latest_digest_chars: int = 2000):
+        self.digest_chars = digest_chars
+        # Results of the latest batch get a larger budget, they drive the next plan
+        self.latest_digest_chars = latest_digest_chars
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._order: List[str] = []
+        self._latest: List[str] = []
+        self._lock = threading.Lock()
+
+    def put(self, step: str, result: str) -> str:
+        with self._lock:
+            result_id = f"result-{len(self._order) + 1}"
+            self._records[result_id] = {"id": result_id, "input": step, "result": result}
+            self._order.append(result_id)
+            self._latest.append(result_id)
+            return result_id
+
+    def get(self, result_id: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(result_id)
+
+    def mark_reflected(self) -> None:
+        """Called once the planner has seen the latest results."""
+        with self._lock:
+            self._latest = []
+
+    def digests(self) -> List[Dict[str, str]]:
+        with self._lock:
+            order, latest = list(self._order), set(self._latest)
+        digests = []
+        for result_id in order:
+            record = self._records[result_id]
+            max_chars = (
+                self.latest_digest_chars if result_id in latest else self.digest_chars
+            )
+            digests.append(
+                {
+                    "id": result_id,
+                    "input": record["input"],
+                    "digest": digest_text(str(record["result"]), max_chars),
+                }
+            )
+        return digests
+
+
+def make_expand_step_result_tool(store: StepResultStore):
+    """Build the planner tool that expands a step result id to the full output."""
+
+    @tool(
+        name="expand_step_result",
+        description="Get the full output of a completed step by its result id (for example result-1). Use it only when the digest of that step is not enough to decide the next steps or to write the final result.",
+    )
+    def expand_step_result(result_id: str) -> str:
+        """Get the full output of a completed step
+
+        Args:
+            result_id: The id of the step result, as listed with the completed steps
+        """
+        record = store.get(result_id)
+        if record is None:
+            return f"Unknown step result id: {result_id}"
+        return str(record["result"])
+
+    return expand_step_result
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from strands.types.tools import AgentTool
+
+# Seconds a result stays valid, per tool. Tools that are not listed (searches,
+# counts, explain) always go to the cluster.
+DEFAULT_TOOL_TTLS: Dict[str, float] = {
+    "ListIndexTool": 300.0,
+    "IndexMappingTool": 600.0,
+    "GetShardsTool": 60.0,
+    "ClusterHealthTool": 30.0,
+    "index_insight_tool": 600.0,
+    "index_insights_batch_tool": 600.0,
+}
+
+
+def cache_key(tool_name: str, tool_input: Any) -> Tuple[str, str]:
+    if isinstance(tool_input, str):
+        try:
+            tool_input = json.loads(tool_input)
+        except json.JSONDecodeError:
+            return tool_name, tool_input.strip()
+    if isinstance(tool_input, dict):
+        tool_input = {k: v for k, v in tool_input.items() if v is not None}
+    return tool_name, json.dumps(
+        tool_input, sort_keys=True, separators=(",", ":"), default=str
+    )
+
+
+class ToolResultCache:
+    """LRU cache of tool results with per-tool TTLs and a memory cap."""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.ttls = dict(DEFAULT_TOOL_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def cacheable(self, tool_name: str) -> bool:
+        return self.ttls.get(tool_name, 0) > 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: Tuple[str, str], result: Dict[str, Any]) -> None:
+        size = len(json.dumps(result, default=str))
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttls.get(key[0], 0)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, size, result)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+def _has_error_entries(text: str) -> bool:
+    """Whether a batch result ({index: {insight type: response}}) holds a failed entry."""
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return False
+    if not isinstance(parsed, dict):
+        return False
+    return any(
+        isinstance(entry, dict) and "error" in entry
+        for entries in parsed.values()
+        if isinstance(entries, dict)
+        for entry in entries.values()
+    )
+
+
+def _successful(result: Any) -> bool:
+    if not isinstance(result, dict) or result.get("status") != "success":
+        return False
+    # Function tools report failures as "Error ..." text with a success status,
+    # batch tools as error entries next to the responses that succeeded
+    return not any(
+        str(block.get("text", "")).startswith("Error")
+        or _has_error_entries(str(block.get("text", "")))
+        for block in result.get("content", [])
+    )
+
+
+class CachingTool(AgentTool):
+    """Serves a tool's successful results from a ToolResultCache."""
+
+    def __init__(self, tool: AgentTool, cache: ToolResultCache):
+        super().__init__()
+        self._tool = tool
+        self._cache = cache
+
+    @property
+    def tool_name(self) -> str:
+        return self._tool.tool_name
+
+    @property
+    def tool_spec(self):
+        return self._tool.tool_spec
+
+    @property
+    def tool_type(self) -> str:
+        return self._tool.tool_type
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        key = cache_key(self.tool_name, tool_use.get("input"))
+        cached = self._cache.get(key)
+        if cached is not None:
+            yield {**cached, "toolUseId": tool_use["toolUseId"]}
+            return
+
+        result = None
+        async for event in self._tool.stream(tool_use, invocation_state, **kwargs):
+            result = event
+            yield event
+        # The last event of a tool stream is its ToolResult
+        if _successful(result):
+            self._cache.put(key, result)
+
+
+def cache_tools(tools: List[AgentTool], cache: Optional["ToolResultCache"] = None) -> List[AgentTool]:
+    """Wrap the cacheable tools of a tool list; the others are returned as is."""
+    cache = cache or get_tool_cache()
+    return [
+        CachingTool(tool, cache) if cache.cacheable(tool.tool_name) else tool
+        for tool in tools
+    ]
+
+
+_tool_cache: Optional[ToolResultCache] = None
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Return the process-wide tool result cache shared by all steps and sessions."""
+    global _tool_cache
+    with _tool_cache_lock:
+        if _tool_cache is None:
+            _tool_cache = ToolResultCache(
+                max_bytes=int(os.getenv("TOOL_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+            )
+        return _tool_cache
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .mcp_pool import MCPServerConfig, MCPSessionPool, get_mcp_pool
+
+if TYPE_CHECKING:
+    from strands.tools.mcp import MCPClient
+
+
+def tool_set_fingerprint(tools: List[Any]) -> str:
+    """Stable fingerprint of a tool set, derived from the tool specs."""
+    specs = sorted(
+        (json.dumps(tool.tool_spec, sort_keys=True, default=str) for tool in tools)
+    )
+    return hashlib.sha256("\n".join(specs).encode("utf-8")).hexdigest()[:16]
+
+
+def summarize_tool_spec(spec: Dict[str, Any], max_chars: int = 300) -> str:
+    """One line per tool: its description and parameter names instead of the full JSON schema.
+
+    The planner only needs to know what a tool is for; the executor gets the
+    full spec of the tools it is given.
+    """
+    description = " ".join(str(spec.get("description", "")).split())
+    if len(description) > max_chars:
+        cut = description.rfind(". ", 0, max_chars)
+        description = description[: cut + 1] if cut > 0 else description[:max_chars] + "…"
+    schema = spec.get("inputSchema", {}).get("json", {})
+    required = set(schema.get("required", []))
+    params = [
+        f"{name} ({prop.get('type', 'any')}{', required' if name in required else ''})"
+        for name, prop in schema.get("properties", {}).items()
+    ]
+    return f"{description} Parameters: {', '.join(params) if params else 'none'}"
+
+
+def render_tool_prompt(tools: List[Any]) -> str:
+    compact = os.getenv("TOOL_PROMPT_FORMAT", "compact") == "compact"
+    tool_descriptions = "\n".join(
+        [
+            f"Tool {i+1} - {tool.tool_name}: "
+            + (summarize_tool_spec(tool.tool_spec) if compact else str(tool.tool_spec))
+            for i, tool in enumerate(tools)
+        ]
+    )
+
+    # Add index_insight tool description
+    index_insight_desc = f"Tool {len(tools)+1} - index_insight_tool: Get ML insights for a given OpenSearch index. Parameters: index (str), insight_type (STATISTICAL_DATA|FIELD_DESCRIPTION|LOG_RELATED_INDEX_CHECK, default: LOG_RELATED_INDEX_CHECK)"
+    index_insight_desc += f"\nTool {len(tools)+2} - index_insights_batch_tool: Get ML insights for several OpenSearch indices in one call, fetched concurrently. Parameters: indices (list of str), insight_types (list of STATISTICAL_DATA|FIELD_DESCRIPTION|LOG_RELATED_INDEX_CHECK, default: [LOG_RELATED_INDEX_CHECK])"
+    index_insight_desc += f"\nTool {len(tools)+3} - aggregate_index_tool: Count, trend or summarize an index in one aggregation instead of fetching raw documents; returns a small table. Parameters: index (str), time_field (str, default: @timestamp), start/end (e.g. now-7d, now), filter (query DSL clause), interval (e.g. 1h), group_by (keyword field), top (int, default: 10), metric_field (numeric field), percentiles (list of float, default: [50, 95, 99])"
+
+    return f"""Available Tools:
+In this environment, you have access to the tools listed below. Use these tools to execute the given instruction, and do not reference or use any tools not listed here.
+{tool_descriptions}
+{index_insight_desc}
+No other tools are available. Do not invent tools. Only use tools to execute the instruction.
+        """
+
+
+class ToolCatalog:
+    """Tool specs and rendered tool prompt for one MCP server configuration.
+
+    The listed tool objects are cached per MCP client (they call back into the
+    session that listed them), while the specs, fingerprint and prompt are
+    shared by every client of the same configuration. Entries are refreshed
+    when the TTL expires or when a (re)started session reports a different
+    tool set.
+    """
+
+    def __init__(self, pool: MCPSessionPool, ttl: float = 300.0):
+        self.pool = pool
+        self.ttl = ttl
+        self.fingerprint: Optional[str] = None
+        self.tool_specs: List[Dict[str, Any]] = []
+        self._prompt: Optional[str] = None
+        self._fetched_at = 0.0
+        self._client_tools: "weakref.WeakKeyDictionary[MCPClient, Tuple[float, List[Any]]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _expired(self, fetched_at: float) -> bool:
+        return time.monotonic() - fetched_at >= self.ttl
+
+    def _update(self, tools: List[Any]) -> None:
+        fingerprint = tool_set_fingerprint(tools)
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            self.tool_specs = [tool.tool_spec for tool in tools]
+            self._prompt = render_tool_prompt(tools)
+        self._fetched_at = time.monotonic()
+
+    def tools(self, client: "MCPClient") -> List[Any]:
+        """Return the MCP tools of a leased client, listing them only when stale."""
+        with self._lock:
+            cached = self._client_tools.get(client)
+            if cached is not None and not self._expired(cached[0]):
+                return cached[1]
+
+        tools = list(client.list_tools_sync())
+        with self._lock:
+            self._client_tools[client] = (time.monotonic(), tools)
+            self._update(tools)
+        return tools
+
+    def prompt(self) -> str:
+        """Return the rendered "Available Tools" prompt."""
+        with self._lock:
+            if self._prompt is not None and not self._expired(self._fetched_at):
+                return self._prompt
+
+        with self.pool.lease() as client:
+            self.tools(client)
+        return self._prompt
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._client_tools = weakref.WeakKeyDictionary()
+            self._fetched_at = 0.0
+
+
+_catalogs: Dict[MCPServerConfig, ToolCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_tool_catalog(pool: Optional[MCPSessionPool] = None) -> ToolCatalog:
+    """Return the shared catalog for the pool's MCP server configuration."""
+    pool = pool or get_mcp_pool()
+    with _catalogs_lock:
+        catalog = _catalogs.get(pool.config)
+        if catalog is None or catalog.pool is not pool:
+            catalog = ToolCatalog(
+                pool, ttl=float(os.getenv("TOOL_CATALOG_TTL", "300"))
+            )
+            _catalogs[pool.config] = catalog
+        return catalog
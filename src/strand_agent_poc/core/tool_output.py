@@ -0,0 +1,175 @@
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from strands.hooks import HookProvider, HookRegistry
+from strands.experimental.hooks import AfterToolInvocationEvent
+
+# A compaction stage renders a parsed JSON payload as compact text, or returns
+# None to leave it to the next stage
+CompactionStage = Callable[[Any], Optional[str]]
+
+
+def minify_json(payload: Any) -> Optional[str]:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _flatten(value: Any, prefix: str = "", out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    out = {} if out is None else out
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(v, f"{prefix}.{k}" if prefix else str(k), out)
+    else:
+        out[prefix] = value
+    return out
+
+
+def format_cell(value: Any) -> str:
+    """Render a value as one cell of a ``|``-separated table row."""
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        value = minify_json(value)
+    return value.replace("|", "\\|").replace("\n", "\\n")
+
+
+def render_hits_table(payload: Any) -> Optional[str]:
+    """Render a search response's hit list as a table with field names shown once.
+
+    Fields that have the same value in every hit are printed once above the
+    table instead of being repeated on each row.
+    """
+    if not isinstance(payload, dict):
+        return None
+    hits = payload.get("hits")
+    if not isinstance(hits, dict) or not isinstance(hits.get("hits"), list):
+        return None
+
+    rows = []
+    for hit in hits["hits"]:
+        if not isinstance(hit, dict):
+            return None
+        row = {"_index": hit.get("_index"), "_id": hit.get("_id")}
+        _flatten(hit.get("_source") or hit.get("fields") or {}, out=row)
+        rows.append(row)
+
+    columns: List[str] = []
+    for row in rows:
+        columns.extend(k for k in row if k not in columns)
+
+    constants: List[Tuple[str, Any]] = []
+    if len(rows) > 1:
+        for column in list(columns):
+            values = [minify_json(row.get(column)) for row in rows]
+            if all(v == values[0] for v in values):
+                constants.append((column, rows[0].get(column)))
+                columns.remove(column)
+
+    total = hits.get("total")
+    if isinstance(total, dict):
+        total = total.get("value")
+    lines = [f"hits: {len(rows)} shown of {total if total is not None else len(rows)} total"]
+    if constants:
+        lines.append(
+            "same in all hits: " + ", ".join(f"{k}={format_cell(v)}" for k, v in constants)
+        )
+    if columns:
+        lines.append(" | ".join(columns))
+        lines.extend(" | ".join(format_cell(row.get(c)) for c in columns) for row in rows)
+
+    rest = {k: v for k, v in payload.items() if k not in ("hits", "_shards")}
+    if rest:
+        lines.append(minify_json(rest))
+    return "\n".join(lines)
+
+
+def render_msearch_tables(payload: Any) -> Optional[str]:
+    if not isinstance(payload, dict) or not isinstance(payload.get("responses"), list):
+        return None
+    parts = []
+    for i, response in enumerate(payload["responses"]):
+        parts.append(f"response {i + 1}:\n{render_hits_table(response) or minify_json(response)}")
+    return "\n".join(parts)
+
+
+DEFAULT_STAGES: List[CompactionStage] = [
+    render_msearch_tables,
+    render_hits_table,
+    minify_json,
+]
+
+
+def _split_json(text: str) -> Tuple[str, Any, str]:
+    """Find the JSON document in a tool output such as ``"Search results from x:\\n{...}"``."""
+    decoder = json.JSONDecoder()
+    attempts = 0
+    for i, ch in enumerate(text):
+        if ch in "{[":
+            try:
+                payload, end = decoder.raw_decode(text, i)
+            except json.JSONDecodeError:
+                attempts += 1
+                if attempts >= 8:
+                    break
+                continue
+            return text[:i], payload, text[end:]
+    raise ValueError("no JSON document")
+
+
+def truncate_bytes(text: str, max_bytes: int) -> str:
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    kept = encoded[:max_bytes].decode("utf-8", errors="ignore")
+    return f"{kept}\n[... truncated {len(encoded) - max_bytes} bytes]"
+
+
+class ToolOutputCompactor(HookProvider):
+    """Rewrites tool results into token-efficient text before the model sees them."""
+
+    def __init__(
+        self,
+        stages: Optional[List[CompactionStage]] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.stages = list(DEFAULT_STAGES if stages is None else stages)
+        # Roughly 4 bytes per token for English/JSON text
+        self.max_bytes = (
+            max_bytes
+            if max_bytes is not None
+            else int(os.getenv("TOOL_OUTPUT_MAX_BYTES", "24000"))
+        )
+
+    def register_hooks(self, registry: HookRegistry, **kwargs) -> None:
+        registry.add_callback(AfterToolInvocationEvent, self.compact_result)
+
+    def compact_text(self, text: str) -> str:
+        try:
+            prefix, payload, suffix = _split_json(text)
+        except ValueError:
+            return truncate_bytes(text, self.max_bytes)
+        compacted = self._render(payload)
+        return truncate_bytes(f"{prefix}{compacted}{suffix}".strip(), self.max_bytes)
+
+    def _render(self, payload: Any) -> str:
+        for stage in self.stages:
+            rendered = stage(payload)
+            if rendered is not None:
+                return rendered
+        return minify_json(payload)
+
+    def compact_result(self, event: AfterToolInvocationEvent) -> None:
+        result = event.result
+        if not result or not result.get("content"):
+            return
+        content = []
+        for block in result["content"]:
+            if "text" in block:
+                content.append({"text": self.compact_text(block["text"])})
+            elif "json" in block:
+                content.append(
+                    {"text": truncate_bytes(self._render(block["json"]), self.max_bytes)}
+                )
+            else:
+                content.append(block)
+        event.result = {**result, "content": content}
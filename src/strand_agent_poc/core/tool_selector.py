@@ -0,0 +1,129 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Splits CamelCase tool names as well as prose: "SearchIndexTool" -> search, index, tool
+_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_STOPWORDS = frozenset(
+    "a an the to of in on for from by with and or is are be it its this that use using "
+    "tool tools get all any each per given when".split()
+)
+# Words the planner uses for the same thing the tool descriptions name differently
+_ALIASES = {"indices": "index", "indexes": "index", "docs": "document", "counts": "count"}
+
+# What planner steps say when they need one of the OpenSearch MCP tools,
+# beyond the words of the tool description
+TOOL_KEYWORDS: Dict[str, str] = {
+    "ListIndexTool": "list indices index pattern exist",
+    "IndexMappingTool": "mapping fields field schema type keyword",
+    "SearchIndexTool": "search query filter aggregate aggregation logs errors sample histogram terms",
+    "CountTool": "count number how many",
+    "GetShardsTool": "shards shard allocation size",
+    "ClusterHealthTool": "cluster health status nodes",
+    "MsearchTool": "multiple searches msearch",
+    "ExplainTool": "explain why document matches score",
+    "aggregate_index_tool": "count trend over time histogram top terms group breakdown percentile latency distribution spike error rate",
+}
+# The general purpose search tool can answer most steps, so it is always kept
+ALWAYS_SELECTED = ("SearchIndexTool",)
+
+
+def tokenize(text: str) -> List[str]:
+    words = []
+    for word in _WORD.findall(text):
+        word = word.lower()
+        word = _ALIASES.get(word, word)
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        if word not in _STOPWORDS:
+            words.append(word)
+    return words
+
+
+def tool_document(spec: Dict[str, Any]) -> List[str]:
+    """Words a tool is found by: its name (twice), description, keywords and parameters."""
+    schema = spec.get("inputSchema", {}).get("json", {})
+    properties = schema.get("properties", {})
+    text = " ".join(
+        [spec["name"], spec["name"], spec.get("description", "")]
+        + [TOOL_KEYWORDS.get(spec["name"], "")]
+        + [f"{name} {p.get('description', '')}" for name, p in properties.items()]
+    )
+    return tokenize(text)
+
+
+class ToolSelector:
+    """BM25 ranking of tools by how well their spec matches a step.
+
+    Tools the step names explicitly ("Use SearchIndexTool to ...") and the
+    ``always`` tools are selected first; the remaining slots go to the best
+    ranked tools. When no tool matches at all, every tool is kept.
+    """
+
+    def __init__(
+        self,
+        specs: Sequence[Dict[str, Any]],
+        always: Sequence[str] = ALWAYS_SELECTED,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.names = [spec["name"] for spec in specs]
+        self.always = [name for name in always if name in self.names]
+        self.k1 = k1
+        self.b = b
+        self._docs = [Counter(tool_document(spec)) for spec in specs]
+        self._lengths = [sum(doc.values()) for doc in self._docs]
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        df = Counter(word for doc in self._docs for word in doc)
+        n = len(self._docs)
+        self._idf = {word: math.log(1 + (n - f + 0.5) / (f + 0.5)) for word, f in df.items()}
+
+    def rank(self, task: str) -> List[Tuple[float, str]]:
+        words = Counter(tokenize(task))
+        scores = []
+        for name, doc, length in zip(self.names, self._docs, self._lengths):
+            score = 0.0
+            for word in words:
+                tf = doc.get(word)
+                if tf:
+                    norm = self.k1 * (1 - self.b + self.b * length / self._avg_length)
+                    score += self._idf[word] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append((score, name))
+        scores.sort(key=lambda s: s[0], reverse=True)
+        return scores
+
+    def select(self, task: str, k: int) -> List[str]:
+        lowered = task.lower()
+        named = [name for name in self.names if name.lower() in lowered]
+        ranked = [name for score, name in self.rank(task) if score > 0 and name not in named]
+        if not named and not ranked:
+            return list(self.names)
+        first = named + [name for name in self.always if name not in named]
+        ranked = [name for name in ranked if name not in first]
+        selected = set(first + ranked[: max(0, k - len(first))])
+        return [name for name in self.names if name in selected]
+
+
+_selectors: Dict[Tuple[str, ...], ToolSelector] = {}
+_selectors_lock = threading.Lock()
+
+
+def select_tools(task: str, tools: List[Any], k: Optional[int] = None) -> List[Any]:
+    """Return the ``k`` (TOOL_TOP_K) tools most relevant to ``task``, in their original order.
+
+    ``k`` <= 0 keeps every tool. Selectors are cached per tool set.
+    """
+    k = int(os.getenv("TOOL_TOP_K", "4")) if k is None else k
+    if k <= 0 or len(tools) <= k:
+        return tools
+    key = tuple(tool.tool_name for tool in tools)
+    with _selectors_lock:
+        selector = _selectors.get(key)
+        if selector is None:
+            selector = ToolSelector([tool.tool_spec for tool in tools])
+            _selectors[key] = selector
+    selected = set(selector.select(task, k))
+    return [tool for tool in tools if tool.tool_name in selected]
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 
-from strand_agent_poc.core.plan_execute_reflect_agent import run_agent
-
 
 def main():
+    # Imported here so test collection does not load the agent stack
+    from strand_agent_poc.core.plan_execute_reflect_agent import run_agent
+
     # Test the Plan-Execute-Reflect agent
     objective = """
         Users are reporting payment failures during checkout process. Investigate the root cause of the payment failures and determine if there’s a pattern to the failures
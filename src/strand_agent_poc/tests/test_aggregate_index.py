@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""aggregate_index_tool: request compilation and table rendering."""
+import pytest
+
+pytest.importorskip("strands")
+
+from strand_agent_poc.core.index_tools import build_aggregation_query, render_aggregation_table
+
+
+def test_buckets_nest_time_terms_metrics():
+    body = build_aggregation_query(
+        start="now-7d",
+        filter={"term": {"severityText": "ERROR"}},
+        interval="1d",
+        group_by="resource.service.name",
+        top=2,
+        metric_field="durationInNanos",
+    )
+    assert body["size"] == 0
+    assert body["query"]["bool"]["filter"][0]["range"]["@timestamp"]["gte"] == "now-7d"
+    over_time = body["aggs"]["over_time"]
+    assert over_time["date_histogram"]["fixed_interval"] == "1d"
+    group = over_time["aggs"]["group"]
+    assert group["terms"] == {"field": "resource.service.name", "size": 2}
+    assert group["aggs"]["percentiles"]["percentiles"]["percents"] == [50, 95, 99]
+    assert build_aggregation_query(interval="1w")["aggs"]["over_time"]["date_histogram"]["calendar_interval"] == "1w"
+    with pytest.raises(ValueError):
+        build_aggregation_query(interval="1 hour")
+
+
+def test_table_has_one_row_per_bucket():
+    def bucket(key, count, p95):
+        return {"key": key, "doc_count": count, "stats": {"avg": 1.23456, "min": 1.0, "max": 9.0},
+                "percentiles": {"values": {"50.0": 2.0, "95.0": p95}}}
+
+    response = {
+        "hits": {"total": {"value": 42}},
+        "aggregations": {"over_time": {"buckets": [
+            {"key": 0, "key_as_string": "2025-08-01T00:00:00.000Z", "doc_count": 30,
+             "group": {"sum_other_doc_count": 5, "buckets": [bucket("ad", 20, 8.5), bucket("cart", 5, 3.0)]}},
+        ]}},
+    }
+    table = render_aggregation_table(response, "resource.service.name")
+    assert table.splitlines() == [
+        "matched: 42 docs",
+        "time | resource.service.name | count | avg | min | max | p50 | p95",
+        "2025-08-01T00:00:00.000Z | ad | 20 | 1.235 | 1.0 | 9.0 | 2.0 | 8.5",
+        "2025-08-01T00:00:00.000Z | cart | 5 | 1.235 | 1.0 | 9.0 | 2.0 | 3.0",
+        "5 docs in other groups at 2025-08-01T00:00:00.000Z",
+    ]
+    assert render_aggregation_table({"hits": {"total": {"value": 3}}}).splitlines()[1:] == ["count", "3"]
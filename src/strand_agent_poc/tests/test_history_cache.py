@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""HistoryCache: a refresh only pages until the newest cached event."""
+import json
+
+import pytest
+
+pytest.importorskip("strands_tools")
+
+from strand_agent_poc.core.memory_utils import HistoryCache
+
+
+class PagedEventsClient:
+    """ListEvents over an in-memory session, newest first."""
+
+    def __init__(self):
+        self.events = []
+        self.requests = 0
+
+    def add(self, *steps):
+        payload = [{"conversational": {"content": {"text": json.dumps(s)}, "role": "ASSISTANT"}} for s in steps]
+        self.events.insert(0, {"eventId": f"e{len(self.events)}", "payload": payload})
+
+    def list_events(self, maxResults, nextToken="0", **kwargs):
+        self.requests += 1
+        start = int(nextToken)
+        page = {"events": self.events[start : start + maxResults]}
+        if start + maxResults < len(self.events):
+            page["nextToken"] = str(start + maxResults)
+        return page
+
+
+class FakeProvider:
+    memory_id = "memory"
+    actor_id = "actor"
+    session_id = "session"
+
+    def __init__(self, client):
+        self.bedrock_agent_core_client = client
+
+
+def test_refresh_fetches_only_new_events():
+    client = PagedEventsClient()
+    for i in range(120):
+        client.add({"step": i})
+    provider = FakeProvider(client)
+    cache = HistoryCache(max_age=60)
+
+    history = cache.load(provider)
+    assert [s["step"] for s in history] == list(range(120))
+    assert client.requests == 3
+
+    # Within max_age the cache answers without a request
+    assert cache.load(provider) == history
+    assert client.requests == 3
+
+    client.add({"step": 120}, {"step": 121})
+    cache.mark_stale("session")
+    history = cache.load(provider)
+    assert [s["step"] for s in history[-3:]] == [119, 120, 121]
+    assert client.requests == 4
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Import-time benchmark: importing the package must stay cheap.
+
+Run directly to print timings, or through pytest to guard against
+regressions. The budget can be tuned with IMPORT_TIME_BUDGET_MS.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+HEAVY_MODULES = ["strands", "boto3", "botocore", "mcp", "opensearchpy", "opentelemetry"]
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "300"))
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({{"elapsed_ms": elapsed_ms, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_import(module: str) -> dict:
+    """Import ``module`` in a fresh interpreter and report time and heavy modules loaded."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(SRC_DIR), os.environ.get("PYTHONPATH", "")])}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_package_import_is_lazy():
+    for module in ("strand_agent_poc", "strand_agent_poc.core"):
+        report = measure_import(module)
+        assert report["loaded"] == [], f"{module} eagerly imports {report['loaded']}"
+        assert report["elapsed_ms"] < BUDGET_MS, f"{module} took {report['elapsed_ms']:.1f}ms"
+
+
+def main():
+    for module in ("strand_agent_poc", "strand_agent_poc.core", "strand_agent_poc.core.executor"):
+        try:
+            report = measure_import(module)
+        except subprocess.CalledProcessError as e:
+            print(f"{module}: import failed\n{e.stderr}")
+            continue
+        print(f"{module}: {report['elapsed_ms']:.1f}ms, heavy modules: {report['loaded']}")
+
+
+if __name__ == "__main__":
+    main()
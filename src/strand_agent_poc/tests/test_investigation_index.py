@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""InvestigationIndex: persisted similarity search and guarded step reuse."""
+from strand_agent_poc.core.investigation_index import OBJECTIVE, InvestigationIndex
+
+MAPPING_STEP = "Use IndexMappingTool to get the mapping of index ss4o_logs-otel-* to find the service name"
+
+
+def test_reload_and_step_reuse(tmp_path):
+    index = InvestigationIndex(str(tmp_path))
+    index.add_investigation(
+        "Investigate high CPU for ad service in index ss4o_logs-otel-* for past week",
+        [MAPPING_STEP],
+        [{"input": MAPPING_STEP, "result": "resource.service.name (keyword)"}],
+        "GC pressure",
+    )
+
+    reloaded = InvestigationIndex(str(tmp_path))
+    assert len(reloaded) == 2
+    score, record = reloaded.search("Investigate high CPU of the ad service", kind=OBJECTIVE, k=1)[0]
+    assert record["result"] == "GC pressure" and score > 0.5
+
+    # Same request in other words is reused, another index is not
+    reworded = "use IndexMappingTool to get mapping for index ss4o_logs-otel-* to find service name"
+    assert reloaded.find_step_result(reworded)["result"] == "resource.service.name (keyword)"
+    assert reloaded.find_step_result(MAPPING_STEP.replace("logs", "traces")) is None
+    assert reloaded.find_step_result(MAPPING_STEP, max_age=-1) is None
+
+
+def test_scoped_search(tmp_path):
+    index = InvestigationIndex(str(tmp_path))
+    index.add_investigation("High CPU for ad service", [MAPPING_STEP], [{"input": MAPPING_STEP, "result": "mine"}], "x", scope="a")
+    assert index.find_step_result(MAPPING_STEP, scope="a")["result"] == "mine"
+    assert index.find_step_result(MAPPING_STEP, scope="b") is None
+    assert index.search("High CPU for ad service", kind=OBJECTIVE, scope="b") == []
+    # Without a scope (sharing on) every record is searched
+    assert index.find_step_result(MAPPING_STEP) is not None
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""JobStore and JobWorkerPool: durable jobs, queue limit, cancellation and restart."""
+import asyncio
+
+import pytest
+
+from strand_agent_poc.core.jobs import (
+    CANCELLED,
+    FAILED,
+    QUEUED,
+    RUNNING,
+    SUCCEEDED,
+    JobStore,
+    JobWorkerPool,
+    QueueFullError,
+)
+
+
+def test_jobs_persist_across_reopen(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    store = JobStore(path)
+    job_id = store.submit({"objective": "Why do payments fail?"})
+    assert store.claim_next()["id"] == job_id
+    store.add_step(job_id, "Search logs", "12 errors")
+    store.close()
+
+    # The process stopped while the job was running
+    store = JobStore(path)
+    assert store.get(job_id)["status"] == RUNNING
+    assert store.requeue_interrupted() == 1
+    job = store.get(job_id)
+    assert job["status"] == QUEUED
+    assert job["request"] == {"objective": "Why do payments fail?"}
+    assert job["steps_completed"] == 0
+
+    job = store.claim_next()
+    assert job["attempts"] == 2
+    store.add_step(job_id, "Search logs", "12 errors")
+    store.add_step(job_id, "Count by service", "checkout: 12")
+    store.finish(job_id, SUCCEEDED, result="Checkout is failing")
+    store.close()
+
+    store = JobStore(path)
+    assert store.get(job_id)["result"] == "Checkout is failing"
+    assert [s["step"] for s in store.steps(job_id, after=1)] == ["Count by service"]
+    assert store.counts() == {SUCCEEDED: 1}
+    store.close()
+
+
+def test_queue_limit_and_cancel(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    first = store.submit({"objective": "a"}, max_queued=2)
+    second = store.submit({"objective": "b"}, max_queued=2)
+    with pytest.raises(QueueFullError):
+        store.submit({"objective": "c"}, max_queued=2)
+
+    assert store.request_cancel(second) == CANCELLED
+    assert store.request_cancel("missing") is None
+    assert store.claim_next()["id"] == first
+    # A running job is only flagged; its worker finishes it as cancelled
+    assert store.request_cancel(first) == RUNNING
+    assert store.get(first)["cancel_requested"]
+    # Flagged jobs interrupted by a restart are not run again
+    assert store.requeue_interrupted() == 0
+    assert store.get(first)["status"] == CANCELLED
+    store.close()
+
+
+async def _wait_for(store, job_id, statuses):
+    for _ in range(200):
+        job = store.get(job_id)
+        if job["status"] in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} stayed {job['status']}")
+
+
+def test_worker_pool_runs_and_cancels_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.db"))
+    # Created on the loop the pool runs on
+    running = None
+
+    async def runner(request):
+        if request["objective"] == "hang":
+            running.set()
+            await asyncio.sleep(60)
+        if request["objective"] == "fail":
+            yield {"type": "error", "content": "planner failed"}
+            return
+        yield {"type": "step_completed", "step": "Search logs", "result": "12 errors"}
+        yield {"type": "result", "content": "done"}
+
+    async def run():
+        nonlocal running
+        running = asyncio.Event()
+        pool = JobWorkerPool(store, runner, workers=2, poll_interval=0.01)
+        pool.start()
+        ok = store.submit({"objective": "ok"})
+        bad = store.submit({"objective": "fail"})
+        hang = store.submit({"objective": "hang"})
+        pool.notify()
+
+        assert (await _wait_for(store, ok, (SUCCEEDED,)))["steps_completed"] == 1
+        assert (await _wait_for(store, bad, (FAILED,)))["error"] == "planner failed"
+        await running.wait()
+        assert pool.cancel(hang) == RUNNING
+        await _wait_for(store, hang, (CANCELLED,))
+        await pool.stop()
+
+    asyncio.run(run())
+    store.close()
+
+
+def test_submit_returns_429_when_queue_is_full(tmp_path, monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    pytest.importorskip("strands")
+    from fastapi.testclient import TestClient
+
+    from strand_agent_poc.api import api
+
+    store = JobStore(str(tmp_path / "jobs.db"))
+
+    async def runner(request):
+        yield {"type": "result", "content": ""}
+
+    monkeypatch.setattr(api, "job_workers", JobWorkerPool(store, runner))
+    monkeypatch.setattr(api, "JOB_MAX_QUEUED", 1)
+    client = TestClient(api.app)
+
+    response = client.post("/jobs", json={"objective": "a"})
+    assert response.status_code == 202
+    assert client.post("/jobs", json={"objective": "b"}).status_code == 429
+
+    job_id = response.json()["job_id"]
+    assert client.post(f"/jobs/{job_id}/cancel").json()["status"] == CANCELLED
+    assert client.get(f"/jobs/{job_id}").json()["status"] == CANCELLED
+    assert client.get("/jobs/missing").status_code == 404
+    store.close()
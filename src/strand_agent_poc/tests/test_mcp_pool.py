@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""MCPSessionPool: only MCP errors trigger health checks; sessions in use are replaced, not restarted."""
+import threading
+
+import pytest
+
+from strand_agent_poc.core.mcp_pool import MCPServerConfig, MCPSessionPool
+
+
+class McpError(Exception):
+    pass
+
+
+class FakeClient:
+    def __init__(self):
+        self._background_thread = threading.Thread()
+        self._background_thread.is_alive = lambda: self.alive
+        self.alive = True
+        self.pings = 0
+        self.stopped = False
+
+    def start(self):
+        pass
+
+    def stop(self, *args):
+        self.stopped = True
+
+    def list_tools_sync(self):
+        self.pings += 1
+        if not self.alive:
+            raise McpError("connection closed")
+        return []
+
+
+class FakeConfig(MCPServerConfig):
+    def create_client(self):
+        return FakeClient()
+
+
+def test_unhealthy_session_in_use_is_replaced():
+    pool = MCPSessionPool(FakeConfig(command="fake"), health_check_interval=3600)
+
+    # An error of the caller's own work does not mark the session
+    with pytest.raises(ValueError):
+        with pool.lease() as client:
+            raise ValueError("model failed")
+    with pool.lease() as same:
+        assert same is client and client.pings == 0
+
+    with pool.lease() as busy:
+        with pytest.raises(McpError):
+            with pool.lease() as failing:
+                failing.alive = False
+                failing.list_tools_sync()
+        # busy still holds the broken client, so a new session serves new leases
+        with pool.lease() as replacement:
+            assert replacement is not busy and not busy.stopped
+            assert pool.stats()["retiring"] == 1
+    assert busy.stopped and pool.stats()["retiring"] == 0
+    pool.shutdown()
+    assert replacement.stopped
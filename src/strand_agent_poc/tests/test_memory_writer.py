@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""MemoryWriter: interactions are written in ordered batches, with retries."""
+import asyncio
+import json
+import time
+
+import pytest
+
+pytest.importorskip("strands_tools")
+
+from strand_agent_poc.core.memory_utils import MemoryWriter
+
+
+class FlakyClient:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.events = []
+
+    def create_event(self, **event):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("throttled")
+        self.events.append([json.loads(p["conversational"]["content"]["text"]) for p in event["payload"]])
+
+
+class FakeProvider:
+    memory_id = "memory"
+    actor_id = "actor"
+    session_id = "session"
+
+    def __init__(self, client):
+        self.bedrock_agent_core_client = client
+
+
+def test_batches_are_written_in_order_after_retry():
+    client = FlakyClient(failures=1)
+    writer = MemoryWriter(FakeProvider(client), batch_size=2, flush_interval=60, retry_backoff=0)
+
+    async def run():
+        for i in range(5):
+            writer.record({"step": i})
+        await writer.flush()
+
+    asyncio.run(run())
+    assert client.events == [[{"step": 0}, {"step": 1}], [{"step": 2}, {"step": 3}], [{"step": 4}]]
+    assert writer.dropped == 0
+
+
+def test_batch_is_dropped_after_max_retries():
+    client = FlakyClient(failures=10)
+    writer = MemoryWriter(FakeProvider(client), batch_size=5, max_retries=2, retry_backoff=0)
+
+    async def run():
+        writer.record({"step": 0})
+        await writer.flush()
+
+    asyncio.run(run())
+    assert client.events == []
+    assert writer.dropped == 1
+
+
+class SlowClient(FlakyClient):
+    def create_event(self, **event):
+        time.sleep(0.2)
+        super().create_event(**event)
+
+
+def test_flush_timeout_leaves_writes_running():
+    client = SlowClient()
+    writer = MemoryWriter(FakeProvider(client), batch_size=5)
+
+    async def run():
+        writer.record({"step": 0})
+        assert not await writer.flush(timeout=0.01)
+        assert client.events == []
+        assert await writer.flush()
+
+    asyncio.run(run())
+    assert client.events == [[{"step": 0}]]
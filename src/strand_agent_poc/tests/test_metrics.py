@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""AgentMetrics: histograms, counters and gauges in the Prometheus text format."""
+import pytest
+
+from strand_agent_poc.core.metrics import AgentMetrics, _labels, get_agent_metrics, usage_delta
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = AgentMetrics(buckets=(0.1, 1.0))
+    metrics.record_phase("executor", 0.05, {"inputTokens": 120, "outputTokens": 30})
+    metrics.record_phase("executor", 0.5)
+    metrics.record_phase("executor", 5.0)
+    text = metrics.prometheus_text()
+
+    assert "# TYPE agent_phase_duration_seconds histogram" in text
+    assert 'agent_phase_duration_seconds_bucket{phase="executor",le="0.1"} 1' in text
+    assert 'agent_phase_duration_seconds_bucket{phase="executor",le="1.0"} 2' in text
+    assert 'agent_phase_duration_seconds_bucket{phase="executor",le="+Inf"} 3' in text
+    assert 'agent_phase_duration_seconds_sum{phase="executor"} 5.55' in text
+    assert 'agent_phase_duration_seconds_count{phase="executor"} 3' in text
+    assert 'agent_tokens_total{kind="prompt",phase="executor"} 120' in text
+    assert 'agent_tokens_total{kind="completion",phase="executor"} 30' in text
+
+
+def test_counters_skip_zero_and_escape_labels():
+    metrics = AgentMetrics()
+    metrics.add("agent_tool_errors", 0, "Tool errors", tool="SearchIndexTool")
+    metrics.add("agent_tool_errors", 2, "Tool errors", tool='say "hi"\n')
+    text = metrics.prometheus_text()
+    assert "# HELP agent_tool_errors_total Tool errors" in text
+    assert 'agent_tool_errors_total{tool="say \\"hi\\"\\n"} 2' in text
+    assert "SearchIndexTool" not in text
+    assert metrics.snapshot()["counters"] == {'agent_tool_errors{tool="say \\"hi\\"\\n"}': 2}
+
+
+def test_failing_gauge_is_left_out():
+    metrics = AgentMetrics()
+    metrics.register_gauge("agent_queue", "Queued jobs", lambda: {_labels({"state": "queued"}): 3})
+
+    def broken():
+        raise RuntimeError("store closed")
+
+    metrics.register_gauge("agent_broken", "Broken", broken)
+    text = metrics.prometheus_text()
+    assert 'agent_queue{state="queued"} 3' in text
+    assert "agent_broken" not in text
+
+
+def test_usage_delta():
+    assert usage_delta({"inputTokens": 10}, {"inputTokens": 25, "outputTokens": 4}) == {
+        "inputTokens": 15,
+        "outputTokens": 4,
+    }
+
+
+def test_metrics_endpoint():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    pytest.importorskip("strands")
+    from fastapi.testclient import TestClient
+
+    from strand_agent_poc.api.api import app
+
+    get_agent_metrics().record_objective(1.5, "success")
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'agent_objective_duration_seconds_count{status="success"}' in response.text
+    assert "# TYPE agent_tool_cache gauge" in response.text
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""ModelRouter: step classification, tier concurrency limits and SLO fallback."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("strands")
+
+from strand_agent_poc.core import model
+from strand_agent_poc.core.model_router import FAST, STANDARD, STRONG, ModelRouter, ModelTier, classify_step
+
+
+class SlowModel:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        yield {"metadata": {"usage": {"inputTokens": 10, "outputTokens": 2}}}
+
+
+class ThreadModel:
+    """Streams from a worker thread, like BedrockModel."""
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        await asyncio.to_thread(time.sleep, 0.01)
+        yield {"messageStop": {"stopReason": "end_turn"}}
+
+
+def test_waiting_calls_do_not_hold_executor_threads():
+    router = ModelRouter({STANDARD: ModelTier(STANDARD, "test-thread", max_concurrency=1)})
+    model.set_model("test-thread", ThreadModel())
+    tiered = router.model_for_tier(STANDARD)
+
+    async def call():
+        return [event async for event in tiered.stream([])]
+
+    async def run():
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(3))
+        return await asyncio.wait_for(asyncio.gather(*(call() for _ in range(6))), 5)
+
+    try:
+        assert len(asyncio.run(run())) == 6
+    finally:
+        model.set_model("test-thread", None)
+
+
+def test_classify_step():
+    assert classify_step("Use IndexMappingTool to get the mapping of index ss4o_logs-otel-*") == FAST
+    assert classify_step("Correlate the payment errors with the checkout latency spikes") == STRONG
+    assert classify_step("Search ERROR logs of the ad service in the past hour") == STANDARD
+
+
+def test_tier_limits_and_fallback():
+    now = [0.0]
+    fast = ModelTier(FAST, "test-fast", max_concurrency=2, slo=0.001, fallback=STANDARD, clock=lambda: now[0])
+    router = ModelRouter({FAST: fast, STANDARD: ModelTier(STANDARD, "test-standard")})
+    slow = SlowModel()
+    model.set_model("test-fast", slow)
+    try:
+        tiered = router.model_for_step("List all indices")
+        assert tiered.tier is fast
+
+        async def call():
+            return [event async for event in tiered.stream([])]
+
+        async def run():
+            return await asyncio.gather(*(call() for _ in range(6)))
+
+        asyncio.run(run())
+    finally:
+        model.set_model("test-fast", None)
+    assert slow.max_active == 2
+    # Every call took longer than the fast tier's SLO, so new steps go to the
+    # fallback, except every tenth that probes the tier
+    assert fast.over_slo()
+    routed = [router.model_for_step("List all indices").tier.name for _ in range(10)]
+    assert routed == [STANDARD] * 9 + [FAST]
+
+    # A fast probe does not outweigh the slow samples, but they expire
+    fast.observe(0.0001)
+    assert fast.over_slo()
+    now[0] = fast.max_age + 1
+    fast.observe(0.0001)
+    assert not fast.over_slo()
+    assert router.model_for_step("List all indices").tier is fast
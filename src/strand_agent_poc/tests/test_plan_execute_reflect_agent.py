@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""PlanExecuteReflectAgent helpers and run_agents, without a model."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("strands")
+
+from strands import Agent
+from strands.agent.conversation_manager import SummarizingConversationManager
+from strands.models.model import Model
+from strands.session.file_session_manager import FileSessionManager
+
+from strand_agent_poc.core import plan_execute_reflect_agent
+from strand_agent_poc.core.plan_execute_reflect_agent import _TRIMMED_TEXT, PlanExecuteReflectAgent, run_agents
+from strand_agent_poc.core.step_store import StepResultStore
+
+
+class FakePlanner:
+    agent_id = "planner_agent"
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.conversation_manager = SummarizingConversationManager()
+
+
+class NoModel(Model):
+    def update_config(self, **model_config):
+        pass
+
+    def get_config(self):
+        return {"model_id": "none"}
+
+    def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise RuntimeError("not used")
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        raise RuntimeError("not used")
+        yield
+
+
+def user(text):
+    return {"role": "user", "content": [{"text": text}]}
+
+
+def assistant(text):
+    return {"role": "assistant", "content": [{"text": text}]}
+
+
+def trimmed(role):
+    return {"role": role, "content": [{"text": _TRIMMED_TEXT[role]}]}
+
+
+TOOL_USE = {"role": "assistant", "content": [{"toolUse": {"toolUseId": "1", "name": "expand_step_result", "input": {}}}]}
+TOOL_RESULT = {"role": "user", "content": [{"toolResult": {"toolUseId": "1", "status": "success", "content": [{"text": "x" * 1000}]}}]}
+
+
+def bare_agent(messages, planner=None, session=None):
+    agent = PlanExecuteReflectAgent.__new__(PlanExecuteReflectAgent)
+    agent.session_id = "s"
+    agent.planner = planner or FakePlanner(messages)
+    agent.planner_session = session
+    agent.step_store = StepResultStore(digest_chars=20, latest_digest_chars=20)
+    agent._reflect_prompt = None
+    return agent
+
+
+def test_previous_reflect_turn_is_trimmed():
+    messages = [user("plan"), assistant("{steps}"), user("reflect 1"), TOOL_USE, TOOL_RESULT, assistant("{steps 2}")]
+    agent = bare_agent(messages)
+
+    agent._reflect_prompt = "reflect 1"
+    agent._trim_reflect_history()
+    assert messages == [
+        user("plan"),
+        assistant("{steps}"),
+        trimmed("user"),
+        trimmed("assistant"),
+        trimmed("user"),
+        trimmed("assistant"),
+    ]
+    assert agent._reflect_prompt is None
+
+    # Nothing to trim once the prompt is gone from the history
+    agent._reflect_prompt = "summarized"
+    agent._trim_reflect_history()
+    assert len(messages) == 6
+
+
+def planner_agent(tmp_path, messages=None):
+    session = FileSessionManager(session_id="s", storage_dir=str(tmp_path))
+    planner = Agent(
+        model=NoModel(),
+        messages=messages,
+        conversation_manager=SummarizingConversationManager(),
+        session_manager=session,
+        agent_id="planner_agent",
+        callback_handler=None,
+    )
+    return planner, session
+
+
+def test_trimmed_turn_stays_trimmed_after_restore(tmp_path):
+    history = [user("old"), assistant("old plan"), user("plan"), assistant("{steps}")]
+    turn = [user("reflect 1"), TOOL_USE, TOOL_RESULT, assistant("{steps 2}")]
+    planner, session = planner_agent(tmp_path, history + turn)
+
+    # The first two messages were summarized, as on a context overflow
+    summary = assistant("summary of old")
+    planner.conversation_manager.removed_message_count = 2
+    planner.conversation_manager._summary_message = summary
+    planner.messages[:] = [summary] + planner.messages[2:]
+    session.sync_agent(planner)
+
+    agent = bare_agent(None, planner=planner, session=session)
+    agent._reflect_prompt = "reflect 1"
+    agent._trim_reflect_history()
+    expected = [summary, user("plan"), assistant("{steps}")] + [
+        trimmed(m["role"]) for m in turn
+    ]
+    assert planner.messages == expected
+
+    restored, _ = planner_agent(tmp_path)
+    assert restored.messages == expected
+def test_terminal_message_carries_digests():
+    agent = bare_agent([])
+    agent.step_store.put("Search logs", "error " * 500)
+    text = agent._completed_digests()
+    assert '"id": "result-1"' in text
+    assert len(text) < 300
+
+
+def test_run_agents_returns_outcomes_in_input_order(monkeypatch):
+    active = []
+    peak = []
+
+    async def fake_run_agent_async(objective, **kwargs):
+        active.append(objective)
+        peak.append(len(active))
+        await asyncio.sleep(0.01 if objective == "slow" else 0)
+        active.remove(objective)
+        if objective == "bad":
+            raise RuntimeError("planner failed")
+        return f"done: {objective}"
+
+    monkeypatch.setattr(plan_execute_reflect_agent, "get_tool_prompt", lambda: "")
+    monkeypatch.setattr(plan_execute_reflect_agent, "run_agent_async", fake_run_agent_async)
+    outcomes = run_agents(["slow", "bad", "fast"], max_concurrency=2)
+
+    assert [o["objective"] for o in outcomes] == ["slow", "bad", "fast"]
+    assert [o["success"] for o in outcomes] == [True, False, True]
+    assert outcomes[0]["result"] == "done: slow"
+    assert outcomes[1]["error"] == "planner failed"
+    assert max(peak) == 2
+
+
+def test_run_agents_reports_warm_up_failure_per_objective(monkeypatch):
+    def broken_tool_prompt():
+        raise RuntimeError("MCP server did not start")
+
+    monkeypatch.setattr(plan_execute_reflect_agent, "get_tool_prompt", broken_tool_prompt)
+    outcomes = run_agents(["a", "b"])
+
+    assert [(o["index"], o["success"], o["error"]) for o in outcomes] == [
+        (0, False, "MCP server did not start"),
+        (1, False, "MCP server did not start"),
+    ]
+
+
+def test_run_agent_passes_prestart_options(monkeypatch):
+    created = {}
+
+    class RecordingAgent:
+        def __init__(self, **kwargs):
+            created.update(kwargs)
+
+        async def execute_async(self, objective):
+            return objective
+
+    monkeypatch.setattr(plan_execute_reflect_agent, "PlanExecuteReflectAgent", RecordingAgent)
+    result = asyncio.run(
+        plan_execute_reflect_agent.run_agent_async("a", speculative_steps=True, early_dispatch=True)
+    )
+    assert result == "a"
+    assert created["speculative_steps"] and created["early_dispatch"]
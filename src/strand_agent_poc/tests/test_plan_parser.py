@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""IncrementalPlanParser: steps as they close, result detection, and message callbacks."""
+import asyncio
+
+from strand_agent_poc.core.events import stream_agent
+from strand_agent_poc.core.plan_parser import RESULT_STARTED, STEP, IncrementalPlanParser, parse_plan
+
+
+def feed_chars(parser, text):
+    events = []
+    for c in text:
+        events.extend(parser.feed(c))
+    return events
+
+
+def test_steps_close_while_streaming():
+    parser = IncrementalPlanParser()
+    events = feed_chars(parser, '```json\n{"steps": ["List indices", {"step": "Count errors", "depends_on": [1]}], "result": ""}\n```')
+    assert events == [
+        (STEP, "List indices"),
+        (STEP, {"step": "Count errors", "depends_on": [1]}),
+    ]
+    assert parser.close() == {
+        "steps": ["List indices", {"step": "Count errors", "depends_on": [1]}],
+        "result": "",
+    }
+
+
+def test_result_started_once():
+    parser = IncrementalPlanParser()
+    events = feed_chars(parser, '{"steps": [], "result": "Payments fail because ..."}')
+    assert events == [(RESULT_STARTED, None)]
+    assert parser.result_started
+
+
+def test_truncated_response_keeps_closed_steps():
+    assert parse_plan('{"steps": ["a", "b", "c') == {"steps": ["a", "b"], "result": ""}
+    assert parse_plan("no plan here")["result"].startswith("Error parsing response")
+
+
+def test_braces_in_prose_before_the_plan_are_skipped():
+    fenced = 'Plan for {service}:\n```json\n{"steps": ["a", "b"], "result": ""}\n```'
+    assert parse_plan(fenced) == {"steps": ["a", "b"], "result": ""}
+
+    parser = IncrementalPlanParser()
+    events = feed_chars(parser, 'Check {"x"} first, then {"steps": ["a"], "result": ""}')
+    assert events == [(STEP, "a")]
+    assert parser.close() == {"steps": ["a"], "result": ""}
+
+
+class FakeAgent:
+    def __init__(self, events):
+        self.events = events
+
+    async def stream_async(self, prompt):
+        for event in self.events:
+            yield event
+
+
+def test_stream_agent_reports_messages():
+    tool_turn = {"role": "assistant", "content": [{"text": "{"}, {"toolUse": {"name": "ListIndexTool", "input": {}}}]}
+    agent = FakeAgent([{"data": "{"}, {"message": tool_turn}, {"data": "{}"}, {"result": "done"}])
+    texts, messages = [], []
+
+    async def on_text(delta):
+        texts.append(delta)
+
+    async def on_message(message):
+        messages.append(message)
+
+    result = asyncio.run(stream_agent(agent, "plan", None, on_text=on_text, on_message=on_message))
+    assert result == "done"
+    assert texts == ["{", "{}"]
+    assert messages == [tool_turn]
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Steps started ahead of their plan: early dispatch and speculation, through the agent loop."""
+import asyncio
+
+import pytest
+
+pytest.importorskip("strands")
+
+from strand_agent_poc.core import plan_execute_reflect_agent
+from strand_agent_poc.core.plan_execute_reflect_agent import PlanExecuteReflectAgent
+
+
+class FakeTracer:
+    def _start_span(self, span_name, parent_span=None):
+        return None
+
+    def _end_span(self, span):
+        pass
+
+
+class ScriptedPlanner:
+    """Streams one scripted reply per planner call.
+
+    A reply item is a text chunk (str), a complete message (dict), or a
+    pause in seconds (float). The result is the text after the last message.
+    """
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.messages = []
+        self.tracer = FakeTracer()
+        self.trace_span = None
+
+    async def stream_async(self, prompt):
+        text = ""
+        for item in self.replies.pop(0):
+            if isinstance(item, float):
+                await asyncio.sleep(item)
+            elif isinstance(item, dict):
+                yield {"message": item}
+                text = ""
+            else:
+                yield {"data": item}
+                text += item
+                # Let started steps run between chunks, like a network stream
+                for _ in range(3):
+                    await asyncio.sleep(0)
+        yield {"result": text}
+
+    async def invoke_async(self, prompt):
+        async for event in self.stream_async(prompt):
+            if "result" in event:
+                return event["result"]
+
+
+class FakeExecutor:
+    def __init__(self, hang=()):
+        self.calls = []
+        self.hang = set(hang)
+
+    async def __call__(self, task, trace_id=None, event_sink=None):
+        self.calls.append(task)
+        if task in self.hang:
+            await asyncio.Event().wait()
+        return f"result of {task}"
+
+
+def chunks(text, size=4):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def tool_turn(text):
+    return {
+        "role": "assistant",
+        "content": [{"text": text}, {"toolUse": {"toolUseId": "1", "name": "current_time", "input": {}}}],
+    }
+
+
+@pytest.fixture
+def make_agent(monkeypatch, tmp_path):
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    monkeypatch.setenv("SESSION_BACKEND", "file")
+    monkeypatch.setenv("SESSION_STORAGE_DIR", str(tmp_path))
+    monkeypatch.delenv("INVESTIGATION_INDEX_DIR", raising=False)
+    monkeypatch.delenv("MEMORY_SAVE_INTERACTIONS", raising=False)
+    monkeypatch.setattr(plan_execute_reflect_agent, "get_tool_prompt", lambda: "")
+
+    def make(replies, executor, **kwargs):
+        monkeypatch.setattr(plan_execute_reflect_agent, "executor_agent_async", executor)
+        agent = PlanExecuteReflectAgent(session_id="s", **kwargs)
+        agent.planner = ScriptedPlanner(replies)
+        return agent
+
+    return make
+
+
+DONE = ['{"steps": [], "result": "done"}']
+
+
+def test_early_dispatch_starts_steps_while_the_plan_streams(make_agent):
+    executor = FakeExecutor()
+    started_during_plan = []
+    plan = chunks('{"steps": ["A", "B"], "result": ""}')
+
+    class Planner(ScriptedPlanner):
+        async def stream_async(self, prompt):
+            async for event in super().stream_async(prompt):
+                if "result" in event and not started_during_plan:
+                    started_during_plan.extend(executor.calls)
+                yield event
+
+    agent = make_agent([], executor, early_dispatch=True)
+    agent.planner = Planner([plan, DONE])
+    assert agent.execute("objective") == "done"
+
+    assert started_during_plan == ["A"]
+    assert executor.calls == ["A"]
+    assert agent.early_dispatch_stats == {"hit": 1, "wasted": 0, "cancelled": 0}
+
+
+def test_tool_turn_drops_its_early_steps(make_agent):
+    executor = FakeExecutor(hang={"X"})
+    replies = [
+        chunks('{"steps": ["X"], "result": ""}') + [tool_turn("...")] + chunks('{"steps": ["A"], "result": ""}'),
+        DONE,
+    ]
+    agent = make_agent(replies, executor, early_dispatch=True)
+    assert agent.execute("objective") == "done"
+
+    assert executor.calls == ["X", "A"]
+    assert [s["input"] for s in agent.completed_steps] == ["A"]
+    assert agent.early_dispatch_stats == {"hit": 1, "wasted": 0, "cancelled": 1}
+
+
+def test_final_result_discards_early_steps(make_agent):
+    executor = FakeExecutor()
+    replies = [chunks('{"steps": ["A"], "result": "already known"}')]
+    agent = make_agent(replies, executor, early_dispatch=True)
+    assert agent.execute("objective") == "already known"
+
+    assert executor.calls == ["A"]
+    assert agent.completed_steps == []
+    assert agent.early_dispatch_stats["hit"] == 0
+    assert agent.early_dispatch_stats["wasted"] + agent.early_dispatch_stats["cancelled"] == 1
+
+
+def test_without_early_dispatch_steps_wait_for_the_plan(make_agent):
+    executor = FakeExecutor(hang={"X"})
+    replies = [chunks('{"steps": ["X"], "result": "done"}')]
+    agent = make_agent(replies, executor)
+    assert agent.execute("objective") == "done"
+    assert executor.calls == []
+
+
+def test_speculative_step_is_committed_when_the_plan_keeps_it(make_agent):
+    executor = FakeExecutor()
+    replies = [['{"steps": ["A", "B"], "result": ""}'], ['{"steps": ["B"], "result": ""}'], DONE]
+    agent = make_agent(replies, executor, speculative_steps=True)
+    assert agent.execute("objective") == "done"
+
+    assert executor.calls == ["A", "B"]
+    assert [s["input"] for s in agent.completed_steps] == ["A", "B"]
+    assert agent.speculation_stats == {"hit": 1, "wasted": 0, "cancelled": 0}
+
+
+def test_speculative_step_is_cancelled_when_the_plan_changes(make_agent):
+    executor = FakeExecutor(hang={"B"})
+    replies = [['{"steps": ["A", "B"], "result": ""}'], ['{"steps": ["C"], "result": ""}'], DONE]
+    agent = make_agent(replies, executor, speculative_steps=True)
+    assert agent.execute("objective") == "done"
+
+    assert executor.calls == ["A", "B", "C"]
+    assert [s["input"] for s in agent.completed_steps] == ["A", "C"]
+    assert agent.speculation_stats == {"hit": 0, "wasted": 0, "cancelled": 1}
+
+
+def test_finished_speculative_step_is_wasted_when_the_plan_changes(make_agent):
+    executor = FakeExecutor()
+    replies = [['{"steps": ["A", "B"], "result": ""}'], [0.01, '{"steps": ["C"], "result": ""}'], DONE]
+    agent = make_agent(replies, executor, speculative_steps=True)
+    assert agent.execute("objective") == "done"
+
+    assert [s["input"] for s in agent.completed_steps] == ["A", "C"]
+    assert agent.speculation_stats == {"hit": 0, "wasted": 1, "cancelled": 0}
+
+
+class FakeIndex:
+    def __init__(self, results):
+        self.results = results
+
+    def search(self, text, **kwargs):
+        return []
+
+    def find_step_result(self, text, min_score, max_age, scope=None):
+        if text in self.results:
+            return {"result": self.results[text]}
+        return None
+
+    def add_investigation(self, *args, **kwargs):
+        pass
+
+
+@pytest.mark.parametrize("kept", [True, False])
+def test_step_reuse_counts_only_committed_speculation(make_agent, kept):
+    executor = FakeExecutor()
+    reflection = '{"steps": ["B"], "result": ""}' if kept else '{"steps": ["C"], "result": ""}'
+    replies = [['{"steps": ["A", "B"], "result": ""}'], [reflection], DONE]
+    agent = make_agent(replies, executor, speculative_steps=True)
+    agent.investigation_index = FakeIndex({"B": "known from last week"})
+    assert agent.execute("objective") == "done"
+
+    assert "B" not in executor.calls
+    assert agent.reused_steps == ({"B"} if kept else set())
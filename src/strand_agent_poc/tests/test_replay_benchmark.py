@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""Offline replay of a recorded investigation through the full agent loop."""
+import pytest
+
+pytest.importorskip("strands")
+pytest.importorskip("mcp")
+
+from strand_agent_poc.benchmarks.run import run_benchmark
+
+
+def test_replay_payment_failure():
+    summary = run_benchmark("payment_failure", repeat=1)
+    assert summary["steps"] == 3
+    assert summary["result_chars"] > 0
+    assert summary["model_calls"] == 10
+
+
+def test_replay_parallel_overhead_is_not_negative():
+    summary = run_benchmark("payment_failure", repeat=1, parallel_steps=True)
+    assert summary["executor_wall_s"] <= summary["executor_s"] + 1e-6
+    assert summary["overhead_s"] >= 0
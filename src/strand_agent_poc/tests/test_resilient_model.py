@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""ResilientModel: rate adaptation, jittered retries and hedging against a local fake model."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("strands")
+
+from strands.types.exceptions import ModelThrottledException
+
+from strand_agent_poc.core.resilient_model import AdaptiveTokenBucket, ModelUnavailableError, ResilientModel
+
+
+class FakeModel:
+    """Throttles the first ``throttles`` requests; ``delays`` sets the time to first event per request."""
+
+    def __init__(self, throttles=0, delays=()):
+        self.throttles = throttles
+        self.delays = list(delays)
+        self.requests = 0
+
+    def get_config(self):
+        return {"model_id": "fake"}
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+        self.requests += 1
+        n = self.requests
+        if n <= self.throttles:
+            raise ModelThrottledException("Too many requests")
+        await asyncio.sleep(self.delays[n - 1] if n <= len(self.delays) else 0)
+        yield {"request": n}
+        yield {"messageStop": {"stopReason": "end_turn"}}
+
+
+def run(model):
+    async def call():
+        return [event async for event in model.stream([])]
+
+    return asyncio.run(call())
+
+
+def test_throttles_are_retried_and_slow_the_bucket():
+    bucket = AdaptiveTokenBucket(rate=100, burst=10)
+    model = ResilientModel(FakeModel(throttles=2), bucket=bucket, base_delay=0.001)
+    assert run(model)[0] == {"request": 3}
+    stats = model.stats()
+    assert (stats["requests"], stats["throttles"], stats["retries"], stats["failures"]) == (3, 2, 2, 0)
+    assert bucket.rate == pytest.approx(100 * 0.5 * 0.5 + 0.1)
+
+    # Once retries are exhausted the error is no throttle, so strands does not retry again
+    model = ResilientModel(FakeModel(throttles=5), bucket=AdaptiveTokenBucket(rate=100), base_delay=0.001, max_retries=2)
+    with pytest.raises(ModelUnavailableError) as error:
+        run(model)
+    assert not isinstance(error.value, ModelThrottledException)
+    assert model.stats()["failures"] == 1
+
+
+def test_slot_is_only_held_during_attempts():
+    held = []
+
+    @asynccontextmanager
+    async def slot():
+        held.append(True)
+        try:
+            yield
+        finally:
+            held[-1] = False
+
+    model = ResilientModel(FakeModel(throttles=2), bucket=AdaptiveTokenBucket(rate=100), base_delay=0.001)
+
+    async def call():
+        return [event async for event in model.stream([], slot=slot)]
+
+    assert asyncio.run(call())[0] == {"request": 3}
+    # One slot per attempt, each released before the backoff
+    assert held == [False, False, False]
+
+
+def test_slow_request_is_hedged():
+    fake = FakeModel(delays=[0.001] * 10 + [1.0, 0.001])
+    model = ResilientModel(fake, bucket=AdaptiveTokenBucket(burst=20), hedge=True, hedge_min_delay=0.01)
+    for _ in range(10):
+        run(model)
+    # The 11th request stalls past the p95, the hedged 12th answers first
+    assert run(model)[0] == {"request": 12}
+    stats = model.stats()
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_bucket_waits_when_empty():
+    now = [0.0]
+    bucket = AdaptiveTokenBucket(rate=2, burst=1, clock=lambda: now[0])
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    now[0] = 2.0
+    assert bucket.try_acquire()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""SearchCoalescer: parallel SearchIndexTool/CountTool calls share one _msearch."""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("strands")
+
+from strand_agent_poc.core.search_coalescer import CoalescingTool, SearchCoalescer, search_request
+
+
+class FakeClient:
+    def __init__(self):
+        self.msearches = []
+
+    def msearch(self, body):
+        self.msearches.append(body)
+        responses = []
+        for header, query in zip(body[::2], body[1::2]):
+            if header["index"] == "missing":
+                responses.append({"error": {"type": "index_not_found_exception", "reason": "no such index"}})
+            else:
+                responses.append({"hits": {"total": {"value": 7}, "hits": [{"_index": header["index"]}]}, "_shards": {}})
+        return {"responses": responses}
+
+
+class FakeTool:
+    def __init__(self, name):
+        self.tool_name = name
+        self.tool_spec = {"name": name}
+        self.tool_type = "python"
+        self.calls = 0
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        self.calls += 1
+        yield {"toolUseId": tool_use["toolUseId"], "status": "success", "content": [{"text": "from mcp"}]}
+
+
+async def call(tool, tool_input, tool_use_id):
+    events = [e async for e in tool.stream({"toolUseId": tool_use_id, "input": tool_input}, {})]
+    return events[-1]
+
+
+def test_parallel_calls_share_one_msearch():
+    client = FakeClient()
+    coalescer = SearchCoalescer(window=0.01, client_factory=lambda: client)
+    search, count = FakeTool("SearchIndexTool"), FakeTool("CountTool")
+    search_tool, count_tool = CoalescingTool(search, coalescer), CoalescingTool(count, coalescer)
+
+    async def run():
+        return await asyncio.gather(
+            call(search_tool, {"index": "logs", "query_dsl": {"query": {"match_all": {}}}, "size": 500}, "a"),
+            call(count_tool, {"index": "logs", "body": {"query": {"term": {"level": "ERROR"}}}}, "b"),
+            call(search_tool, {"index": "missing", "query_dsl": "{}"}, "c"),
+            call(search_tool, {"index": "logs", "query_dsl": {}, "format": "csv"}, "d"),
+            call(search_tool, {"index": "logs", "query_dsl": {"size": 0, "aggs": {}}}, "e"),
+        )
+
+    found, counted, missing, csv, aggregated = asyncio.run(run())
+    assert len(client.msearches) == 1
+    assert client.msearches[0][1]["size"] == 100
+    assert client.msearches[0][7]["size"] == 0
+    assert client.msearches[0][3] == {"query": {"term": {"level": "ERROR"}}, "size": 0, "track_total_hits": True}
+
+    assert found["toolUseId"] == "a"
+    assert found["content"][0]["text"].startswith("Search results from logs (JSON format):\n")
+    assert json.loads(counted["content"][0]["text"])["count"] == 7
+    assert missing["status"] == "error" and "index_not_found_exception" in missing["content"][0]["text"]
+    # CSV output is not reproduced, so that call goes to the MCP tool
+    assert csv["content"][0]["text"] == "from mcp" and search.calls == 1
+
+
+def test_other_clusters_go_to_mcp():
+    assert search_request("SearchIndexTool", {"index": "logs", "query_dsl": {}})
+    assert search_request("SearchIndexTool", {"index": "logs", "query_dsl": {}, "opensearch_cluster_name": "prod"}) is None
+    assert search_request("CountTool", {"index": "logs", "opensearch_url": "http://other:9200"}) is None
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""SQLite session repository: buffered turns survive a restart."""
+import pytest
+
+pytest.importorskip("strands")
+
+from strands.types.session import Session, SessionAgent, SessionMessage, SessionType
+
+from strand_agent_poc.core.session_manager import SQLiteSessionRepository
+
+
+def test_turn_is_restored_after_reopen(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    repository = SQLiteSessionRepository(path)
+    repository.create_session(Session(session_id="s", session_type=SessionType.AGENT))
+    agent = SessionAgent(agent_id="a", state={}, conversation_manager_state={})
+    repository.create_agent("s", agent)
+    for i in range(3):
+        message = SessionMessage(message={"role": "user", "content": [{"text": str(i)}]}, message_id=i)
+        repository.create_message("s", "a", message)
+        agent.state = {"messages": i + 1}
+        repository.update_agent("s", agent)
+    # Buffered writes are visible before the turn is committed
+    assert repository.read_agent("s", "a").state == {"messages": 3}
+    repository.flush()
+    repository.close()
+
+    reopened = SQLiteSessionRepository(path)
+    assert reopened.read_agent("s", "a").state == {"messages": 3}
+    assert reopened.read_agent("s", "a").created_at == agent.created_at
+    messages = reopened.list_messages("s", "a", offset=1)
+    assert [m.message["content"][0]["text"] for m in messages] == ["1", "2"]
+
+    reopened.retention_seconds = -1
+    reopened.compact()
+    assert reopened.read_session("s") is None
+    assert reopened.list_messages("s", "a") == []
+    reopened.close()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""StepScheduler: dependency ordering of plan steps and concurrent batches."""
+import asyncio
+
+from strand_agent_poc.core.step_scheduler import StepScheduler, normalize_steps, same_step
+
+
+def texts(steps):
+    return [s.text for s in steps]
+
+
+def test_string_steps_run_in_sequence():
+    steps = normalize_steps(["List indices", "Get mappings", "Search errors"])
+    assert [s.depends_on for s in steps] == [[], ["step-1"], ["step-2"]]
+
+    scheduler = StepScheduler(4)
+    assert texts(scheduler.ready_steps(steps, [], limit=10)) == ["List indices"]
+    assert texts(scheduler.ready_steps(steps, ["List indices"], limit=10)) == ["Get mappings"]
+
+
+def test_independent_steps_are_ready_together():
+    steps = normalize_steps(
+        [
+            {"id": "a", "step": "Count errors in logs"},
+            {"id": "b", "step": "Count errors in traces"},
+            {"id": "c", "step": "Compare both", "depends_on": ["a", "b"]},
+            {"id": "d", "input": "Check cluster health", "depends_on": "a"},
+        ]
+    )
+    scheduler = StepScheduler(4)
+    assert texts(scheduler.ready_steps(steps, [], limit=10)) == ["Count errors in logs", "Count errors in traces"]
+    assert texts(scheduler.ready_steps(steps, ["Count errors in logs"], limit=10)) == [
+        "Count errors in traces",
+        "Check cluster health",
+    ]
+    done = ["Count errors in logs", "Count errors in traces", "Check cluster health"]
+    assert texts(scheduler.ready_steps(steps, done, limit=10)) == ["Compare both"]
+
+    # Bounded by the scheduler's parallelism and the remaining step budget
+    assert len(StepScheduler(1).ready_steps(steps, [], limit=10)) == 1
+    assert len(scheduler.ready_steps(steps, [], limit=1)) == 1
+
+
+def test_dropped_dependencies_and_cycles_do_not_stall():
+    scheduler = StepScheduler(4)
+    # "a" ran and was dropped from the revised plan
+    steps = normalize_steps([{"id": "b", "step": "Summarize", "depends_on": ["a"]}])
+    assert texts(scheduler.ready_steps(steps, [], limit=10)) == ["Summarize"]
+
+    cycle = normalize_steps(
+        [
+            {"id": "a", "step": "First", "depends_on": ["b"]},
+            {"id": "b", "step": "Second", "depends_on": ["a"]},
+        ]
+    )
+    assert texts(scheduler.ready_steps(cycle, [], limit=10)) == ["First"]
+    assert scheduler.ready_steps(cycle, ["First", "Second"], limit=10) == []
+
+
+def test_restated_steps_match_completed_ones():
+    scheduler = StepScheduler(4)
+    # The reflection restated both steps with different case and spacing
+    steps = normalize_steps(["list  indices", "Get Mappings", "get mappings"])
+    assert texts(scheduler.ready_steps(steps, ["List indices"], limit=10)) == ["Get Mappings"]
+    assert scheduler.ready_steps(steps, ["List indices", "Get mappings"], limit=10) == []
+
+
+def test_run_batch_keeps_plan_order_and_limit():
+    scheduler = StepScheduler(2)
+    steps = normalize_steps([{"id": str(i), "step": f"step {i}"} for i in range(5)])
+    active = []
+    peak = []
+
+    async def run_step(step):
+        active.append(step)
+        peak.append(len(active))
+        await asyncio.sleep(0.01 if step.id == "0" else 0)
+        active.remove(step)
+        return step.text.upper()
+
+    results = asyncio.run(scheduler.run_batch(steps, run_step))
+    assert [(s.id, r) for s, r in results] == [(str(i), f"STEP {i}") for i in range(5)]
+    assert max(peak) == 2
+
+
+def test_same_step_ignores_case_and_whitespace():
+    assert same_step("List  all indices ", "list all Indices")
+    assert not same_step("List indices", "List index")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""ToolResultCache: TTL, byte cap and which results are cached."""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("strands")
+
+from strand_agent_poc.core import tool_cache
+from strand_agent_poc.core.tool_cache import CachingTool, ToolResultCache, cache_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(tool_cache.time, "monotonic", clock)
+    cache = ToolResultCache(ttls={"ListIndexTool": 300.0})
+    key = cache_key("ListIndexTool", {"index": None})
+    cache.put(key, {"status": "success", "content": [{"text": "logs"}]})
+
+    clock.now += 299
+    assert cache.get(cache_key("ListIndexTool", "{}")) is not None
+    clock.now += 2
+    assert cache.get(key) is None
+    assert cache.stats()["entries"] == 0
+    assert not cache.cacheable("SearchIndexTool")
+
+
+def test_byte_cap_evicts_least_recently_used():
+    result = {"status": "success", "content": [{"text": "x" * 100}]}
+    size = len(json.dumps(result))
+    cache = ToolResultCache(ttls={"IndexMappingTool": 600.0}, max_bytes=2 * size)
+    a, b, c = (cache_key("IndexMappingTool", {"index": i}) for i in "abc")
+    cache.put(a, result)
+    cache.put(b, result)
+    cache.get(a)
+    cache.put(c, result)
+
+    assert cache.get(b) is None
+    assert cache.get(a) is not None and cache.get(c) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] == 2 * size
+
+    cache.put(cache_key("IndexMappingTool", {"index": "big"}), {"content": [{"text": "x" * 1000}]})
+    assert cache.stats()["entries"] == 2
+
+
+class BatchTool:
+    tool_name = "index_insights_batch_tool"
+    tool_spec = {"name": "index_insights_batch_tool"}
+    tool_type = "function"
+
+    def __init__(self, insights):
+        self.insights = insights
+        self.calls = 0
+
+    async def stream(self, tool_use, invocation_state, **kwargs):
+        self.calls += 1
+        yield {"toolUseId": tool_use["toolUseId"], "status": "success", "content": [{"text": json.dumps(self.insights)}]}
+
+
+def call_twice(tool):
+    async def run():
+        for i in range(2):
+            async for _ in tool.stream({"toolUseId": str(i), "input": {"indices": ["logs"]}}, {}):
+                pass
+
+    asyncio.run(run())
+
+
+def test_batch_results_with_errors_are_not_cached():
+    failed = BatchTool({"logs": {"FIELD_DESCRIPTION": {"error": "Error getting index insight for logs: timeout"}}})
+    call_twice(CachingTool(failed, ToolResultCache()))
+    assert failed.calls == 2
+
+    ok = BatchTool({"logs": {"FIELD_DESCRIPTION": {"fields": ["message"]}}})
+    call_twice(CachingTool(ok, ToolResultCache()))
+    assert ok.calls == 1
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""ToolOutputCompactor: search responses become tables, everything is size-capped."""
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("strands")
+
+from strand_agent_poc.core.tool_output import ToolOutputCompactor, render_hits_table, truncate_bytes
+
+
+def search_response(n):
+    return {
+        "took": 3,
+        "_shards": {"total": 1},
+        "hits": {
+            "total": {"value": 120},
+            "hits": [
+                {"_index": "logs", "_id": str(i), "_source": {"level": "ERROR", "service": {"name": f"svc|{i}"}}}
+                for i in range(n)
+            ],
+        },
+    }
+
+
+def test_hits_become_a_table_with_constant_fields_once():
+    table = render_hits_table(search_response(3))
+    assert table.splitlines() == [
+        "hits: 3 shown of 120 total",
+        "same in all hits: _index=logs, level=ERROR",
+        "_id | service.name",
+        "0 | svc\\|0",
+        "1 | svc\\|1",
+        "2 | svc\\|2",
+        '{"took":3}',
+    ]
+    assert render_hits_table({"count": 3}) is None
+
+
+def test_compact_text_keeps_the_prefix_and_minifies_other_json():
+    compactor = ToolOutputCompactor(max_bytes=10_000)
+    text = "Search results from logs (JSON format):\n" + json.dumps(search_response(2), indent=2)
+    compacted = compactor.compact_text(text)
+    assert compacted.startswith("Search results from logs (JSON format):\nhits: 2 shown of 120 total")
+    assert len(compacted) < len(text)
+
+    assert compactor.compact_text('Indices:\n[ {"index": "logs"} ]') == 'Indices:\n[{"index":"logs"}]'
+    assert compactor.compact_text("plain text") == "plain text"
+
+    msearch = compactor.compact_text(json.dumps({"responses": [search_response(1), {"error": "boom"}]}))
+    assert msearch.startswith("response 1:\nhits: 1 shown")
+    assert 'response 2:\n{"error":"boom"}' in msearch
+
+
+def test_output_is_truncated_to_max_bytes():
+    compactor = ToolOutputCompactor(max_bytes=200)
+    compacted = compactor.compact_text(json.dumps(search_response(50)))
+    kept, marker = compacted.rsplit("\n", 1)
+    assert len(kept.encode("utf-8")) <= 200
+    assert marker.startswith("[... truncated ")
+
+    # Multi-byte characters are never split
+    assert truncate_bytes("é" * 10, 5) == "éé\n[... truncated 15 bytes]"
+
+
+def test_compact_result_rewrites_text_and_json_blocks():
+    compactor = ToolOutputCompactor(max_bytes=10_000)
+    image = {"image": {"format": "png", "source": {"bytes": b""}}}
+    event = SimpleNamespace(
+        result={
+            "toolUseId": "1",
+            "status": "success",
+            "content": [{"text": '{"a": 1}'}, {"json": {"b": [1, 2]}}, image],
+        }
+    )
+    compactor.compact_result(event)
+    assert event.result["toolUseId"] == "1"
+    assert event.result["content"] == [{"text": '{"a":1}'}, {"text": '{"b":[1,2]}'}, image]
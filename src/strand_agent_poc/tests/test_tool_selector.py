@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""ToolSelector: per-step tool filtering for the executor."""
+from strand_agent_poc.core.tool_catalog import summarize_tool_spec
+from strand_agent_poc.core.tool_selector import ToolSelector
+
+
+def spec(name, description, **properties):
+    return {
+        "name": name,
+        "description": description,
+        "inputSchema": {"json": {"type": "object", "properties": properties, "required": ["index"]}},
+    }
+
+
+SPECS = [
+    spec("ListIndexTool", "Lists all indices in the OpenSearch cluster.", index={"type": "string"}),
+    spec("IndexMappingTool", "Retrieves index mapping and setting information.", index={"type": "string"}),
+    spec("SearchIndexTool", "Searches an index using a query DSL.", index={"type": "string"}, query={"type": "object"}),
+    spec("CountTool", "Returns number of documents matching a query.", index={"type": "string"}),
+    spec("GetShardsTool", "Gets information about shards.", index={"type": "string"}),
+    spec("ClusterHealthTool", "Returns the health of the cluster.", index={"type": "string"}),
+]
+
+
+def test_named_and_ranked_tools_are_selected():
+    selector = ToolSelector(SPECS)
+    step = "Use IndexMappingTool to find the fields of index ss4o_logs-otel-*"
+    assert selector.select(step, 2) == ["IndexMappingTool", "SearchIndexTool"]
+    assert "CountTool" in selector.select("Count ERROR logs of the payment service", 3)
+    # No signal at all: keep every tool rather than starve the executor
+    assert selector.select("zzz", 2) == [s["name"] for s in SPECS]
+
+
+def test_summary_replaces_schema():
+    summary = summarize_tool_spec(SPECS[2])
+    assert summary == "Searches an index using a query DSL. Parameters: index (string, required), query (object)"